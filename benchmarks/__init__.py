@@ -0,0 +1,9 @@
+"""
+Offline benchmark suite: a fake DexScreener (websocket feed and token info API), synthetic or
+recorded 1.3.0 pairs frames, and scenarios from single functions up to the full refresh cycle.
+
+    python -m benchmarks run --out before.json
+    python -m benchmarks run --out after.json
+    python -m benchmarks compare before.json after.json
+"""
+#
\ No newline at end of file
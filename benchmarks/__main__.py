@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import sys
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from benchmarks                  import scenarios
+from benchmarks.harness          import SCENARIOS, run, save_results, load_results, compare
+from benchmarks.frames           import FrameSource, synthetic_frame, live_frames, record_frames
+from benchmarks.fake_dexscreener import FakeWebsocketServer, FakeTokenInfoServer
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Commands
+#
+def command_list(args) -> int:
+
+    for name, spec in SCENARIOS.items():
+
+        print(f"{spec['group']:<8} {name}")
+    #
+
+    return (0)
+#
+
+def command_run(args) -> int:
+
+    results = run(args.scenarios, rounds=args.rounds, scale=args.scale)
+
+    if (args.out):
+
+        save_results(results, args.out)
+        print(f"Results written to {args.out}")
+    #
+    if (args.json):
+
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    #
+
+    return (0)
+#
+
+def command_compare(args) -> int:
+
+    lines, regressed = compare(load_results(args.base), load_results(args.head), threshold=args.threshold, stat=args.stat)
+
+    print("\n".join(lines))
+
+    if (regressed):
+
+        print(f"\n{len(regressed)} scenarios slower than {args.threshold:.0%}: {', '.join(regressed)}")
+    #
+
+    return (1 if (regressed and args.fail) else 0)
+#
+
+def command_frames(args) -> int:
+
+    if (args.url):
+
+        from dex_screener_scraper.stream import ScreenerStream
+
+        async def record():
+
+            stream = ScreenerStream(args.url)
+            frames = []
+
+            try:
+
+                async for message in stream:
+
+                    frames.append(bytes(message))
+
+                    if (len(frames) >= args.count):
+
+                        break
+                    #
+                #
+            #
+            finally:
+
+                await stream.aclose()
+            #
+
+            return (frames)
+        #
+
+        frames = asyncio.run(record())
+    #
+    elif (args.live):
+
+        frames = live_frames(count=args.count, pairs=args.pairs)
+    #
+    else:
+
+        frames = [synthetic_frame(pairs=args.pairs, seed=seed) for seed in range(args.count)]
+    #
+
+    record_frames(frames, args.directory)
+    print(f"{len(frames)} frames written to {args.directory}")
+
+    return (0)
+#
+
+def command_serve(args) -> int:
+
+    async def serve():
+
+        source = FrameSource(args.frames, pairs=args.pairs, new_per_frame=args.new_per_frame)
+
+        async with FakeWebsocketServer(source, frames_per_connection=1, interval=args.interval, stream=args.stream, port=args.ws_port) as ws, \
+                   FakeTokenInfoServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate, missing_rate=args.missing_rate, port=args.api_port) as api:
+
+            print(f"Websocket feed      {ws.url}")
+            print(f"Token info endpoint {api.endpoint}")
+
+            await asyncio.Event().wait()
+        #
+    #
+
+    try:
+
+        asyncio.run(serve())
+    #
+    except KeyboardInterrupt:
+
+        pass
+    #
+
+    return (0)
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Main
+#
+def main(argv:list=None) -> int:
+
+    parser   = argparse.ArgumentParser(prog="python -m benchmarks", description="Offline benchmarks of the screener, against a fake DexScreener.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing  = commands.add_parser("list", help="list the scenarios")
+    listing.set_defaults(handler=command_list)
+
+    running  = commands.add_parser("run", help="run scenarios (all by default; a name, a name prefix or a group selects)")
+    running.add_argument("scenarios", nargs="*")
+    running.add_argument("--rounds", type=int, default=None, help="override the rounds of every scenario")
+    running.add_argument("--scale",  type=float, default=1.0, help="multiply the input sizes")
+    running.add_argument("--out",    default=None, help="write the results as JSON to this path")
+    running.add_argument("--json",   action="store_true", help="print the results as JSON")
+    running.set_defaults(handler=command_run)
+
+    comparing = commands.add_parser("compare", help="compare two results files")
+    comparing.add_argument("base")
+    comparing.add_argument("head")
+    comparing.add_argument("--threshold", type=float, default=0.10, help="relative change that counts as a regression")
+    comparing.add_argument("--stat",      default="median", choices=("median", "mean", "min", "p90"))
+    comparing.add_argument("--fail",      action="store_true", help="exit with status 1 on regressions")
+    comparing.set_defaults(handler=command_compare)
+
+    framing  = commands.add_parser("frames", help="write synthetic frames, or record live ones with --url, for replay")
+    framing.add_argument("directory")
+    framing.add_argument("--count", type=int, default=20)
+    framing.add_argument("--pairs", type=int, default=100)
+    framing.add_argument("--url",   default=None, help="record from this screener websocket instead")
+    framing.add_argument("--live",  action="store_true", help="a sequence in which most pairs repeat unchanged, like a live feed")
+    framing.set_defaults(handler=command_frames)
+
+    serving  = commands.add_parser("serve", help="run the fake websocket feed and token info API")
+    serving.add_argument("--frames",        default=None, help="directory of recorded *.bin frames to replay")
+    serving.add_argument("--pairs",         type=int,   default=100)
+    serving.add_argument("--new-per-frame", type=int,   default=10)
+    serving.add_argument("--interval",      type=float, default=1.0)
+    serving.add_argument("--stream",        action="store_true")
+    serving.add_argument("--ws-port",       type=int,   default=8765)
+    serving.add_argument("--api-port",      type=int,   default=8766)
+    serving.add_argument("--latency",       type=float, default=0.05)
+    serving.add_argument("--jitter",        type=float, default=0.0)
+    serving.add_argument("--error-rate",    type=float, default=0.0)
+    serving.add_argument("--throttle-rate", type=float, default=0.0)
+    serving.add_argument("--missing-rate",  type=float, default=0.0)
+    serving.set_defaults(handler=command_serve)
+
+    args = parser.parse_args(argv)
+
+    return (args.handler(args))
+#
+
+if (__name__ == "__main__"):
+
+    sys.exit(main())
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
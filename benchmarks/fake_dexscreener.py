@@ -0,0 +1,407 @@
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from benchmarks.frames import FrameSource
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### HTTP
+#
+async def read_http_head(reader:asyncio.StreamReader) -> tuple:
+
+    """Read a request line and its headers. Return (method, path, headers), or None on EOF."""
+
+    request = await reader.readline()
+
+    if (not request):
+
+        return (None)
+    #
+
+    headers = {}
+    while (True):
+
+        line = await reader.readline()
+
+        if (line in (b"\r\n", b"\n", b"")):
+
+            break
+        #
+
+        key, _, value               = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    #
+
+    method, path, *_ = request.decode("latin-1").split() + ["", ""]
+
+    return (method, path, headers)
+#
+
+def http_response(status:int, body:bytes, content_type:str="application/json", headers:dict=None) -> bytes:
+
+    reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}.get(status, "OK")
+    head   = [f"HTTP/1.1 {status} {reason}", f"Content-Type: {content_type}", f"Content-Length: {len(body)}"]
+    head  += [f"{key}: {value}" for key, value in (headers or {}).items()]
+
+    return (("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+#
+
+class FakeServer:
+
+    """Base of the fake servers: an asyncio TCP server on 127.0.0.1 with an ephemeral port by default."""
+
+    def __init__(self, host:str="127.0.0.1", port:int=0) -> None:
+
+        self.host    = host
+        self.port    = port
+        self._server = None
+        self._tasks  = set()
+    #
+
+    async def start(self):
+
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port    = self._server.sockets[0].getsockname()[1]
+
+        return (self)
+    #
+
+    async def _handle(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+
+        task = asyncio.current_task()
+        self._tasks.add(task)
+
+        try:
+
+            await self.handle(reader, writer)
+        #
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+
+            pass
+        #
+        finally:
+
+            self._tasks.discard(task)
+            writer.close()
+        #
+    #
+
+    async def handle(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+
+        raise NotImplementedError
+    #
+
+    async def aclose(self) -> None:
+
+        if (self._server is not None):
+
+            self._server.close()
+
+            for task in list(self._tasks):
+
+                task.cancel()
+            #
+
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        #
+    #
+
+    async def __aenter__(self):
+
+        return (await self.start())
+    #
+
+    async def __aexit__(self, *exc_info) -> None:
+
+        await self.aclose()
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Websocket
+#
+class FakeWebsocketServer(FakeServer):
+
+    """
+    Minimal RFC 6455 server that pushes pairs frames, like the DexScreener screener feed.
+
+    Every connection first gets `frames_per_connection` frames, `interval` seconds apart, and then
+    one more every `interval` seconds while `stream` is set. With `preamble`, a non-pairs frame is
+    sent first, as the real feed does.
+    """
+
+    def __init__(self, source:FrameSource=None, frames_per_connection:int=1, interval:float=0.0, stream:bool=False, preamble:bool=True, **kwargs) -> None:
+
+        super().__init__(**kwargs)
+
+        self.source                = source or FrameSource()
+        self.frames_per_connection = frames_per_connection
+        self.interval              = interval
+        self.stream                = stream
+        self.preamble              = preamble
+
+        self.connections           = 0
+        self.frames_sent           = 0
+        self.bytes_sent            = 0
+    #
+
+    @property
+    def url(self) -> str:
+
+        return (f"ws://{self.host}:{self.port}/dex/screener/v5/pairs/h24/1?rankBy[key]=pairAge&rankBy[order]=asc&filters[chainIds][0]=solana")
+    #
+
+    @staticmethod
+    def encode_frame(payload:bytes, opcode:int=0x2) -> bytes:
+
+        length = len(payload)
+
+        if (length < 126):
+
+            head = struct.pack("!BB", 0x80 | opcode, length)
+        #
+        elif (length < 2**16):
+
+            head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        #
+        else:
+
+            head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        #
+
+        return (head + payload)
+    #
+
+    @staticmethod
+    async def read_frame(reader:asyncio.StreamReader) -> tuple:
+
+        """Read one (masked) client frame. Return (opcode, payload)."""
+
+        first, second = await reader.readexactly(2)
+        length        = second & 0x7F
+
+        if (length == 126):
+
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        #
+        elif (length == 127):
+
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        #
+
+        mask    = await reader.readexactly(4) if (second & 0x80) else b"\x00\x00\x00\x00"
+        payload = await reader.readexactly(length)
+
+        return (first & 0x0F, bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload)))
+    #
+
+    async def handle(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+
+        head = await read_http_head(reader)
+
+        if (head is None) or ("sec-websocket-key" not in head[2]):
+
+            writer.write(http_response(404, b"not a websocket request\n", "text/plain"))
+            await writer.drain()
+            return
+        #
+
+        accept = base64.b64encode(hashlib.sha1((head[2]["sec-websocket-key"] + WEBSOCKET_GUID).encode()).digest()).decode()
+
+        writer.write((f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        await writer.drain()
+
+        self.connections += 1
+        pusher            = asyncio.create_task(self.push(writer))
+
+        try:
+
+            while (True):
+
+                opcode, payload = await self.read_frame(reader)
+
+                if (opcode == 0x8):
+
+                    writer.write(self.encode_frame(payload[:2], opcode=0x8))
+                    await writer.drain()
+                    break
+                #
+                elif (opcode == 0x9):
+
+                    writer.write(self.encode_frame(payload, opcode=0xA))
+                #
+            #
+        #
+        finally:
+
+            pusher.cancel()
+            await asyncio.gather(pusher, return_exceptions=True)
+        #
+    #
+
+    async def push(self, writer:asyncio.StreamWriter) -> None:
+
+        if (self.preamble):
+
+            writer.write(self.encode_frame(b"\x00\n1.3.0\n\x0cconfig"))
+        #
+
+        sent = 0
+        while (sent < self.frames_per_connection) or (self.stream):
+
+            if (sent) and (self.interval):
+
+                await asyncio.sleep(self.interval)
+            #
+
+            frame             = self.source.next_frame()
+            writer.write(self.encode_frame(frame))
+            await writer.drain()
+
+            sent             += 1
+            self.frames_sent += 1
+            self.bytes_sent  += len(frame)
+        #
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### TokenInfo
+#
+class FakeTokenInfoServer(FakeServer):
+
+    """
+    Keep-alive HTTP/1.1 server for `GET /tokens/v1/<chain>/<address>,<address>,...`.
+
+    Every request waits `latency` (+ up to `jitter`) seconds. It then fails with a 429 with
+    probability `throttle_rate`, or with a 500 with probability `error_rate`. Otherwise it answers
+    with one pair per address, leaving each address out with probability `missing_rate`.
+    """
+
+    def __init__(self, latency:float=0.0, jitter:float=0.0, error_rate:float=0.0, throttle_rate:float=0.0, retry_after:int=0, missing_rate:float=0.0, seed:int=0, **kwargs) -> None:
+
+        super().__init__(**kwargs)
+
+        self.latency       = latency
+        self.jitter        = jitter
+        self.error_rate    = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after   = retry_after
+        self.missing_rate  = missing_rate
+        self.rng           = random.Random(seed)
+
+        self.requests      = 0
+        self.addresses     = 0
+        self.statuses      = {}
+    #
+
+    @property
+    def endpoint(self) -> str:
+
+        """Drop-in value for `screener.DS_TOKEN_INFO_ENDPOINT`."""
+
+        return (f"http://{self.host}:{self.port}/tokens/v1/{{chain}}/")
+    #
+
+    async def handle(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+
+        while (True):
+
+            head = await read_http_head(reader)
+
+            if (head is None):
+
+                return
+            #
+
+            writer.write(await self.respond(head[0], head[1]))
+            await writer.drain()
+
+            if (head[2].get("connection", "").lower() == "close"):
+
+                return
+            #
+        #
+    #
+
+    async def respond(self, method:str, path:str) -> bytes:
+
+        parts = path.split("?", 1)[0].strip("/").split("/")
+
+        if (method != "GET") or (len(parts) != 4) or (parts[:2] != ["tokens", "v1"]):
+
+            return (self.count(http_response(404, b'{"error":"not found"}'), 404))
+        #
+
+        chain, addresses = parts[2], [address for address in parts[3].split(",") if address]
+
+        self.requests  += 1
+        self.addresses += len(addresses)
+
+        if (self.latency) or (self.jitter):
+
+            await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+        #
+
+        roll = self.rng.random()
+
+        if (roll < self.throttle_rate):
+
+            return (self.count(http_response(429, b'{"error":"rate limited"}', headers={"Retry-After": self.retry_after}), 429))
+        #
+        elif (roll < self.throttle_rate + self.error_rate):
+
+            return (self.count(http_response(500, b'{"error":"internal"}'), 500))
+        #
+
+        pairs = [self.pair(chain, address) for address in addresses if (self.rng.random() >= self.missing_rate)]
+
+        return (self.count(http_response(200, json.dumps(pairs).encode()), 200))
+    #
+
+    def count(self, response:bytes, status:int) -> bytes:
+
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+        return (response)
+    #
+
+    @staticmethod
+    def pair(chain:str, address:str) -> dict:
+
+        symbol = address[:4].upper()
+
+        return ({
+            "chainId"     : chain,
+            "dexId"       : "raydium",
+            "pairAddress" : address[::-1],
+            "baseToken"   : {"address": address, "name": f"{symbol} Coin", "symbol": symbol},
+            "quoteToken"  : {"address": "So11111111111111111111111111111111111111112", "name": "Wrapped SOL", "symbol": "SOL"},
+            "priceNative" : "0.0000001",
+            "priceUsd"    : "0.000015",
+            "txns"        : {"m5": {"buys": 3, "sells": 1}, "h1": {"buys": 40, "sells": 22}, "h24": {"buys": 410, "sells": 305}},
+            "volume"      : {"m5": 120.5, "h1": 2_250.0, "h24": 41_800.25},
+            "priceChange" : {"m5": 0.4, "h1": -3.1, "h24": 120.0},
+            "liquidity"   : {"usd": 18_400.5, "base": 612_000_000, "quote": 52.3},
+            "fdv"         : 15_000,
+            "marketCap"   : 15_000,
+            "pairCreatedAt": 1_760_000_000_000,
+        })
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
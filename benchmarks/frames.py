@@ -0,0 +1,191 @@
+import glob
+import os
+import random
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from dex_screener_scraper.protocol import PROTOCOL_HEADER, PAIRS_MARKER
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+QUOTE_MINT      = "So11111111111111111111111111111111111111112"
+DEXES           = ("raydium", "pumpswap", "meteora", "orca")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Frames
+#
+def avro_long(value:int) -> bytes:
+
+    value = (value << 1) ^ (value >> 63)
+    out   = bytearray()
+
+    while (value & ~0x7F):
+
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    #
+    out.append(value)
+
+    return (bytes(out))
+#
+
+def avro_string(text:str) -> bytes:
+
+    data = text.encode("utf-8")
+
+    return (avro_long(len(data)) + data)
+#
+
+def random_mint(rng:random.Random) -> str:
+
+    """A Solana-style mint: 44 base58 chars, a 43-char one, or a pump.fun one ending in "pump"."""
+
+    kind  = rng.random()
+    first = rng.choice(BASE58_ALPHABET)
+
+    if (kind < 0.5):
+
+        return (first + "".join(rng.choices(BASE58_ALPHABET, k=39)) + "pump")
+    #
+    elif (kind < 0.8):
+
+        return (first + "".join(rng.choices(BASE58_ALPHABET, k=43)))
+    #
+    else:
+
+        return ("".join(rng.choices(BASE58_ALPHABET, k=43)))
+    #
+#
+
+def pair_record(rng:random.Random, base_mint:str) -> bytes:
+
+    """One 1.3.0 pair record: chain, dex, pair address, base token, quote token, prices and a few non-string fields."""
+
+    symbol = "".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=rng.randint(3, 6)))
+    name   = symbol.title() + " Coin"
+    price  = rng.uniform(1e-9, 1e-3)
+
+    return (b"".join([
+        avro_string("solana"),
+        avro_string(rng.choice(DEXES)),
+        b"\x00",
+        avro_string("".join(rng.choices(BASE58_ALPHABET, k=44))),
+        avro_string(base_mint),
+        avro_string(name),
+        avro_string(symbol),
+        avro_string(QUOTE_MINT),
+        avro_string("Wrapped SOL"),
+        avro_string("SOL"),
+        avro_string(f"{price:.10f}"),
+        avro_string(f"{price * 150:.8f}"),
+        b"\x00\x01\x00",
+    ]))
+#
+
+def pairs_frame(records:list) -> bytes:
+
+    return (PROTOCOL_HEADER + avro_string(PAIRS_MARKER.decode()) + avro_long(len(records)) + b"".join(records) + b"\x00")
+#
+
+def synthetic_frame(pairs:int=100, seed:int=0, mints:list=None) -> bytes:
+
+    """A synthetic pairs frame with `pairs` new pairs (or one per given mint)."""
+
+    rng   = random.Random(seed)
+    mints = mints if (mints is not None) else [random_mint(rng) for _ in range(pairs)]
+
+    return (pairs_frame([pair_record(rng, mint) for mint in mints]))
+#
+
+def live_frames(count:int=20, pairs:int=100, new_per_frame:int=5, repriced:float=0.2, repeat_every:int=3, seed:int=0) -> list:
+
+    """
+    Frames shaped like a live feed: a pair keeps its bytes from frame to frame until it is repriced
+    (a `repriced` share of them per frame), `new_per_frame` new pairs arrive on top, and every
+    `repeat_every`-th frame is the previous one again.
+    """
+
+    rng     = random.Random(seed)
+    records = {}
+    recent  = []
+    frames  = []
+
+    for i in range(count):
+
+        if (frames) and (repeat_every) and (i % repeat_every == 0):
+
+            frames.append(frames[-1])
+            continue
+        #
+
+        recent  = ([random_mint(rng) for _ in range(new_per_frame if recent else pairs)] + recent)[:pairs]
+        records = {mint: records[mint] for mint in recent if (mint in records) and (rng.random() >= repriced)}
+
+        for mint in recent:
+
+            if (mint not in records):
+
+                records[mint] = pair_record(random.Random(rng.randrange(2**32)), mint)
+            #
+        #
+
+        frames.append(pairs_frame([records[mint] for mint in recent]))
+    #
+
+    return (frames)
+#
+
+class FrameSource:
+
+    """
+    Endless supply of pairs frames: given `frames` or recorded `*.bin` frames from a directory,
+    replayed in turn, or synthetic frames in which `new_per_frame` pairs are new and the rest repeat
+    recent ones.
+    """
+
+    def __init__(self, directory:str=None, pairs:int=100, new_per_frame:int=10, seed:int=0, frames:list=None) -> None:
+
+        self.recorded      = list(frames) if frames else [open(path, "rb").read() for path in sorted(glob.glob(os.path.join(directory, "*.bin")))] if directory else []
+        self.pairs         = pairs
+        self.new_per_frame = new_per_frame
+        self.rng           = random.Random(seed)
+        self.recent        = [random_mint(self.rng) for _ in range(pairs)]
+        self.served        = 0
+    #
+
+    def next_frame(self) -> bytes:
+
+        self.served += 1
+
+        if (self.recorded):
+
+            return (self.recorded[(self.served - 1) % len(self.recorded)])
+        #
+
+        fresh       = [random_mint(self.rng) for _ in range(self.new_per_frame)]
+        self.recent = (fresh + self.recent)[:self.pairs]
+
+        return (synthetic_frame(seed=self.rng.randrange(2**32), mints=self.recent))
+    #
+#
+
+def record_frames(frames:list, directory:str) -> None:
+
+    """Save frames as `frame_0000.bin`, ... so they can be replayed by FrameSource."""
+
+    os.makedirs(directory, exist_ok=True)
+
+    for i, frame in enumerate(frames):
+
+        with open(os.path.join(directory, f"frame_{i:04d}.bin"), "wb") as f:
+
+            f.write(frame)
+        #
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
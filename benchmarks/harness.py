@@ -0,0 +1,262 @@
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+SCENARIOS = {}
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Scenarios
+#
+def scenario(name:str, group:str="micro", rounds:int=20, warmup:int=2):
+
+    """Register `async def bench(b, scale)` as a scenario. It sets up inputs sized by `scale` and calls `await b(func)` once."""
+
+    def register(func):
+
+        SCENARIOS[name] = {"func": func, "group": group, "rounds": rounds, "warmup": warmup}
+
+        return (func)
+    #
+
+    return (register)
+#
+
+class SkipScenario(Exception):
+
+    """Raised by a scenario that can not run here, e.g. because an optional dependency is missing."""
+#
+
+class Bench:
+
+    """
+    What a scenario gets to measure with, pytest-benchmark style: `await b(func, inner=n)` runs
+    `func` (sync or async) `n` times per round and records the time per call. `b.extra` holds any
+    scenario-specific numbers, e.g. throughput or error counts.
+    """
+
+    def __init__(self, name:str, rounds:int, warmup:int) -> None:
+
+        self.name    = name
+        self.rounds  = rounds
+        self.warmup  = warmup
+        self.timings = []
+        self.inner   = 1
+        self.extra   = {}
+    #
+
+    async def __call__(self, func, inner:int=1, setup=None) -> None:
+
+        """Measure `func`. `setup`, if given, runs before every round, outside of the timing."""
+
+        is_async   = inspect.iscoroutinefunction(func)
+        self.inner = inner
+
+        for index in range(self.warmup + self.rounds):
+
+            if (setup is not None):
+
+                result = setup()
+
+                if (inspect.isawaitable(result)):
+
+                    await result
+                #
+            #
+
+            started = time.perf_counter()
+
+            if (is_async):
+
+                for _ in range(inner):
+
+                    await func()
+                #
+            #
+            else:
+
+                for _ in range(inner):
+
+                    func()
+                #
+            #
+
+            elapsed = time.perf_counter() - started
+
+            if (index >= self.warmup):
+
+                self.timings.append(elapsed / inner)
+            #
+        #
+    #
+
+    def stats(self) -> dict:
+
+        timings = sorted(self.timings)
+
+        if (not timings):
+
+            return ({"rounds": 0, "extra": self.extra})
+        #
+
+        mean = statistics.fmean(timings)
+
+        return ({
+            "rounds"      : len(timings),
+            "inner"       : self.inner,
+            "min"         : timings[0],
+            "max"         : timings[-1],
+            "mean"        : mean,
+            "median"      : statistics.median(timings),
+            "stddev"      : statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            "p90"         : timings[min(len(timings) - 1, int(0.9 * len(timings)))],
+            "ops_per_sec" : 1.0 / mean if mean else 0.0,
+            "extra"       : self.extra,
+        })
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Runner
+#
+def machine_info() -> dict:
+
+    try:
+
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, cwd=os.path.dirname(__file__)).stdout.strip()
+    #
+    except Exception:
+
+        commit = ""
+    #
+
+    return ({
+        "commit"    : commit,
+        "python"    : sys.version.split()[0],
+        "platform"  : platform.platform(),
+        "machine"   : platform.machine(),
+        "cpus"      : os.cpu_count(),
+        "timestamp" : time.time(),
+    })
+#
+
+async def run_scenarios(names:list=None, rounds:int=None, scale:float=1.0) -> dict:
+
+    """Run the selected scenarios (all of them by default). Return the results document."""
+
+    results = {"machine": machine_info(), "scale": scale, "benchmarks": {}}
+
+    for name, spec in SCENARIOS.items():
+
+        if (names) and (not any(name == selected or name.startswith(selected + "_") or spec["group"] == selected for selected in names)):
+
+            continue
+        #
+
+        bench = Bench(name, rounds=rounds or spec["rounds"], warmup=spec["warmup"])
+
+        try:
+
+            await spec["func"](bench, scale)
+            entry = {"group": spec["group"], **bench.stats()}
+
+            print(f"{name:<36} {format_seconds(entry['median']):>12} median  {format_seconds(entry['min']):>12} min  {entry['rounds']:>4} rounds", flush=True)
+        #
+        except SkipScenario as e:
+
+            entry = {"group": spec["group"], "skipped": str(e)}
+
+            print(f"{name:<36} skipped • {e}", flush=True)
+        #
+
+        results["benchmarks"][name] = entry
+    #
+
+    return (results)
+#
+
+def run(names:list=None, rounds:int=None, scale:float=1.0) -> dict:
+
+    return (asyncio.run(run_scenarios(names, rounds, scale)))
+#
+
+def save_results(results:dict, path:str) -> None:
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    with open(path, "w") as f:
+
+        json.dump(results, f, indent=2)
+    #
+#
+
+def load_results(path:str) -> dict:
+
+    with open(path) as f:
+
+        return (json.load(f))
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Compare
+#
+def format_seconds(seconds:float) -> str:
+
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+
+        if (seconds >= scale):
+
+            return (f"{seconds / scale:.3f} {unit}")
+        #
+    #
+
+    return (f"{seconds / 1e-9:.1f} ns")
+#
+
+def compare(base:dict, head:dict, threshold:float=0.10, stat:str="median") -> tuple:
+
+    """Compare two results documents. Return (report lines, names of scenarios slower than `threshold`)."""
+
+    lines      = [f"base {base['machine'].get('commit', '?')} • head {head['machine'].get('commit', '?')} • {stat}",
+                  f"{'scenario':<36} {'base':>12} {'head':>12} {'change':>9}"]
+    regressed  = []
+
+    for name in sorted(set(base["benchmarks"]) | set(head["benchmarks"])):
+
+        before = base["benchmarks"].get(name, {})
+        after  = head["benchmarks"].get(name, {})
+
+        if (stat not in before) or (stat not in after):
+
+            lines.append(f"{name:<36} {'-' if stat not in before else format_seconds(before[stat]):>12} {'-' if stat not in after else format_seconds(after[stat]):>12}")
+            continue
+        #
+
+        change = (after[stat] - before[stat]) / before[stat] if before[stat] else 0.0
+        flag   = "  slower" if (change > threshold) else ("  faster" if (change < -threshold) else "")
+
+        if (change > threshold):
+
+            regressed.append(name)
+        #
+
+        lines.append(f"{name:<36} {format_seconds(before[stat]):>12} {format_seconds(after[stat]):>12} {change:>+8.1%}{flag}")
+    #
+
+    return (lines, regressed)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
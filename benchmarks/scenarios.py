@@ -0,0 +1,1341 @@
+import asyncio
+import contextlib
+import glob
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import statistics
+import tempfile
+import time
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from benchmarks.harness          import scenario, SkipScenario
+from benchmarks.frames           import FrameSource, synthetic_frame, live_frames, random_mint
+from benchmarks.fake_dexscreener import FakeWebsocketServer, FakeTokenInfoServer
+
+from dex_screener_scraper.decoder        import decode_pairs_frame
+from dex_screener_scraper.protocol       import parse_pairs_frame, read_pairs_frame, PairsFrameParser
+from dex_screener_scraper.fingerprint    import FrameFingerprint, read_segments, split_pairs_frame
+from dex_screener_scraper.metadata_cache import MetadataCache, MISSING
+from dex_screener_scraper.retry          import RetryQueue
+from dex_screener_scraper.store          import MintStore
+from dex_screener_scraper.history        import TokenHistory
+from dex_screener_scraper.events         import EventBus, NewToken
+from dex_screener_scraper.market         import MarketSnapshots, pair_row
+
+from utils.seen_index   import SeenIndex
+from utils.rate_limiter import TokenBucketLimiter
+from utils.metrics      import MetricsRegistry
+from utils.offload      import Offloader, LoopLagMonitor
+import utils.jsonlib   as jsonlib
+import utils.datetimer as datetimer
+import utils.logger    as logger_module
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Helpers
+#
+def mints(count:int, seed:int=0) -> list:
+
+    rng = random.Random(seed)
+
+    return ([random_mint(rng) for _ in range(count)])
+#
+
+@contextlib.contextmanager
+def temporary_directory():
+
+    directory = tempfile.mkdtemp(prefix="ds_bench_")
+
+    try:
+
+        yield (directory)
+    #
+    finally:
+
+        shutil.rmtree(directory, ignore_errors=True)
+    #
+#
+
+def import_screener():
+
+    """Import the screener module, or skip the scenario when its HTTP dependencies are missing."""
+
+    try:
+
+        import dex_screener_scraper.screener as screener_module
+
+        # The HTTP clients import their backends lazily.
+        import httpx
+        import curl_cffi
+    #
+    except ImportError as e:
+
+        raise SkipScenario(f"screener dependencies are missing ({e.name})")
+    #
+
+    return (screener_module)
+#
+
+@contextlib.asynccontextmanager
+async def offline_pool(feeds:list, api:FakeTokenInfoServer, rate:float=1000.0):
+
+    """A ScreenerPool of the given feeds wired to the fake token info API, with its storage in a temporary directory."""
+
+    screener_module = import_screener()
+    Screener        = screener_module.Screener
+    endpoint        = screener_module.DS_TOKEN_INFO_ENDPOINT
+    warm_start      = screener_module.METADATA_CACHE_WARM_START
+    limiter         = Screener.ds_limiter
+
+    from dex_screener_scraper.pool import ScreenerPool
+
+    with temporary_directory() as directory:
+
+        screener_module.DS_TOKEN_INFO_ENDPOINT    = api.endpoint
+        screener_module.METADATA_CACHE_WARM_START = False
+        Screener.ds_limiter                       = TokenBucketLimiter(rate=rate, burst=max(1, int(rate)))
+
+        pool = ScreenerPool(feeds, store_dir=directory, history=False, market=False, tracker=False)
+
+        # The feeds share the metadata cache of the first one.
+        pool.screeners[0].metadata_cache.path = os.path.join(directory, "token_metadata.bin")
+
+        try:
+
+            yield (pool)
+        #
+        finally:
+
+            await pool.aclose()
+
+            screener_module.DS_TOKEN_INFO_ENDPOINT    = endpoint
+            screener_module.METADATA_CACHE_WARM_START = warm_start
+            Screener.ds_limiter                       = limiter
+        #
+    #
+#
+
+@contextlib.asynccontextmanager
+async def offline_screener(websocket_url:str, api:FakeTokenInfoServer, rate:float=1000.0):
+
+    """A Screener wired to the fake servers, with its storage in a temporary directory."""
+
+    screener_module = import_screener()
+    Screener        = screener_module.Screener
+    endpoint        = screener_module.DS_TOKEN_INFO_ENDPOINT
+    limiter         = Screener.ds_limiter
+
+    with temporary_directory() as directory:
+
+        screener_module.DS_TOKEN_INFO_ENDPOINT = api.endpoint
+        Screener.ds_limiter                    = TokenBucketLimiter(rate=rate, burst=max(1, int(rate)))
+
+        screener = Screener(websocket_url,
+                            store          = MintStore(directory),
+                            history        = TokenHistory(os.path.join(directory, "history.sqlite3")),
+                            metadata_cache = MetadataCache(path=os.path.join(directory, "token_metadata.bin")))
+
+        try:
+
+            yield (screener)
+        #
+        finally:
+
+            await screener.aclose()
+            screener.history.close()
+
+            screener_module.DS_TOKEN_INFO_ENDPOINT = endpoint
+            Screener.ds_limiter                    = limiter
+        #
+    #
+#
+
+def quiet_loggers(level:int=logging.WARNING) -> None:
+
+    """Raise the level of the package loggers, so console logging does not dominate the cycle benchmarks."""
+
+    for name in ("Screener", "ScreenerStream", "MintPipeline", "MetadataCache", "MintStore", "TokenHistory", "ScreenerPool", "Supervisor"):
+
+        logging.getLogger(name).setLevel(level)
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Frames
+#
+@scenario("decode_frame")
+async def bench_decode_frame(b, scale):
+
+    frame = synthetic_frame(pairs=int(200 * scale), seed=1)
+
+    await b(lambda: decode_pairs_frame(frame), inner=20)
+
+    b.extra["frame_bytes"]    = len(frame)
+    b.extra["mb_per_sec"]     = len(frame) / min(b.timings) / 1e6
+    b.extra["matches_parser"] = decode_pairs_frame(frame) == [pair.base_mint for pair in parse_pairs_frame(frame)]
+#
+
+def legacy_decode(message:bytes) -> list:
+
+    """The decoder of Screener.decode before the compiled regex pass, kept to compare against."""
+
+    decoded_text   = ''.join(chr(b) if 32 <= b <= 126 else ' ' for b in message)
+    words          = [word for word in decoded_text.split() if len(word) >= 55]
+    filtered_words = [re.sub(r'["*<$@(),.].*', '', word) for word in words]
+    extracted_data = []
+
+    for token in filtered_words:
+
+        if ("0x" in token):
+
+            token = re.findall(r'(0x[0-9a-fA-F]+)', token)[-1]
+        #
+        elif ("pump" in token):
+
+            token = re.findall(r".{0,40}pump", token)[0]
+            token = token[1:] if token.startswith("V") else token
+        #
+        else:
+
+            token = token[-44:]
+            token = token[1:] if token.startswith("V") else token
+        #
+
+        extracted_data.append(token)
+    #
+
+    return (extracted_data)
+#
+
+@scenario("decode_frame_legacy")
+async def bench_decode_frame_legacy(b, scale):
+
+    frame = synthetic_frame(pairs=int(200 * scale), seed=1)
+
+    await b(lambda: legacy_decode(frame), inner=5)
+
+    b.extra["frame_bytes"]     = len(frame)
+    b.extra["mb_per_sec"]      = len(frame) / min(b.timings) / 1e6
+    b.extra["differing_mints"] = sum(old != new for old, new in zip(legacy_decode(frame), decode_pairs_frame(frame)))
+#
+
+@scenario("parse_frame")
+async def bench_parse_frame(b, scale):
+
+    frame = synthetic_frame(pairs=int(200 * scale), seed=1)
+
+    await b(lambda: parse_pairs_frame(frame), inner=5)
+
+    b.extra["frame_bytes"] = len(frame)
+    b.extra["mb_per_sec"]  = len(frame) / min(b.timings) / 1e6
+#
+
+@scenario("parse_frame_chunked")
+async def bench_parse_frame_chunked(b, scale):
+
+    frame  = synthetic_frame(pairs=int(200 * scale), seed=1)
+    chunks = [frame[i:i+4096] for i in range(0, len(frame), 4096)]
+
+    def parse():
+
+        parser = PairsFrameParser()
+
+        for chunk in chunks:
+
+            parser.feed(chunk)
+        #
+        parser.close()
+    #
+
+    await b(parse, inner=5)
+
+    b.extra["chunks"] = len(chunks)
+#
+
+async def bench_offload_frame(b, scale, kind:str):
+
+    """Frame parsing through an Offloader of `kind`, while a LoopLagMonitor measures how long the loop stalls."""
+
+    frames    = [synthetic_frame(pairs=int(500 * scale), seed=seed) for seed in range(4)]
+    offloader = Offloader(kind=kind, workers=2, min_bytes=0)
+    monitor   = LoopLagMonitor(interval=0.001)
+
+    await offloader.run(read_pairs_frame, frames[0])
+
+    monitor.start()
+
+    try:
+
+        async def parse():
+
+            await asyncio.gather(*[offloader.run(read_pairs_frame, frame) for frame in frames])
+        #
+
+        monitor.cycle()
+        started = time.perf_counter()
+
+        await b(parse)
+
+        elapsed = time.perf_counter() - started
+        lag     = monitor.cycle()
+    #
+    finally:
+
+        await monitor.aclose()
+        offloader.shutdown()
+    #
+
+    b.extra["frames_per_round"] = len(frames)
+    b.extra["frame_bytes"]      = len(frames[0])
+    b.extra["max_loop_lag_ms"]  = lag["max"] * 1000
+    b.extra["blocked_share"]    = min(1.0, lag["blocked"] / elapsed)
+#
+
+@scenario("offload_frame_inline", rounds=10)
+async def bench_offload_frame_inline(b, scale):
+
+    await bench_offload_frame(b, scale, kind=None)
+#
+
+@scenario("offload_frame_thread", rounds=10)
+async def bench_offload_frame_thread(b, scale):
+
+    await bench_offload_frame(b, scale, kind="thread")
+#
+
+@scenario("offload_frame_process", rounds=10)
+async def bench_offload_frame_process(b, scale):
+
+    await bench_offload_frame(b, scale, kind="process")
+#
+
+@scenario("json_loads_token_info")
+async def bench_json_loads(b, scale):
+
+    body = json.dumps([FakeTokenInfoServer.pair("solana", mint) for mint in mints(int(30 * scale))]).encode()
+
+    await b(lambda: jsonlib.loads(body), inner=50)
+
+    b.extra["backend"]    = jsonlib.BACKEND
+    b.extra["body_bytes"] = len(body)
+#
+
+def frame_sequence(scale) -> list:
+
+    """Recorded `*.bin` frames from $BENCH_FRAMES_DIR, else a synthetic sequence shaped like a live feed."""
+
+    directory = os.environ.get("BENCH_FRAMES_DIR")
+    recorded  = FrameSource(directory).recorded if (directory) else []
+
+    return (recorded or live_frames(count=30, pairs=int(200 * scale)))
+#
+
+def fingerprint_frames(frames:list) -> tuple:
+
+    fingerprint = FrameFingerprint()
+    mints       = []
+
+    for frame in frames:
+
+        plan = fingerprint.prepare(frame)
+
+        if (plan is not None):
+
+            fingerprint.commit(plan, read_segments(plan.missing))
+        #
+
+        mints.append(fingerprint.mints)
+    #
+
+    return (fingerprint, mints)
+#
+
+@scenario("frame_sequence_full", group="frame_sequence", rounds=10)
+async def bench_frame_sequence_full(b, scale):
+
+    """Every frame of a sequence parsed and decoded whole, as before the pairs were read only for unseen mints."""
+
+    frames = frame_sequence(scale)
+    cpu    = []
+
+    def ingest():
+
+        started = time.process_time()
+
+        for frame in frames:
+
+            read_pairs_frame(frame)
+        #
+
+        cpu.append(time.process_time() - started)
+    #
+
+    await b(ingest)
+
+    b.extra["frames"]           = len(frames)
+    b.extra["cpu_ms_per_frame"] = statistics.median(cpu) / len(frames) * 1000
+#
+
+@scenario("frame_sequence_decode", group="frame_sequence", rounds=10)
+async def bench_frame_sequence_decode(b, scale):
+
+    """Every frame of a sequence decoded whole, as without the fingerprint: the baseline it has to beat."""
+
+    frames = frame_sequence(scale)
+    cpu    = []
+
+    def ingest():
+
+        started = time.process_time()
+
+        for frame in frames:
+
+            decode_pairs_frame(frame)
+        #
+
+        cpu.append(time.process_time() - started)
+    #
+
+    await b(ingest)
+
+    b.extra["frames"]           = len(frames)
+    b.extra["cpu_ms_per_frame"] = statistics.median(cpu) / len(frames) * 1000
+#
+
+@scenario("frame_sequence_fingerprint", group="frame_sequence", rounds=10)
+async def bench_frame_sequence_fingerprint(b, scale):
+
+    """The same sequence through a FrameFingerprint: unchanged frames and segments are skipped."""
+
+    frames = frame_sequence(scale)
+    cpu    = []
+
+    def ingest():
+
+        started = time.process_time()
+        fingerprint_frames(frames)
+        cpu.append(time.process_time() - started)
+    #
+
+    await b(ingest)
+
+    fingerprint, mints = fingerprint_frames(frames)
+    stats              = fingerprint.stats()
+    started            = time.process_time()
+
+    for frame in frames:
+
+        split_pairs_frame(frame)
+    #
+
+    b.extra["split_ms_per_frame"] = (time.process_time() - started) / len(frames) * 1000
+
+    b.extra["frames"]           = len(frames)
+    b.extra["cpu_ms_per_frame"] = statistics.median(cpu) / len(frames) * 1000
+    b.extra["skipped_frames"]   = stats["skipped_frames"]
+    b.extra["skipped_share"]    = stats["skipped_bytes"] / sum(len(frame) for frame in frames)
+    b.extra["matches_full"]     = mints == [decode_pairs_frame(frame) for frame in frames]
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### State
+#
+@scenario("seen_index_exact")
+async def bench_seen_index_exact(b, scale):
+
+    keys  = mints(int(10_000 * scale))
+    state = {}
+
+    def reset():
+
+        state["index"] = SeenIndex(max_size=200_000, ttl=86400)
+    #
+
+    def churn():
+
+        index = state["index"]
+
+        for key in keys:
+
+            if (key not in index):
+
+                index.add(key)
+            #
+        #
+    #
+
+    await b(churn, setup=reset)
+
+    b.extra["keys"] = len(keys)
+#
+
+@scenario("seen_index_bloom")
+async def bench_seen_index_bloom(b, scale):
+
+    keys  = mints(int(10_000 * scale))
+    state = {}
+
+    def reset():
+
+        state["index"] = SeenIndex(max_size=200_000, bloom=True)
+    #
+
+    def churn():
+
+        index = state["index"]
+
+        for key in keys:
+
+            if (key not in index):
+
+                index.add(key)
+            #
+        #
+    #
+
+    await b(churn, setup=reset)
+
+    b.extra["keys"] = len(keys)
+#
+
+async def bench_seen_index_lookup(b, scale, size:int, bloom:bool):
+
+    """Lookups in an index holding `size` mints: half of the probes are in it, half are not."""
+
+    size   = max(1000, int(size * scale))
+    index  = SeenIndex(max_size=size, bloom=bloom) if (bloom) else SeenIndex(max_size=size, ttl=86400)
+    # Cheap keys of the length of a mint: generating 10M random ones would take minutes.
+    key    = "{:044d}".format
+
+    for number in range(size):
+
+        index.add(key(number))
+    #
+
+    probes = [key(number * 7919 % size) for number in range(5000)] + [key(size + number) for number in range(5000)]
+
+    def lookup():
+
+        for probe in probes:
+
+            probe in index
+        #
+    #
+
+    await b(lookup)
+
+    b.extra["size"]   = size
+    b.extra["probes"] = len(probes)
+#
+
+@scenario("seen_index_lookup_exact_1k", group="lookup", rounds=10)
+async def bench_seen_index_lookup_exact_1k(b, scale):
+
+    await bench_seen_index_lookup(b, scale, 1_000, bloom=False)
+#
+
+@scenario("seen_index_lookup_exact_100k", group="lookup", rounds=10)
+async def bench_seen_index_lookup_exact_100k(b, scale):
+
+    await bench_seen_index_lookup(b, scale, 100_000, bloom=False)
+#
+
+@scenario("seen_index_lookup_exact_10m", group="lookup", rounds=10, warmup=1)
+async def bench_seen_index_lookup_exact_10m(b, scale):
+
+    await bench_seen_index_lookup(b, scale, 10_000_000, bloom=False)
+#
+
+@scenario("seen_index_lookup_bloom_1k", group="lookup", rounds=10)
+async def bench_seen_index_lookup_bloom_1k(b, scale):
+
+    await bench_seen_index_lookup(b, scale, 1_000, bloom=True)
+#
+
+@scenario("seen_index_lookup_bloom_100k", group="lookup", rounds=10)
+async def bench_seen_index_lookup_bloom_100k(b, scale):
+
+    await bench_seen_index_lookup(b, scale, 100_000, bloom=True)
+#
+
+@scenario("seen_index_lookup_bloom_10m", group="lookup", rounds=10, warmup=1)
+async def bench_seen_index_lookup_bloom_10m(b, scale):
+
+    await bench_seen_index_lookup(b, scale, 10_000_000, bloom=True)
+#
+
+@scenario("metadata_cache_get_put")
+async def bench_metadata_cache_get_put(b, scale):
+
+    keys  = mints(int(10_000 * scale))
+    cache = MetadataCache(max_size=len(keys) // 2)
+
+    def churn():
+
+        for key in keys:
+
+            if (cache.get(key) is MISSING):
+
+                cache.put(key, key[:4])
+            #
+        #
+    #
+
+    await b(churn)
+
+    b.extra["hit_rate"] = cache.hit_rate
+#
+
+@scenario("metadata_cache_warm_start", rounds=5, warmup=1)
+async def bench_metadata_cache_warm_start(b, scale):
+
+    quiet_loggers()
+
+    with temporary_directory() as directory:
+
+        path  = os.path.join(directory, "token_metadata.bin")
+        cache = MetadataCache(path=path)
+
+        for key in mints(int(100_000 * scale)):
+
+            cache.put(key, key[:4])
+        #
+
+        await b(cache.save)
+        b.extra["snapshot_save_sec"] = min(b.timings)
+        b.timings                    = []
+
+        await b(MetadataCache(path=path).load)
+        b.extra["entries"] = len(cache)
+    #
+#
+
+@scenario("retry_queue")
+async def bench_retry_queue(b, scale):
+
+    keys  = mints(int(1_000 * scale))
+    queue = RetryQueue(base_delay=0.0, max_delay=0.0, max_in_flight=len(keys))
+
+    def cycle():
+
+        for key in keys:
+
+            queue.schedule(key)
+        #
+
+        for key in queue.pop_due():
+
+            queue.finish(key)
+        #
+    #
+
+    await b(cycle)
+#
+
+@scenario("rate_limiter_acquire")
+async def bench_rate_limiter_acquire(b, scale):
+
+    limiter = TokenBucketLimiter(rate=1e12, burst=10**12)
+
+    await b(limiter.acquire, inner=10_000)
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Utils
+#
+@scenario("datetimer_now_yyyy_mm_dd")
+async def bench_datetimer_day(b, scale):
+
+    await b(datetimer.now_yyyy_mm_dd, inner=10_000)
+#
+
+@scenario("datetimer_now_timestamp_string")
+async def bench_datetimer_second(b, scale):
+
+    await b(datetimer.now_yyyy_mm__dd_hh_mm_ss, inner=10_000)
+#
+
+async def bench_logger(b, scale, async_log:bool):
+
+    with temporary_directory() as directory:
+
+        log_dir                = logger_module.LOG_DIR
+        logger_module.LOG_DIR  = directory
+
+        try:
+
+            logger = logger_module.get_logger(name=f"Benchmark{'Async' if async_log else 'Sync'}", console_log=False, file_log=True, async_log=async_log)
+
+            await b(lambda: logger.debug("benchmark record • %s", "payload"), inner=1_000)
+
+            logger_module.stop_async_logging()
+        #
+        finally:
+
+            logger_module.LOG_DIR = log_dir
+        #
+    #
+#
+
+@scenario("logger_record_sync")
+async def bench_logger_sync(b, scale):
+
+    await bench_logger(b, scale, async_log=False)
+#
+
+@scenario("logger_record_async")
+async def bench_logger_async(b, scale):
+
+    await bench_logger(b, scale, async_log=True)
+#
+
+@scenario("metrics_span_disabled")
+async def bench_metrics_span_disabled(b, scale):
+
+    registry = MetricsRegistry(enabled=False)
+
+    def span():
+
+        with registry.span("bench_seconds"):
+
+            pass
+        #
+    #
+
+    await b(span, inner=10_000)
+#
+
+@scenario("metrics_span_enabled")
+async def bench_metrics_span_enabled(b, scale):
+
+    registry = MetricsRegistry(enabled=True)
+
+    def span():
+
+        with registry.span("bench_seconds"):
+
+            pass
+        #
+    #
+
+    await b(span, inner=10_000)
+#
+
+@scenario("events_publish")
+async def bench_events_publish(b, scale):
+
+    bus    = EventBus()
+    seen   = []
+    events = [NewToken(mint, "SYM", 1.7e9, "api", "solana") for mint in mints(1_000)]
+
+    bus.subscribe(seen.append)
+    subscription = bus.subscription(maxsize=len(events))
+
+    def publish():
+
+        for event in events:
+
+            bus.publish(event)
+        #
+    #
+
+    await b(publish)
+    await bus.aclose()
+
+    b.extra["dropped"] = subscription.dropped
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Persistence
+#
+@scenario("store_append", rounds=10)
+async def bench_store_append(b, scale):
+
+    batches = [dict.fromkeys(mints(50, seed=i), "SYM") for i in range(int(20 * scale))]
+
+    with temporary_directory() as directory:
+
+        store = MintStore(directory)
+
+        def append():
+
+            for batch in batches:
+
+                store.append(batch)
+            #
+        #
+
+        await b(append, setup=lambda: store.written.clear())
+
+        b.extra["batches"] = len(batches)
+    #
+#
+
+def legacy_save(path:str, tokens:dict) -> None:
+
+    """How tokens were saved before the daily log: the whole day rewritten as JSON."""
+
+    with open(path, "w", encoding="utf-8") as f:
+
+        json.dump(tokens, f, indent=2, ensure_ascii=False)
+    #
+#
+
+async def bench_store_save(b, scale, day_size:int):
+
+    quiet_loggers()
+
+    day_size = int(day_size * scale)
+    day      = dict.fromkeys(mints(day_size, seed=1), "SYM")
+    batches  = iter([dict.fromkeys(mints(50, seed=100 + i), "SYM") for i in range(b.warmup + b.rounds)])
+    batch    = {}
+
+    def next_batch():
+
+        nonlocal batch
+        batch = next(batches)
+    #
+
+    with temporary_directory() as directory:
+
+        store = MintStore(directory)
+        store.append(day)
+
+        # One save of 50 new tokens, into a day that already holds `day_size` of them.
+        await b(lambda: store.append(batch), setup=next_batch)
+
+        started = time.perf_counter()
+        legacy_save(os.path.join(directory, "legacy.json"), {**store.written, **batch})
+        b.extra["legacy_save_sec"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store.compact()
+        b.extra["compact_sec"] = time.perf_counter() - started
+
+        b.extra["day_size"] = day_size
+    #
+#
+
+@scenario("store_save_day_1k", group="store_save", rounds=10)
+async def bench_store_save_day_1k(b, scale):
+
+    await bench_store_save(b, scale, 1_000)
+#
+
+@scenario("store_save_day_10k", group="store_save", rounds=10)
+async def bench_store_save_day_10k(b, scale):
+
+    await bench_store_save(b, scale, 10_000)
+#
+
+@scenario("store_save_day_100k", group="store_save", rounds=10)
+async def bench_store_save_day_100k(b, scale):
+
+    await bench_store_save(b, scale, 100_000)
+#
+
+@scenario("history_record_many", rounds=10)
+async def bench_history_record_many(b, scale):
+
+    batches = [[(mint, 1.7e9 + i, "SYM", "solana", "bench") for mint in mints(50, seed=i)] for i in range(int(20 * scale))]
+
+    with temporary_directory() as directory:
+
+        history = TokenHistory(os.path.join(directory, "history.sqlite3"))
+
+        def record():
+
+            for batch in batches:
+
+                history.record_many(batch)
+            #
+        #
+
+        await b(record)
+        history.close()
+
+        b.extra["batches"] = len(batches)
+    #
+#
+
+@scenario("market_snapshots_add")
+async def bench_market_snapshots_add(b, scale):
+
+    responses = [[FakeTokenInfoServer.pair("solana", mint) for mint in mints(30, seed=i)] for i in range(int(20 * scale))]
+    market    = MarketSnapshots(directory=os.devnull)
+
+    def add():
+
+        for pairs in responses:
+
+            market.add(pairs, observed_at=1.7e9)
+        #
+        market.take()
+    #
+
+    await b(add)
+
+    b.extra["rows_per_round"] = 30 * len(responses)
+#
+
+@scenario("market_snapshots_write", rounds=10)
+async def bench_market_snapshots_write(b, scale):
+
+    try:
+
+        import numpy
+    #
+    except ImportError as e:
+
+        raise SkipScenario(f"market snapshots need numpy ({e.name})")
+    #
+
+    rows = [pair_row(FakeTokenInfoServer.pair("solana", mint), 1.7e9) for mint in mints(int(5000 * scale))]
+
+    with temporary_directory() as directory:
+
+        market = MarketSnapshots(directory=directory)
+
+        await b(lambda: market.write(rows))
+
+        b.extra["rows_per_round"] = len(rows)
+        b.extra["format"]         = market.format
+        b.extra["bytes_per_row"]  = sum(os.path.getsize(path) for path in glob.glob(os.path.join(directory, "day=*", "part-*"))) / max(1, market.written)
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Lookups
+#
+async def bench_token_info(b, scale, batch_size:int=None):
+
+    """Fresh mints looked up through a Screener pipeline, `batch_size` per request (default: the pipeline's), against the fake token info API."""
+
+    quiet_loggers()
+
+    count = int(90 * scale)
+    seeds = iter(range(1000, 2000))
+    batch = []
+
+    def fresh_mints():
+
+        nonlocal batch
+        batch = mints(count, seed=next(seeds))
+    #
+
+    async with FakeTokenInfoServer(latency=0.02) as api:
+
+        async with offline_screener("ws://127.0.0.1:9/unused", api) as screener:
+
+            # Every request waits for its turn in the rate budget, as against DexScreener, at 50/s
+            # rather than 4/s so that a round stays short: the ratio of the two scenarios is the point.
+            type(screener).ds_limiter    = TokenBucketLimiter(rate=50, burst=1)
+            screener.pipeline.batch_size = batch_size or screener.pipeline.batch_size
+
+            async def lookup():
+
+                await screener.pipeline.submit(batch)
+                await screener.pipeline.join()
+            #
+
+            await b(lookup, setup=fresh_mints)
+
+            b.extra["mints_per_round"]    = count
+            b.extra["requests_per_round"] = api.requests / (b.warmup + b.rounds)
+            b.extra["ms_per_mint"]        = statistics.median(b.timings) / count * 1000
+        #
+    #
+#
+
+@scenario("token_info_per_mint", group="token_info", rounds=3, warmup=0)
+async def bench_token_info_per_mint(b, scale):
+
+    await bench_token_info(b, scale, batch_size=1)
+#
+
+@scenario("token_info_batched", group="token_info", rounds=10, warmup=1)
+async def bench_token_info_batched(b, scale):
+
+    await bench_token_info(b, scale)
+#
+
+async def bench_http_lookups(b, scale, backend:str):
+
+    """Token info lookups through a pooled client of `backend` against the fake token info API, as many at once as it has connections."""
+
+    from utils.http_client import make_async_client
+    from utils.config      import HTTP_MAX_CONNECTIONS
+
+    try:
+
+        # The fake server speaks HTTP/1.1 only.
+        client = make_async_client(backend, http2=False)
+    #
+    except ImportError as e:
+
+        raise SkipScenario(f"the {backend} backend is missing ({e.name})")
+    #
+
+    count = int(1000 * scale)
+    slots = asyncio.Semaphore(HTTP_MAX_CONNECTIONS)
+
+    async def lookup(url:str):
+
+        # The package never has more lookups in flight than that; hundreds queued at once time httpx's pool out.
+        async with slots:
+
+            return (await client.get(url))
+        #
+    #
+
+    async with FakeTokenInfoServer() as api:
+
+        urls = [api.endpoint.format(chain="solana") + key for key in mints(count)]
+
+        async def lookups():
+
+            await asyncio.gather(*[lookup(url) for url in urls])
+        #
+
+        try:
+
+            await b(lookups)
+        #
+        finally:
+
+            await client.aclose()
+        #
+
+        b.extra["lookups"]          = count
+        b.extra["requests_per_sec"] = count / statistics.median(b.timings)
+        b.extra["api_statuses"]     = api.statuses
+    #
+#
+
+@scenario("http_lookups_httpx", group="http", rounds=5, warmup=1)
+async def bench_http_lookups_httpx(b, scale):
+
+    await bench_http_lookups(b, scale, "httpx")
+#
+
+@scenario("http_lookups_curl_cffi", group="http", rounds=5, warmup=1)
+async def bench_http_lookups_curl_cffi(b, scale):
+
+    await bench_http_lookups(b, scale, "curl_cffi")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Cycle
+#
+async def bench_refresh_cycle(b, scale, frame_symbols:bool=True, **api_options):
+
+    import_screener()
+    quiet_loggers()
+
+    source = FrameSource(pairs=100, new_per_frame=int(30 * scale))
+
+    async with FakeWebsocketServer(source) as ws, FakeTokenInfoServer(**api_options) as api:
+
+        async with offline_screener(ws.url, api) as screener:
+
+            if (not frame_symbols):
+
+                # Skip the symbols carried by the frame, so every new mint goes through the token info API.
+                screener.ingest_frame = screener.decode
+            #
+
+            async def cycle():
+
+                screener.latest_refresh = 0
+                await screener.refresh()
+            #
+
+            await b(cycle)
+
+            b.extra["final_mints"]   = len(screener.final_mints)
+            b.extra["retry_queue"]   = len(screener.retry_queue)
+            b.extra["api_requests"]  = api.requests
+            b.extra["api_statuses"]  = api.statuses
+            b.extra["ws_frames"]     = ws.frames_sent
+            b.extra["ws_connects"]   = ws.connections
+        #
+    #
+#
+
+@scenario("refresh_cycle", group="cycle", rounds=10, warmup=1)
+async def bench_refresh_cycle_clean(b, scale):
+
+    await bench_refresh_cycle(b, scale, latency=0.02)
+#
+
+@scenario("refresh_cycle_api", group="cycle", rounds=10, warmup=1)
+async def bench_refresh_cycle_api(b, scale):
+
+    await bench_refresh_cycle(b, scale, frame_symbols=False, latency=0.02)
+#
+
+@scenario("refresh_cycle_api_flaky", group="cycle", rounds=10, warmup=1)
+async def bench_refresh_cycle_api_flaky(b, scale):
+
+    await bench_refresh_cycle(b, scale, frame_symbols=False, latency=0.02, jitter=0.03, error_rate=0.1, throttle_rate=0.05, missing_rate=0.05)
+#
+
+async def bench_pool_refresh(b, scale, feeds:int, frame_symbols:bool=True):
+
+    """One refresh of a ScreenerPool whose feeds all read the fake websocket server, which shares its recent pairs between them."""
+
+    import_screener()
+    quiet_loggers()
+
+    source = FrameSource(pairs=100, new_per_frame=int(30 * scale))
+
+    async with FakeWebsocketServer(source) as ws, FakeTokenInfoServer(latency=0.02) as api:
+
+        async with offline_pool([f"{ws.url}&feed={index}" for index in range(feeds)], api) as pool:
+
+            if (not frame_symbols):
+
+                # Every new mint goes through the token info API, where the feeds share the lookups.
+                for screener in pool.screeners:
+
+                    screener.ingest_frame = screener.decode
+                #
+            #
+
+            async def cycle():
+
+                for screener in pool.screeners:
+
+                    screener.latest_refresh = 0
+                #
+
+                await pool.refresh()
+            #
+
+            await b(cycle)
+
+            rounds = b.warmup + b.rounds
+
+            b.extra["frames_per_sec"]  = feeds / statistics.median(b.timings)
+            b.extra["mints_per_round"] = len(pool.final_mints) / rounds
+            b.extra["mints_per_sec"]   = len(pool.final_mints) / rounds / statistics.median(b.timings)
+            b.extra["api_requests"]    = api.requests
+            b.extra["api_addresses"]   = api.addresses
+            b.extra["ws_connects"]     = ws.connections
+        #
+    #
+#
+
+@scenario("pool_refresh_1feed", group="pool", rounds=10, warmup=1)
+async def bench_pool_refresh_1feed(b, scale):
+
+    await bench_pool_refresh(b, scale, feeds=1)
+#
+
+@scenario("pool_refresh_4feeds", group="pool", rounds=10, warmup=1)
+async def bench_pool_refresh_4feeds(b, scale):
+
+    await bench_pool_refresh(b, scale, feeds=4)
+#
+
+@scenario("pool_refresh_4feeds_api", group="pool", rounds=10, warmup=1)
+async def bench_pool_refresh_4feeds_api(b, scale):
+
+    await bench_pool_refresh(b, scale, feeds=4, frame_symbols=False)
+#
+
+@scenario("stream_frames", group="cycle", rounds=5, warmup=1)
+async def bench_stream_frames(b, scale):
+
+    import_screener()
+    quiet_loggers()
+
+    frames = max(1, int(20 * scale))
+    source = FrameSource(pairs=100, new_per_frame=10)
+
+    async with FakeWebsocketServer(source, frames_per_connection=0, interval=0.01, stream=True) as ws, FakeTokenInfoServer(latency=0.02) as api:
+
+        async with offline_screener(ws.url, api) as screener:
+
+            async def consume():
+
+                task = asyncio.create_task(screener.stream())
+
+                try:
+
+                    while (screener.screener_stream is None) or (screener.screener_stream.frames < frames):
+
+                        await asyncio.sleep(0.001)
+                    #
+
+                    await screener.pipeline.join()
+                #
+                finally:
+
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                #
+            #
+
+            await b(consume)
+
+            b.extra["frames_per_round"] = frames
+            b.extra["final_mints"]      = len(screener.final_mints)
+            b.extra["api_requests"]     = api.requests
+        #
+    #
+#
+
+@scenario("tracker_poll_cycle", group="cycle", rounds=5, warmup=1)
+async def bench_tracker_poll_cycle(b, scale):
+
+    """One pass of the MintTracker over all its tokens, due at once, against the fake token info API."""
+
+    import_screener()
+
+    from dex_screener_scraper.tracker import MintTracker
+
+    quiet_loggers()
+
+    keys = mints(int(3000 * scale))
+
+    async with FakeWebsocketServer() as ws, FakeTokenInfoServer(latency=0.02) as api:
+
+        async with offline_screener(ws.url, api) as screener:
+
+            tracker = MintTracker(screener)
+
+            for key in keys:
+
+                tracker.track(key, first_seen=datetimer.timestamp() - 60)
+            #
+
+            def make_due():
+
+                for entry in tracker.tracked.values():
+
+                    tracker.schedule(entry, 0.0)
+                #
+            #
+
+            async def cycle():
+
+                while (await tracker.poll_due()):
+
+                    pass
+                #
+            #
+
+            await b(cycle, setup=make_due)
+            await tracker.aclose()
+
+            b.extra["tracked"]      = len(tracker.tracked)
+            b.extra["api_requests"] = api.requests
+            b.extra["updates"]      = tracker.updates
+        #
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Scaling
+#
+async def bench_supervisor(b, scale, workers:int):
+
+    """Tokens per second through a Supervisor with `workers` processes, over frames of all-new pairs."""
+
+    import_screener()
+
+    from dex_screener_scraper.supervisor import Supervisor
+
+    quiet_loggers()
+
+    tokens = max(500, int(5000 * scale))
+    rng    = random.Random(workers)
+    source = FrameSource(frames=[synthetic_frame(seed=i, mints=[random_mint(rng) for _ in range(500)]) for i in range(2 * tokens // 500 + 4)])
+
+    async with FakeWebsocketServer(source, frames_per_connection=0, interval=0.01, stream=True) as ws, FakeTokenInfoServer(latency=0.02) as api:
+
+        feeds = [(f"{ws.url}&feed={i}", "solana") for i in range(4)]
+
+        for index in range(b.warmup + b.rounds):
+
+            with temporary_directory() as directory:
+
+                supervisor = Supervisor(feeds,
+                                        workers      = workers,
+                                        rate         = 1000.0,
+                                        burst        = 1000,
+                                        limiter_path = os.path.join(directory, "ds_rate_limiter.bin"),
+                                        store        = MintStore(directory),
+                                        history      = TokenHistory(os.path.join(directory, "history.sqlite3")),
+                                        endpoint     = api.endpoint,
+                                        cache_dir    = directory,
+                                        log_level    = logging.WARNING)
+                task       = asyncio.create_task(supervisor.run())
+
+                try:
+
+                    # Process start-up and the first connections are not part of the measurement.
+                    while (supervisor.received == 0) and (not task.done()):
+
+                        await asyncio.sleep(0.005)
+                    #
+
+                    started = time.perf_counter()
+                    target  = supervisor.received + tokens
+
+                    while (supervisor.received < target) and (not task.done()):
+
+                        await asyncio.sleep(0.005)
+                    #
+
+                    if (index >= b.warmup):
+
+                        b.timings.append(time.perf_counter() - started)
+                    #
+                #
+                finally:
+
+                    supervisor.stop()
+                    await task
+                    await supervisor.aclose()
+                #
+            #
+        #
+
+        b.extra["workers"]        = workers
+        b.extra["cpus"]           = os.cpu_count()
+        b.extra["tokens"]         = tokens
+        b.extra["tokens_per_sec"] = (tokens / statistics.median(b.timings)) if b.timings else 0.0
+        b.extra["api_requests"]   = api.requests
+    #
+#
+
+@scenario("supervisor_workers_1", group="scaling", rounds=3, warmup=0)
+async def bench_supervisor_1(b, scale):
+
+    await bench_supervisor(b, scale, workers=1)
+#
+
+@scenario("supervisor_workers_2", group="scaling", rounds=3, warmup=0)
+async def bench_supervisor_2(b, scale):
+
+    await bench_supervisor(b, scale, workers=2)
+#
+
+@scenario("supervisor_workers_4", group="scaling", rounds=3, warmup=0)
+async def bench_supervisor_4(b, scale):
+
+    await bench_supervisor(b, scale, workers=4)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,443 @@
+import time
+STARTED = time.perf_counter()           # startup is measured from here
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+import utils.config as settings
+from utils.logger import get_logger
+
+DAEMON_CONFIG_ENV  = "DS_CONFIG"
+DAEMON_ENV_PREFIX  = "DS_"
+DAEMON_MIN_WAIT    = 0.5
+
+# Every key can also be set from the environment as DS_<KEY>: JSON values, or plain strings.
+# DS_FEEDS may be a whitespace-separated list of URLs.
+DAEMON_DEFAULTS = {
+    "feeds"            : [],            # screener websocket URLs, or [url, chain] pairs
+    "mode"             : "refresh",     # "refresh" (one snapshot per cycle, adaptive cadence) or "stream"
+    "rate"             : 4.0,           # token info requests per second, for all feeds together
+    "burst"            : 4,
+    "endpoint"         : None,          # token info endpoint, e.g. the one of `python -m benchmarks serve`
+    "http_backend"     : settings.HTTP_BACKEND,
+    "offload"          : settings.OFFLOAD_EXECUTOR,
+    "json_backend"     : settings.JSON_BACKEND,
+    "store_dir"        : None,          # None: files/screener
+    "history"          : True,
+    "market_snapshots" : False,
+    "tracker"          : False,
+    "log_level"        : "INFO",
+    "log_levels"       : {},            # per logger, e.g. {"MintPipeline": "DEBUG"}
+    "health_host"      : "127.0.0.1",
+    "health_port"      : 9464,          # /healthz, /readyz and /metrics; None to turn off
+    "drain_timeout"    : 30,            # seconds per feed to finish the queued lookups on shutdown
+    "event_loop"       : "auto",        # "auto" (uvloop when installed), "uvloop", "asyncio"
+}
+logger = get_logger(name="Daemon")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Config
+#
+def env_value(text:str):
+
+    try:
+
+        return (json.loads(text))
+    #
+    except ValueError:
+
+        return (text)
+    #
+#
+
+def load_config(path:str=None, environ:dict=os.environ) -> dict:
+
+    """DAEMON_DEFAULTS, updated by the JSON file at `path` (or $DS_CONFIG), then by the DS_<KEY> variables."""
+
+    config = dict(DAEMON_DEFAULTS)
+    path   = path or environ.get(DAEMON_CONFIG_ENV)
+
+    if (path):
+
+        with open(path) as f:
+
+            config.update(json.load(f))
+        #
+    #
+
+    for key in DAEMON_DEFAULTS:
+
+        text = environ.get(DAEMON_ENV_PREFIX + key.upper())
+
+        if (text is not None):
+
+            config[key] = env_value(text)
+        #
+    #
+
+    if isinstance(config["feeds"], str):
+
+        config["feeds"] = config["feeds"].split()
+    #
+
+    unknown = sorted(set(config) - set(DAEMON_DEFAULTS))
+
+    if (unknown):
+
+        raise ValueError(f"Unknown config keys: {', '.join(unknown)}")
+    #
+    if (config["mode"] not in ("refresh", "stream")):
+
+        raise ValueError(f"Unknown mode '{config['mode']}'")
+    #
+
+    return (config)
+#
+
+def log_level(level) -> int:
+
+    value = level if isinstance(level, int) else logging.getLevelName(str(level).upper())
+
+    if (not isinstance(value, int)):
+
+        raise ValueError(f"Unknown log level '{level}'")
+    #
+
+    return (value)
+#
+
+def configure(config:dict) -> None:
+
+    """Apply the settings the package reads when its modules are imported. Call before importing them."""
+
+    settings.HTTP_BACKEND     = config["http_backend"]
+    settings.OFFLOAD_EXECUTOR = config["offload"]
+    settings.JSON_BACKEND     = config["json_backend"]
+#
+
+def apply_log_levels(config:dict) -> None:
+
+    """Set `log_level` on every logger, then the `log_levels` overrides. Loggers reset their level when created, so call after the imports."""
+
+    for name in list(logging.root.manager.loggerDict):
+
+        logging.getLogger(name).setLevel(log_level(config["log_level"]))
+    #
+    for name, level in config["log_levels"].items():
+
+        logging.getLogger(name).setLevel(log_level(level))
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Daemon
+#
+def event_loop_factory(kind:str) -> tuple:
+
+    """Return (name, loop_factory) of the event loop to run on: uvloop when installed and allowed."""
+
+    if (kind in ("auto", "uvloop")):
+
+        try:
+
+            import uvloop
+
+            return ("uvloop", uvloop.new_event_loop)
+        #
+        except ImportError:
+
+            if (kind == "uvloop"):
+
+                raise
+            #
+        #
+    #
+
+    return ("asyncio", None)
+#
+
+class Daemon:
+
+    """
+    Runs a ScreenerPool until SIGINT or SIGTERM.
+
+    The health endpoint comes up first, so probes get answers while the package is still being
+    imported: `/healthz` is 200 as long as the loop serves it and the feeds have not failed,
+    `/readyz` once every feed completed a refresh (or a streamed frame) and until shutdown starts.
+    On a signal the feeds stop, the queued lookups are drained for up to `drain_timeout` seconds,
+    and `final_mints`, the history and the caches are saved before the clients are closed.
+    """
+
+    def __init__(self, config:dict, event_loop:str="asyncio") -> None:
+
+        self.config     = config
+        self.event_loop = event_loop
+        self.pool       = None
+        self.work       = None
+        self.stopping   = None
+        self.startup    = {}
+        self.ready_at   = None
+    #
+
+    def lap(self, stage:str, started:float) -> float:
+
+        now                         = time.perf_counter()
+        self.startup[f"{stage}_ms"] = round((now - started) * 1000, 1)
+
+        return (now)
+    #
+
+    async def serve(self) -> None:
+
+        from utils.metrics import metrics
+
+        metrics.add_route("/healthz", self.health)
+        metrics.add_route("/readyz",  self.readiness)
+
+        if (self.config["health_port"] is not None):
+
+            await metrics.serve(self.config["health_host"], int(self.config["health_port"]))
+        #
+    #
+
+    def build(self) -> None:
+
+        started = time.perf_counter()
+
+        from dex_screener_scraper.pool     import ScreenerPool
+        from dex_screener_scraper.screener import Screener, SCREENER_DIR
+        from utils.rate_limiter            import TokenBucketLimiter
+        import dex_screener_scraper.screener as screener_module
+
+        started = self.lap("imports", started)
+
+        Screener.ds_limiter = TokenBucketLimiter(rate=float(self.config["rate"]), burst=int(self.config["burst"]))
+
+        if (self.config["endpoint"] is not None):
+
+            screener_module.DS_TOKEN_INFO_ENDPOINT = self.config["endpoint"]
+        #
+
+        self.pool = ScreenerPool(self.config["feeds"],
+                                 store_dir = self.config["store_dir"] or SCREENER_DIR,
+                                 history   = bool(self.config["history"]),
+                                 market    = bool(self.config["market_snapshots"]),
+                                 tracker   = bool(self.config["tracker"]))
+
+        self.lap("pool", started)
+        apply_log_levels(self.config)
+    #
+
+    async def refresh_forever(self) -> None:
+
+        while (not self.stopping.is_set()):
+
+            await self.pool.refresh()
+
+            wait = min(screener.next_refresh_in() for screener in self.pool.screeners)
+
+            try:
+
+                await asyncio.wait_for(self.stopping.wait(), timeout=max(DAEMON_MIN_WAIT, wait))
+            #
+            except asyncio.TimeoutError:
+
+                pass
+            #
+        #
+    #
+
+    def stop(self) -> None:
+
+        if (self.stopping.is_set()):
+
+            logger.warning(f"Already stopping; draining the lookups for up to {self.config['drain_timeout']}s per feed")
+            return
+        #
+
+        logger.info(f"Stopping")
+        self.stopping.set()
+
+        if (self.work is not None):
+
+            self.work.cancel()
+        #
+    #
+
+    async def run(self) -> int:
+
+        """Serve the health endpoint, build the pool and run it until stopped. Return the exit status."""
+
+        loop          = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        status        = 0
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+
+            loop.add_signal_handler(signum, self.stop)
+        #
+
+        try:
+
+            started = time.perf_counter()
+            await self.serve()
+            self.lap("serve", started)
+
+            self.build()
+
+            self.startup["total_ms"] = round((time.perf_counter() - STARTED) * 1000, 1)
+            logger.info(f"Started {len(self.pool.screeners)} feeds in {self.config['mode']} mode on {self.event_loop} • startup {self.startup}")
+
+            from utils.metrics import metrics
+
+            metrics.observe("startup_seconds", self.startup["total_ms"] / 1000)
+
+            if (not self.stopping.is_set()):
+
+                self.work = asyncio.create_task(self.refresh_forever() if (self.config["mode"] == "refresh") else self.pool.stream())
+
+                try:
+
+                    await self.work
+                #
+                except asyncio.CancelledError:
+
+                    if (not self.stopping.is_set()):
+
+                        raise
+                    #
+                #
+            #
+        #
+        except Exception as e:
+
+            logger.error(f"Daemon failed • {e}")
+            status = 1
+        #
+        finally:
+
+            self.stopping.set()
+
+            if (self.pool is not None):
+
+                await self.pool.aclose(drain_timeout=self.config["drain_timeout"])
+
+                logger.info(f"Stopped • {len(self.pool.final_mints)} tokens saved")
+            #
+            else:
+
+                from utils.metrics import metrics
+
+                await metrics.aclose()
+            #
+
+            for signum in (signal.SIGINT, signal.SIGTERM):
+
+                loop.remove_signal_handler(signum)
+            #
+        #
+
+        return (status)
+    #
+
+    def health(self) -> tuple:
+
+        failed = (self.work is not None) and (self.work.done()) and (not self.work.cancelled()) and (self.work.exception() is not None)
+        body   = {"status": "failed" if failed else "ok", "uptime_sec": round(time.perf_counter() - STARTED, 1), "event_loop": self.event_loop}
+
+        return (503 if failed else 200, "application/json", json.dumps(body))
+    #
+
+    def readiness(self) -> tuple:
+
+        screeners = self.pool.screeners if (self.pool is not None) else []
+        ready     = bool(screeners) and (not self.stopping.is_set()) and all(screener.latest_refresh > 0 for screener in screeners)
+
+        if (ready) and (self.ready_at is None):
+
+            self.ready_at = round(time.perf_counter() - STARTED, 3)
+        #
+
+        body = {
+            "ready"       : ready,
+            "stopping"    : self.stopping.is_set(),
+            "mode"        : self.config["mode"],
+            "feeds"       : len(screeners),
+            "final_mints" : len(self.pool.final_mints) if (self.pool is not None) else 0,
+            "startup"     : self.startup,
+            "ready_at"    : self.ready_at,
+        }
+
+        return (200 if ready else 503, "application/json", json.dumps(body))
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Main
+#
+def main(argv:list=None) -> int:
+
+    parser = argparse.ArgumentParser(prog="python -m dex_screener_scraper", description="Watch screener feeds and save every newly introduced token.")
+    parser.add_argument("feeds",          nargs="*", help="screener websocket URLs (override the configured feeds)")
+    parser.add_argument("--config",       default=None, help=f"JSON config file (default ${DAEMON_CONFIG_ENV})")
+    parser.add_argument("--mode",         default=None, choices=("refresh", "stream"))
+    parser.add_argument("--print-config", action="store_true", help="print the resolved config and exit")
+
+    args = parser.parse_args(argv)
+
+    try:
+
+        config = load_config(args.config)
+        config.update({key: value for key, value in (("feeds", args.feeds), ("mode", args.mode)) if value})
+        log_level(config["log_level"])
+    #
+    except (OSError, ValueError) as e:
+
+        parser.error(str(e))
+    #
+
+    if (args.print_config):
+
+        print(json.dumps(config, indent=2))
+        return (0)
+    #
+    if (not config["feeds"]):
+
+        parser.error(f"no feeds: pass them as arguments, in the config file or in ${DAEMON_ENV_PREFIX}FEEDS")
+    #
+
+    configure(config)
+
+    try:
+
+        loop_name, loop_factory = event_loop_factory(config["event_loop"])
+    #
+    except ImportError:
+
+        parser.error("event_loop is 'uvloop' but uvloop is not installed")
+    #
+
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+
+        return (runner.run(Daemon(config, event_loop=loop_name).run()))
+    #
+#
+
+if (__name__ == "__main__"):
+
+    sys.exit(main())
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,89 @@
+import math
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.metrics import metrics
+
+INTERVAL_BUCKETS = (5.0, 10.0, 15.0, 30.0, 45.0, 60.0, 90.0, 120.0, 180.0, 300.0)
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### AdaptiveCadence
+#
+class AdaptiveCadence:
+
+    """
+    Interval between screener refreshes, adapted to how many new mints the last cycles produced.
+
+    A cycle with new mints divides the interval by `speedup`; an empty one multiplies it by
+    `slowdown`. The interval stays within [`min_interval`, `max_interval`], and never drops below
+    what the lookups of the last cycle would need at `budget_share` of the token info rate limit.
+    That share is split evenly between the `feeds` whose cadences draw on the same limiter, so
+    together they claim no more than `budget_share` of it. With `min_interval == max_interval` the
+    cadence is fixed.
+    """
+
+    def __init__(self, initial:float, min_interval:float, max_interval:float, speedup:float=2.0, slowdown:float=1.5, budget_share:float=0.5, batch_size:int=30, feeds:int=1) -> None:
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.speedup      = speedup
+        self.slowdown     = slowdown
+        self.budget_share = budget_share
+        self.batch_size   = batch_size
+        self.feeds        = feeds
+        self.interval     = min(max_interval, max(min_interval, initial))
+
+        self.cycles       = 0
+        self.new_mints    = 0
+        self.latest_yield = 0.0
+        self.budget_floor = 0.0
+    #
+
+    def update(self, new_mints:int, frame_mints:int, lookups:int, rate:float) -> float:
+
+        """
+        Adapt the interval to one cycle: `new_mints` introduced out of `frame_mints` listed, with
+        `lookups` mints sent to the token info API, limited to `rate` requests per second. Return
+        the new interval.
+        """
+
+        self.cycles      += 1
+        self.new_mints   += new_mints
+        self.latest_yield = (new_mints / frame_mints) if (frame_mints) else 0.0
+
+        if (new_mints > 0):
+
+            interval = self.interval / self.speedup
+        #
+        else:
+
+            interval = self.interval * self.slowdown
+        #
+
+        requests          = math.ceil(lookups / self.batch_size)
+        self.budget_floor = (requests / (rate * self.budget_share / max(1, self.feeds))) if (rate) else 0.0
+        self.interval     = min(self.max_interval, max(self.min_interval, self.budget_floor, interval))
+
+        metrics.observe("refresh_interval_seconds", self.interval, buckets=INTERVAL_BUCKETS)
+
+        return (self.interval)
+    #
+
+    def stats(self) -> dict:
+
+        return ({
+            "interval"     : self.interval,
+            "cycles"       : self.cycles,
+            "new_mints"    : self.new_mints,
+            "latest_yield" : self.latest_yield,
+            "budget_floor" : self.budget_floor,
+        })
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,110 @@
+import re
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Patterns
+#
+# A "word" is a run of printable, non-space ASCII. Only runs of 55+ bytes can hold a token address.
+# Inside a word every string is led by its Avro length byte, printable too: "X" for 44 bytes, "V"
+# for 43. A 44-char mint starting with "V" and a 43-char mint behind its length byte look the same
+# at the end of a word, so the length bytes are followed from the start of the word when they can be.
+WORD_PATTERN        = re.compile(rb'[!-~]{55,}')
+WORD_END_PATTERN    = re.compile(rb'["*<$@(),.]')
+ETH_ADDRESS_PATTERN = re.compile(rb'0x[0-9a-fA-F]+')
+PUMP_PATTERN        = re.compile(rb'.{0,40}pump')
+MINT_PATTERN        = re.compile(rb'[1-9A-HJ-NP-Za-km-z]{32,44}')
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Decoder
+#
+def last_mint(word:bytes) -> bytes:
+
+    """The last base58 mint of a word made of whole length-prefixed strings, else None."""
+
+    offset = 0
+    mint   = None
+
+    while (offset < len(word)):
+
+        # Printable length bytes are one-byte zigzag varints: even, twice the length.
+        length = word[offset]
+        end    = offset + 1 + (length >> 1)
+
+        if (length & 1) or (end > len(word)):
+
+            return (None)
+        #
+
+        if (MINT_PATTERN.fullmatch(word, offset + 1, end)):
+
+            mint = word[offset+1:end]
+        #
+
+        offset = end
+    #
+
+    return (mint)
+#
+
+def extract_token(word:bytes) -> str:
+
+    """
+    Return the token address hidden in one printable word of a pairs frame.
+
+    When the word does not start at a length byte (a printable byte of another field in front of
+    it), the end of the word is read instead: a leading "V" is taken for the length byte of a
+    43-char mint, so a 44-char mint starting with "V" loses that "V" there.
+    """
+
+    end = WORD_END_PATTERN.search(word)
+
+    if (end is not None):
+
+        word = word[:end.start()]
+    #
+
+    token = last_mint(word) if (b"0x" not in word) else None
+
+    if (token is not None):
+
+        return (token.decode("ascii"))
+    #
+
+    if (b"0x" in word):
+
+        *_, last = ETH_ADDRESS_PATTERN.finditer(word)
+        token    = last.group()
+    #
+    elif (b"pump" in word):
+
+        token = PUMP_PATTERN.search(word).group()
+
+        if (token.startswith(b"V")):
+
+            token = token[1:]
+        #
+    #
+    else:
+
+        token = word[-44:]
+
+        if (token.startswith(b"V")):
+
+            token = token[1:]
+        #
+    #
+
+    return (token.decode("ascii"))
+#
+
+def decode_pairs_frame(message) -> list:
+
+    """Return the token addresses of a websocket pairs frame, in frame order. Accepts any bytes-like object."""
+
+    return ([extract_token(match.group()) for match in WORD_PATTERN.finditer(message)])
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
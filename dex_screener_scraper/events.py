@@ -0,0 +1,419 @@
+import asyncio
+import inspect
+import json
+import os
+from typing import NamedTuple
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.logger import get_logger
+
+EVENTS_QUEUE_SIZE        = 10_000
+EVENTS_SOCKET_MAX_BUFFER = 1 << 20
+logger = get_logger(name="EventBus")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### NewToken
+#
+class NewToken(NamedTuple):
+
+    """
+    A token seen for the first time. `source` is where its symbol came from: "frame" or "api", or
+    "cache" for a token a shard worker hands to its supervisor from its metadata cache.
+    """
+
+    mint       : str
+    symbol     : str
+    first_seen : float
+    source     : str
+    chain      : str = None
+
+    def to_json(self) -> str:
+
+        return (json.dumps(self._asdict(), ensure_ascii=False))
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### EventBus
+#
+class Subscription:
+
+    """
+    Async iterator over the events published after it was opened.
+
+    It buffers up to `maxsize` events; when a consumer falls behind, the oldest ones are dropped
+    (and counted in `dropped`) rather than ever blocking the publisher.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, bus, maxsize:int=EVENTS_QUEUE_SIZE) -> None:
+
+        self.bus     = bus
+        self.queue   = asyncio.Queue(maxsize=maxsize + 1)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.closed  = False
+    #
+
+    def put(self, event) -> None:
+
+        if (self.queue.qsize() >= self.maxsize):
+
+            self.queue.get_nowait()
+            self.dropped += 1
+        #
+
+        self.queue.put_nowait(event)
+    #
+
+    def close(self) -> None:
+
+        if (not self.closed):
+
+            self.closed = True
+            self.queue.put_nowait(self._CLOSED)
+        #
+    #
+
+    def __aiter__(self):
+
+        return (self)
+    #
+
+    async def __anext__(self) -> NewToken:
+
+        event = await self.queue.get()
+
+        if (event is self._CLOSED):
+
+            self.bus.unsubscribe(self)
+            raise StopAsyncIteration
+        #
+
+        return (event)
+    #
+#
+
+class EventBus:
+
+    """
+    In-process fan-out of `NewToken` events.
+
+    Consumers either register a callback (plain or async) with `subscribe`, or iterate the bus:
+    `async for token in bus: ...`. Attached publishers (`UnixSocketPublisher`, `RedisPublisher`,
+    `ZmqPublisher`) forward every event out of the process. `publish` never blocks the caller.
+    """
+
+    def __init__(self) -> None:
+
+        self.callbacks     = []
+        self.subscriptions = []
+        self.publishers    = []
+        self._tasks        = set()
+
+        self.published     = 0
+    #
+
+    def subscribe(self, callback):
+
+        """Call `callback(event)` for every event. Async callbacks are scheduled as tasks. Returns the callback."""
+
+        self.callbacks.append(callback)
+
+        return (callback)
+    #
+
+    def unsubscribe(self, subscriber) -> None:
+
+        if (subscriber in self.callbacks):
+
+            self.callbacks.remove(subscriber)
+        #
+        if (subscriber in self.subscriptions):
+
+            self.subscriptions.remove(subscriber)
+        #
+    #
+
+    def subscription(self, maxsize:int=EVENTS_QUEUE_SIZE) -> Subscription:
+
+        subscription = Subscription(self, maxsize=maxsize)
+        self.subscriptions.append(subscription)
+
+        return (subscription)
+    #
+
+    def __aiter__(self) -> Subscription:
+
+        return (self.subscription())
+    #
+
+    async def attach(self, publisher):
+
+        """Start `publisher` and forward every event to it. Returns the publisher."""
+
+        await publisher.start()
+        self.publishers.append(publisher)
+
+        return (publisher)
+    #
+
+    def publish(self, event:NewToken) -> None:
+
+        self.published += 1
+
+        for callback in self.callbacks:
+
+            try:
+
+                result = callback(event)
+
+                if (inspect.isawaitable(result)):
+
+                    task = asyncio.ensure_future(result)
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                #
+            #
+            except Exception as e:
+
+                logger.error(f"Event callback {getattr(callback, '__name__', callback)} failed • {e}")
+            #
+        #
+
+        for subscription in self.subscriptions:
+
+            subscription.put(event)
+        #
+
+        for publisher in self.publishers:
+
+            try:
+
+                publisher.publish(event)
+            #
+            except Exception as e:
+
+                logger.error(f"Event publisher {type(publisher).__name__} failed • {e}")
+            #
+        #
+    #
+
+    def stats(self) -> dict:
+
+        return ({
+            "published"     : self.published,
+            "callbacks"     : len(self.callbacks),
+            "subscriptions" : len(self.subscriptions),
+            "dropped"       : sum(subscription.dropped for subscription in self.subscriptions),
+            "publishers"    : len(self.publishers),
+        })
+    #
+
+    async def aclose(self) -> None:
+
+        """End the subscriptions, wait for pending async callbacks and close the publishers."""
+
+        for subscription in list(self.subscriptions):
+
+            subscription.close()
+        #
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for publisher in self.publishers:
+
+            try:
+
+                await publisher.aclose()
+            #
+            except Exception as e:
+
+                logger.debug(f"Failed closing event publisher {type(publisher).__name__} • {e}")
+            #
+        #
+
+        self.publishers = []
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Publishers
+#
+class UnixSocketPublisher:
+
+    """
+    Newline-delimited JSON events on a local Unix socket, to every connected client.
+
+    Slow clients are dropped once more than `max_buffer` bytes are pending for them, so they can
+    never hold the screener back.
+    """
+
+    def __init__(self, path:str, max_buffer:int=EVENTS_SOCKET_MAX_BUFFER) -> None:
+
+        self.path       = path
+        self.max_buffer = max_buffer
+        self.clients    = set()
+        self._server    = None
+    #
+
+    async def start(self) -> None:
+
+        if (os.path.exists(self.path)):
+
+            os.unlink(self.path)
+        #
+
+        self._server = await asyncio.start_unix_server(self._accept, path=self.path)
+
+        logger.info(f"Publishing new tokens on {self.path}")
+    #
+
+    async def _accept(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+
+        self.clients.add(writer)
+
+        try:
+
+            await reader.read()
+        #
+        except Exception:
+
+            pass
+        #
+        finally:
+
+            self.clients.discard(writer)
+            writer.close()
+        #
+    #
+
+    def publish(self, event:NewToken) -> None:
+
+        line = (event.to_json() + "\n").encode("utf-8")
+
+        for writer in list(self.clients):
+
+            if (writer.transport.get_write_buffer_size() > self.max_buffer):
+
+                logger.warning(f"Dropping a slow event subscriber of {self.path}")
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            #
+
+            writer.write(line)
+        #
+    #
+
+    async def aclose(self) -> None:
+
+        for writer in list(self.clients):
+
+            writer.close()
+        #
+        self.clients.clear()
+
+        if (self._server is not None):
+
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        #
+
+        if (os.path.exists(self.path)):
+
+            os.unlink(self.path)
+        #
+    #
+#
+
+class RedisPublisher:
+
+    """JSON events `PUBLISH`ed on a Redis (or Redis-compatible) channel. Needs the `redis` package."""
+
+    def __init__(self, url:str="redis://localhost:6379/0", channel:str="dexscreener:new_tokens") -> None:
+
+        self.url      = url
+        self.channel  = channel
+        self.client   = None
+        self._pending = set()
+    #
+
+    async def start(self) -> None:
+
+        import redis.asyncio
+
+        self.client = redis.asyncio.from_url(self.url)
+    #
+
+    def publish(self, event:NewToken) -> None:
+
+        task = asyncio.ensure_future(self.client.publish(self.channel, event.to_json()))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    #
+
+    async def aclose(self) -> None:
+
+        await asyncio.gather(*self._pending, return_exceptions=True)
+
+        if (self.client is not None):
+
+            await self.client.aclose()
+            self.client = None
+        #
+    #
+#
+
+class ZmqPublisher:
+
+    """JSON events on a ZeroMQ PUB socket, as [topic, event] messages. Needs the `pyzmq` package."""
+
+    def __init__(self, address:str="tcp://127.0.0.1:5556", topic:bytes=b"new_token") -> None:
+
+        self.address = address
+        self.topic   = topic
+        self.socket  = None
+    #
+
+    async def start(self) -> None:
+
+        import zmq
+
+        self.socket = zmq.Context.instance().socket(zmq.PUB)
+        self.socket.bind(self.address)
+    #
+
+    def publish(self, event:NewToken) -> None:
+
+        import zmq
+
+        try:
+
+            self.socket.send_multipart([self.topic, event.to_json().encode("utf-8")], flags=zmq.NOBLOCK)
+        #
+        except zmq.Again:
+
+            pass
+        #
+    #
+
+    async def aclose(self) -> None:
+
+        if (self.socket is not None):
+
+            self.socket.close(linger=0)
+            self.socket = None
+        #
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
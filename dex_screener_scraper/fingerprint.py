@@ -0,0 +1,177 @@
+import hashlib
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.metrics import metrics
+
+from dex_screener_scraper.decoder  import decode_pairs_frame
+from dex_screener_scraper.protocol import PROTOCOL_HEADER, PAIRS_MARKER, PAIR_START_PATTERN
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Segments
+#
+def split_pairs_frame(message:bytes) -> tuple:
+
+    """
+    Cut a pairs frame into (header, pair segments), at every chain id with its length byte.
+
+    A segment starts at the length byte of a chain id, which is not printable, so no token address
+    spans two segments: decoding the header and each segment on its own gives the mints of the
+    whole frame, in the same order. The cuts are not checked to start a pair record, as
+    PairsFrameParser does: a chain id inside a record only cuts it in two segments, and checking
+    every cut costs as much as decoding the frame.
+    """
+
+    if (not message.startswith(PROTOCOL_HEADER)):
+
+        raise ValueError("Not a 1.3.0 pairs frame")
+    #
+
+    pairs_start = message.find(PAIRS_MARKER)
+
+    if (pairs_start == -1):
+
+        return (message, [])
+    #
+
+    starts = [match.start() for match in PAIR_START_PATTERN.finditer(message, pairs_start + len(PAIRS_MARKER))]
+
+    if (not starts):
+
+        return (message, [])
+    #
+
+    return (message[:starts[0]], [message[start:end] for start, end in zip(starts, starts[1:] + [len(message)])])
+#
+
+def read_segments(segments:list) -> list:
+
+    """The mints of each pair segment. Module-level, so a process pool can run it."""
+
+    return ([decode_pairs_frame(segment) for segment in segments])
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### FrameFingerprint
+#
+class FramePlan:
+
+    """A frame cut into segments, and the ones the previous frame did not have."""
+
+    __slots__ = ("digest", "header", "segments", "missing", "missing_bytes")
+
+    def __init__(self, digest:bytes, header:bytes, segments:list, missing:list) -> None:
+
+        self.digest        = digest
+        self.header        = header
+        self.segments      = segments
+        self.missing       = missing
+        self.missing_bytes = sum(len(segment) for segment in missing)
+    #
+#
+
+class FrameFingerprint:
+
+    """
+    Skips the parts of a pairs frame that did not change since the previous one.
+
+    `prepare` hashes the whole frame: a frame identical to the previous one returns None, and its
+    mints are still in `mints`. Otherwise the frame is cut into one segment per pair record, and
+    only the segments the previous frame did not contain are left to decode. `commit` takes their
+    mints and rebuilds the frame from those and the remembered ones. Only the segments of the
+    latest frame are kept, so the memory stays around one frame. Pair records are not kept: the
+    few a frame needs are read with `protocol.read_pairs`.
+    """
+
+    def __init__(self) -> None:
+
+        self.digest          = None
+        self.mints           = []
+        self.segments        = {}
+
+        self.frames          = 0
+        self.skipped_frames  = 0
+        self.skipped_bytes   = 0
+        self.decoded_bytes   = 0
+        self.reused_segments = 0
+        self.parsed_segments = 0
+    #
+
+    def prepare(self, message) -> FramePlan:
+
+        """Return the plan of a changed frame, or None when it is the same as the previous one."""
+
+        message      = message if isinstance(message, bytes) else bytes(message)
+        digest       = hashlib.blake2b(message, digest_size=16).digest()
+        self.frames += 1
+
+        if (digest == self.digest):
+
+            self.skipped_frames += 1
+            self.skipped_bytes  += len(message)
+
+            metrics.inc("frames_skipped")
+            metrics.inc("frame_bytes_skipped", len(message))
+
+            return (None)
+        #
+
+        header, segments = split_pairs_frame(message)
+        missing          = list(dict.fromkeys(segment for segment in segments if segment not in self.segments))
+        plan             = FramePlan(digest, header, segments, missing)
+        skipped          = len(message) - len(header) - plan.missing_bytes
+
+        self.skipped_bytes   += skipped
+        self.decoded_bytes   += len(header) + plan.missing_bytes
+        self.reused_segments += len(segments) - len(missing)
+        self.parsed_segments += len(missing)
+
+        metrics.inc("frame_bytes_skipped",   skipped)
+        metrics.inc("frame_segments_reused", len(segments) - len(missing))
+
+        return (plan)
+    #
+
+    def commit(self, plan:FramePlan, decoded:list) -> list:
+
+        """Store the frame of `plan`, given `read_segments(plan.missing)`. Return its mints."""
+
+        fresh    = dict(zip(plan.missing, decoded))
+        segments = {}
+        mints    = decode_pairs_frame(plan.header)
+
+        for segment in plan.segments:
+
+            segment_mints     = fresh[segment] if (segment in fresh) else self.segments[segment]
+            segments[segment] = segment_mints
+
+            mints.extend(segment_mints)
+        #
+
+        self.digest   = plan.digest
+        self.segments = segments
+        self.mints    = mints
+
+        return (mints)
+    #
+
+    def stats(self) -> dict:
+
+        return ({
+            "frames"          : self.frames,
+            "skipped_frames"  : self.skipped_frames,
+            "skipped_bytes"   : self.skipped_bytes,
+            "decoded_bytes"   : self.decoded_bytes,
+            "reused_segments" : self.reused_segments,
+            "parsed_segments" : self.parsed_segments,
+            "segments"        : len(self.segments),
+        })
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,233 @@
+import os
+import re
+import sys
+import json
+import sqlite3
+import argparse
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.datetimer import timestamp, yyyy_mm_dd_to_timestamp
+from utils.logger    import get_logger
+
+HISTORY_PATH        = os.path.join(os.path.dirname(__file__), '..', 'files', 'history', 'tokens.sqlite3')
+DAILY_FILE_PATTERN  = re.compile(r'introduced_tokens_(\d{4}_\d{2}_\d{2})\.jsonl?$')
+logger = get_logger(name="TokenHistory")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### TokenHistory
+#
+class TokenHistory:
+
+    """
+    SQLite index of every token the screener ever introduced: mint → first-seen timestamp, symbol,
+    chain and source feed. The mint is the primary key and first-seen has its own index, so point
+    lookups and date-range scans stay fast however many days of history are stored.
+    """
+
+    COLUMNS = ("mint", "first_seen", "symbol", "chain", "source")
+
+    def __init__(self, path:str=HISTORY_PATH) -> None:
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path       = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS tokens (
+                mint       TEXT PRIMARY KEY,
+                first_seen REAL NOT NULL,
+                symbol     TEXT,
+                chain      TEXT,
+                source     TEXT
+            ) WITHOUT ROWID
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS tokens_first_seen ON tokens (first_seen)")
+        self.connection.commit()
+    #
+
+    def record_many(self, rows:list) -> int:
+
+        """Insert (mint, first_seen, symbol, chain, source) rows. An earlier first-seen always wins. Return the number of rows given."""
+
+        with self.connection:
+
+            self.connection.executemany("""
+                INSERT INTO tokens (mint, first_seen, symbol, chain, source) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (mint) DO UPDATE SET
+                    first_seen = excluded.first_seen,
+                    symbol     = coalesce(excluded.symbol, tokens.symbol),
+                    chain      = coalesce(excluded.chain,  tokens.chain),
+                    source     = coalesce(excluded.source, tokens.source)
+                WHERE excluded.first_seen < tokens.first_seen
+            """, rows)
+        #
+
+        return (len(rows))
+    #
+
+    def record(self, mint:str, symbol:str=None, chain:str=None, source:str=None, first_seen:float=None) -> None:
+
+        self.record_many([(mint, timestamp() if first_seen is None else first_seen, symbol, chain, source)])
+    #
+
+    def lookup(self, mint:str) -> dict:
+
+        """Return the history row of a mint, or None when it was never seen."""
+
+        row = self.connection.execute("SELECT mint, first_seen, symbol, chain, source FROM tokens WHERE mint = ?", (mint,)).fetchone()
+
+        return (None if row is None else dict(zip(self.COLUMNS, row)))
+    #
+
+    def between(self, start:float, end:float, limit:int=None) -> list:
+
+        """Return the tokens first seen in [start, end), oldest first."""
+
+        query  = "SELECT mint, first_seen, symbol, chain, source FROM tokens WHERE first_seen >= ? AND first_seen < ? ORDER BY first_seen"
+        params = (start, end)
+
+        if (limit is not None):
+
+            query  += " LIMIT ?"
+            params += (limit,)
+        #
+
+        return ([dict(zip(self.COLUMNS, row)) for row in self.connection.execute(query, params)])
+    #
+
+    def import_daily_files(self, directory:str, chain:str=None, source:str=None) -> int:
+
+        """Import the daily introduced-tokens files of a directory, dated at the start of their day. Return the number of tokens imported."""
+
+        imported = 0
+
+        for filename in sorted(os.listdir(directory)):
+
+            match = DAILY_FILE_PATTERN.match(filename)
+
+            if (match is None):
+
+                continue
+            #
+
+            first_seen = yyyy_mm_dd_to_timestamp(match.group(1))
+            path       = os.path.join(directory, filename)
+            tokens     = {}
+
+            with open(path, "r", encoding="utf-8") as f:
+
+                if (filename.endswith(".json")):
+
+                    tokens.update(json.load(f))
+                #
+                else:
+
+                    for line in f:
+
+                        try:
+
+                            item = json.loads(line)
+                            tokens[item["mint"]] = item["symbol"]
+                        #
+                        except (ValueError, KeyError):
+
+                            continue
+                        #
+                    #
+                #
+            #
+
+            imported += self.record_many([(mint, first_seen, symbol, chain, source) for mint, symbol in tokens.items()])
+
+            logger.info(f"Imported {len(tokens)} tokens from {filename}")
+        #
+
+        return (imported)
+    #
+
+    def __len__(self) -> int:
+
+        return (self.connection.execute("SELECT count(*) FROM tokens").fetchone()[0])
+    #
+
+    def close(self) -> None:
+
+        self.connection.close()
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### CLI
+#
+def parse_time(value:str) -> float:
+
+    """Accept either a YYYY_MM_DD day or a UNIX timestamp."""
+
+    return (yyyy_mm_dd_to_timestamp(value) if ("_" in value) else float(value))
+#
+
+def main(argv:list=None) -> int:
+
+    parser = argparse.ArgumentParser(prog="python -m dex_screener_scraper.history", description="Query the introduced tokens history.")
+    parser.add_argument("--db", default=HISTORY_PATH, help="history database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("lookup", help="when a mint was first seen")
+    command.add_argument("mint")
+
+    command = commands.add_parser("range", help="tokens first seen in [start, end)")
+    command.add_argument("start", help="YYYY_MM_DD or UNIX timestamp")
+    command.add_argument("end",   help="YYYY_MM_DD or UNIX timestamp")
+    command.add_argument("--limit", type=int, default=None)
+
+    command = commands.add_parser("import", help="import daily introduced-tokens files")
+    command.add_argument("directory")
+    command.add_argument("--chain",  default=None)
+    command.add_argument("--source", default=None)
+
+    args    = parser.parse_args(argv)
+    history = TokenHistory(args.db)
+
+    try:
+
+        if (args.command == "lookup"):
+
+            row = history.lookup(args.mint)
+
+            print(json.dumps(row, ensure_ascii=False))
+            return (0 if row else 1)
+        #
+        elif (args.command == "range"):
+
+            for row in history.between(parse_time(args.start), parse_time(args.end), limit=args.limit):
+
+                print(json.dumps(row, ensure_ascii=False))
+            #
+            return (0)
+        #
+        else:
+
+            print(f"Imported {history.import_daily_files(args.directory, chain=args.chain, source=args.source)} tokens")
+            return (0)
+        #
+    #
+    finally:
+
+        history.close()
+    #
+#
+
+if (__name__ == "__main__"):
+
+    sys.exit(main())
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
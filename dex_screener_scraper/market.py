@@ -0,0 +1,361 @@
+import os
+import glob
+import time
+import asyncio
+import threading
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.datetimer import timestamp, yyyy_mm__dd_hh_mm_ss
+from utils.logger    import get_logger
+
+MARKET_DIR             = os.path.join(os.path.dirname(__file__), '..', 'files', 'market')
+MARKET_FORMAT          = "auto"       # "auto" (parquet when pyarrow is installed, else npz), "parquet", "feather", "npz"
+MARKET_FLUSH_ROWS      = 5_000
+MARKET_FLUSH_EVERY_SEC = 60
+
+# One row per pair of a `/tokens/v1` response. Strings are "" and numbers NaN (or 0 for counts) when missing.
+MARKET_COLUMNS = (
+    ("observed_at",      "float64", None),
+    ("chain",            "str",     ("chainId",)),
+    ("dex",              "str",     ("dexId",)),
+    ("pair_address",     "str",     ("pairAddress",)),
+    ("base_mint",        "str",     ("baseToken", "address")),
+    ("base_symbol",      "str",     ("baseToken", "symbol")),
+    ("quote_mint",       "str",     ("quoteToken", "address")),
+    ("quote_symbol",     "str",     ("quoteToken", "symbol")),
+    ("price_native",     "float64", ("priceNative",)),
+    ("price_usd",        "float64", ("priceUsd",)),
+    ("liquidity_usd",    "float64", ("liquidity", "usd")),
+    ("volume_m5",        "float64", ("volume", "m5")),
+    ("volume_h1",        "float64", ("volume", "h1")),
+    ("volume_h24",       "float64", ("volume", "h24")),
+    ("price_change_h1",  "float64", ("priceChange", "h1")),
+    ("price_change_h24", "float64", ("priceChange", "h24")),
+    ("txns_h24_buys",    "int64",   ("txns", "h24", "buys")),
+    ("txns_h24_sells",   "int64",   ("txns", "h24", "sells")),
+    ("fdv",              "float64", ("fdv",)),
+    ("market_cap",       "float64", ("marketCap",)),
+    ("pair_created_at",  "int64",   ("pairCreatedAt",)),
+)
+logger = get_logger(name="MarketSnapshots")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Rows
+#
+def pair_row(pair:dict, observed_at:float) -> tuple:
+
+    """The MARKET_COLUMNS values of one response pair, as raw JSON values."""
+
+    row = [observed_at]
+
+    for _, _, path in MARKET_COLUMNS[1:]:
+
+        value = pair
+
+        for key in path:
+
+            value = value.get(key) if isinstance(value, dict) else None
+        #
+
+        row.append(value)
+    #
+
+    return (tuple(row))
+#
+
+def column_array(values:tuple, dtype:str):
+
+    """A typed numpy array of raw JSON values, converted as a whole where possible."""
+
+    import numpy as np
+
+    if (dtype == "str"):
+
+        return (np.array(["" if (value is None) else str(value) for value in values], dtype=str))
+    #
+
+    raw          = np.array(values, dtype=object)
+    missing      = np.equal(raw, None)
+    raw[missing] = 0 if (dtype == "int64") else np.nan
+
+    try:
+
+        return (raw.astype(dtype))
+    #
+    except (TypeError, ValueError):
+
+        # A malformed value somewhere: convert one by one, keeping the missing marker for it.
+        fallback = 0 if (dtype == "int64") else np.nan
+        result   = np.empty(len(raw), dtype=dtype)
+
+        for i, value in enumerate(raw):
+
+            try:
+
+                result[i] = value
+            #
+            except (TypeError, ValueError):
+
+                result[i] = fallback
+            #
+        #
+
+        return (result)
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MarketSnapshots
+#
+class MarketSnapshots:
+
+    """
+    Columnar time series of the `/tokens/v1` responses: price, liquidity, volume, FDV and txns.
+
+    `add` only keeps the raw rows, so the lookups pay almost nothing. `flush_async` hands the
+    buffered rows to a worker thread, which turns each column into one typed numpy array and writes
+    them as a chunk file under `day=YYYY_MM_DD/` (Parquet or Feather with pyarrow, else `.npz`).
+    `load_market_snapshots` reads the chunks back as one pandas DataFrame.
+    """
+
+    def __init__(self, directory:str=MARKET_DIR, format:str=MARKET_FORMAT, flush_rows:int=MARKET_FLUSH_ROWS, flush_every_sec:float=MARKET_FLUSH_EVERY_SEC) -> None:
+
+        self.directory       = directory
+        self.format          = resolve_format(format)
+        self.flush_rows      = flush_rows
+        self.flush_every_sec = flush_every_sec
+
+        self.rows            = []
+        self.latest_flush    = time.monotonic()
+        self._lock           = threading.Lock()
+        self._sequence       = 0
+
+        self.added           = 0
+        self.written         = 0
+        self.chunks          = 0
+    #
+
+    def add(self, pairs:list, observed_at:float=None) -> int:
+
+        """Buffer the pairs of one response. Return how many rows were added."""
+
+        observed_at = timestamp() if (observed_at is None) else observed_at
+        rows        = [pair_row(pair, observed_at) for pair in pairs if isinstance(pair, dict)]
+
+        self.rows.extend(rows)
+        self.added += len(rows)
+
+        return (len(rows))
+    #
+
+    def due(self) -> bool:
+
+        return (len(self.rows) >= self.flush_rows) or (bool(self.rows) and time.monotonic() - self.latest_flush >= self.flush_every_sec)
+    #
+
+    def take(self) -> list:
+
+        rows              = self.rows
+        self.rows         = []
+        self.latest_flush = time.monotonic()
+
+        return (rows)
+    #
+
+    def flush(self) -> int:
+
+        return (self.write(self.take()))
+    #
+
+    async def flush_async(self) -> int:
+
+        """Take the buffered rows on the loop, then build and write the chunk from a worker thread."""
+
+        rows = self.take()
+
+        if (not rows):
+
+            return (0)
+        #
+
+        try:
+
+            return (await asyncio.to_thread(self.write, rows))
+        #
+        except Exception as e:
+
+            self.rows = rows + self.rows
+
+            logger.error(f"Failed writing market snapshots • {e}")
+            return (0)
+        #
+    #
+
+    def write(self, rows:list) -> int:
+
+        """Write `rows` as one chunk per day. Return the number of rows written."""
+
+        if (not rows):
+
+            return (0)
+        #
+
+        days = {}
+
+        for index, row in enumerate(rows):
+
+            days.setdefault(yyyy_mm__dd_hh_mm_ss(row[0])[:10], []).append(index)
+        #
+
+        columns = list(zip(*rows))
+
+        for day, indexes in days.items():
+
+            day_columns = columns if (len(indexes) == len(rows)) else [tuple(column[i] for i in indexes) for column in columns]
+            arrays      = {name: column_array(values, dtype) for (name, dtype, _), values in zip(MARKET_COLUMNS, day_columns)}
+
+            self.write_chunk(day, arrays)
+        #
+
+        self.written += len(rows)
+
+        return (len(rows))
+    #
+
+    def write_chunk(self, day:str, arrays:dict) -> str:
+
+        with self._lock:
+
+            self._sequence += 1
+            sequence        = self._sequence
+        #
+
+        directory = os.path.join(self.directory, f"day={day}")
+        os.makedirs(directory, exist_ok=True)
+
+        path      = os.path.join(directory, f"part-{int(time.time() * 1000)}-{os.getpid()}-{sequence:05d}.{self.format}")
+        tmp_path  = path + ".tmp"
+
+        if (self.format == "npz"):
+
+            import numpy as np
+
+            with open(tmp_path, "wb") as f:
+
+                np.savez_compressed(f, **arrays)
+            #
+        #
+        else:
+
+            import pyarrow
+            import pyarrow.feather
+            import pyarrow.parquet
+
+            table = pyarrow.table(arrays)
+
+            if (self.format == "parquet"):
+
+                pyarrow.parquet.write_table(table, tmp_path, compression="zstd")
+            #
+            else:
+
+                pyarrow.feather.write_feather(table, tmp_path, compression="zstd")
+            #
+        #
+
+        # Readers only ever see complete chunks.
+        os.replace(tmp_path, path)
+        self.chunks += 1
+
+        return (path)
+    #
+
+    def stats(self) -> dict:
+
+        return ({
+            "buffered" : len(self.rows),
+            "added"    : self.added,
+            "written"  : self.written,
+            "chunks"   : self.chunks,
+        })
+    #
+#
+
+def resolve_format(format:str) -> str:
+
+    if (format != "auto"):
+
+        return (format)
+    #
+
+    try:
+
+        import pyarrow
+
+        return ("parquet")
+    #
+    except ImportError:
+
+        return ("npz")
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Reading
+#
+def load_market_snapshots(directory:str=MARKET_DIR, start_day:str=None, end_day:str=None):
+
+    """Return the snapshots of the YYYY_MM_DD days in [start_day, end_day] as one pandas DataFrame."""
+
+    import numpy as np
+    import pandas as pd
+
+    frames = []
+
+    for day_directory in sorted(glob.glob(os.path.join(directory, "day=*"))):
+
+        day = os.path.basename(day_directory)[len("day="):]
+
+        if (start_day is not None and day < start_day) or (end_day is not None and day > end_day):
+
+            continue
+        #
+
+        for path in sorted(glob.glob(os.path.join(day_directory, "part-*"))):
+
+            if (path.endswith(".parquet")):
+
+                frames.append(pd.read_parquet(path))
+            #
+            elif (path.endswith(".feather")):
+
+                frames.append(pd.read_feather(path))
+            #
+            elif (path.endswith(".npz")):
+
+                with np.load(path) as data:
+
+                    frames.append(pd.DataFrame({name: data[name] for name, _, _ in MARKET_COLUMNS}))
+                #
+            #
+        #
+    #
+
+    if (not frames):
+
+        return (pd.DataFrame(columns=[name for name, _, _ in MARKET_COLUMNS]))
+    #
+
+    frame                = pd.concat(frames, ignore_index=True)
+    frame["observed_at"] = pd.to_datetime(frame["observed_at"], unit="s", utc=True)
+
+    return (frame)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,245 @@
+import gc
+import os
+import time
+import array
+import struct
+import asyncio
+from itertools import islice
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.logger import get_logger
+
+METADATA_CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', 'files', 'cache', 'token_metadata.bin')
+MISSING             = object()
+
+# Snapshots are columnar: NUL-joined mints, NUL-joined symbols and a float64 array of expiries.
+SNAPSHOT_MAGIC      = b"DSMC1\n"
+SNAPSHOT_HEADER     = "<QQQ"
+NEGATIVE_SYMBOL     = "\x01"
+EVICT_FRACTION      = 0.01      # evict this share of `max_size` at once: a plain dict finds its oldest entries in one scan
+logger = get_logger(name="MetadataCache")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MetadataCache
+#
+class MetadataCache:
+
+    """
+    Bounded LRU cache of token symbols with per-entry expiry.
+
+    A `None` symbol is a negative entry: the mint was looked up and has no usable metadata, so it is
+    not asked for again until `negative_ttl` runs out. `get` returns `MISSING` for unknown or expired
+    mints. The cache can be snapshotted to, and warm-started from, a columnar file.
+
+    The entries are a plain dict in least recently used order (a used entry is re-inserted at the
+    end), not an OrderedDict: a dict copies and builds several times faster, which is what the
+    snapshots and warm starts of a million entries spend their time on.
+    """
+
+    def __init__(self, max_size:int=1_000_000, ttl:float=7*24*60*60, negative_ttl:float=10*60, path:str=METADATA_CACHE_PATH) -> None:
+
+        self.max_size      = max_size
+        self.ttl           = ttl
+        self.negative_ttl  = negative_ttl
+        self.path          = path
+
+        self._entries      = {}
+
+        self.hits          = 0
+        self.negative_hits = 0
+        self.misses        = 0
+        self.expirations   = 0
+    #
+
+    def get(self, mint:str):
+
+        entry = self._entries.get(mint)
+
+        if (entry is None):
+
+            self.misses += 1
+            return (MISSING)
+        #
+
+        symbol, expires_at = entry
+
+        if (expires_at <= time.time()):
+
+            del self._entries[mint]
+            self.expirations += 1
+            self.misses      += 1
+            return (MISSING)
+        #
+
+        self._entries[mint] = self._entries.pop(mint)
+
+        if (symbol is None):
+
+            self.negative_hits += 1
+        #
+        else:
+
+            self.hits += 1
+        #
+
+        return (symbol)
+    #
+
+    def put(self, mint:str, symbol:str, ttl:float=None) -> None:
+
+        self._entries.pop(mint, None)
+        self._entries[mint] = (symbol, time.time() + (ttl if ttl is not None else self.ttl))
+
+        if (len(self._entries) > self.max_size):
+
+            self.evict(len(self._entries) - self.max_size + int(self.max_size * EVICT_FRACTION))
+        #
+    #
+
+    def evict(self, count:int) -> None:
+
+        """Drop the `count` least recently used entries."""
+
+        for mint in list(islice(self._entries, count)):
+
+            del self._entries[mint]
+        #
+    #
+
+    def put_negative(self, mint:str) -> None:
+
+        self.put(mint, None, ttl=self.negative_ttl)
+    #
+
+    @property
+    def hit_rate(self) -> float:
+
+        lookups = self.hits + self.negative_hits + self.misses
+
+        return ((self.hits + self.negative_hits) / lookups if lookups else 0.0)
+    #
+
+    def stats(self) -> dict:
+
+        return ({
+            "size"          : len(self._entries),
+            "hits"          : self.hits,
+            "negative_hits" : self.negative_hits,
+            "misses"        : self.misses,
+            "expirations"   : self.expirations,
+            "hit_rate"      : self.hit_rate,
+        })
+    #
+
+    def __len__(self) -> int:
+
+        return (len(self._entries))
+    #
+    ##############################################################
+    #
+    def load(self) -> int:
+
+        """Warm-start from the snapshot, keeping the most recently used entries. Return how many were loaded."""
+
+        if (not os.path.exists(self.path)):
+
+            return (0)
+        #
+
+        started = time.perf_counter()
+
+        with open(self.path, "rb") as f:
+
+            data = f.read()
+        #
+
+        if (not data.startswith(SNAPSHOT_MAGIC)):
+
+            logger.warning(f"Ignoring the unrecognized metadata cache snapshot {self.path}")
+            return (0)
+        #
+
+        offset                             = len(SNAPSHOT_MAGIC)
+        count, mints_size, symbols_size    = struct.unpack_from(SNAPSHOT_HEADER, data, offset)
+        offset                            += struct.calcsize(SNAPSHOT_HEADER)
+        mints                              = data[offset:offset+mints_size].decode("utf-8").split("\x00") if count else []
+        offset                            += mints_size
+        symbols_text                       = data[offset:offset+symbols_size].decode("utf-8")
+        symbols                            = symbols_text.split("\x00") if count else []
+        offset                            += symbols_size
+        expiries                           = array.array("d")
+        expiries.frombytes(data[offset:offset+8*count])
+
+        # Columns in, one dict out: expired entries are dropped lazily by `get`, not checked here.
+        # The million new tuples would trigger several full collections on the way, for nothing.
+        start         = max(0, count - self.max_size)
+        symbols       = [None if (symbol == NEGATIVE_SYMBOL) else symbol for symbol in symbols[start:]] if (NEGATIVE_SYMBOL in symbols_text) else symbols[start:]
+        collecting    = gc.isenabled()
+        gc.disable()
+
+        try:
+
+            self._entries = dict(zip(mints[start:], zip(symbols, expiries[start:].tolist())))
+        #
+        finally:
+
+            if (collecting):
+
+                gc.enable()
+            #
+        #
+
+        logger.info(f"Loaded {len(self._entries)} cached token metadata entries in {time.perf_counter() - started:.3f}s")
+
+        return (len(self._entries))
+    #
+
+    def write_snapshot(self, entries:dict) -> None:
+
+        """Write {mint: (symbol, expires_at)} entries, least recently used first, as the new snapshot."""
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        now      = time.time()
+        entries  = [(mint, symbol, expires_at) for mint, (symbol, expires_at) in entries.items() if (expires_at > now)]
+        mints    = "\x00".join(mint for mint, _, _ in entries).encode("utf-8")
+        symbols  = "\x00".join(NEGATIVE_SYMBOL if (symbol is None) else symbol.replace("\x00", "") for _, symbol, _ in entries).encode("utf-8")
+        expiries = array.array("d", [expires_at for _, _, expires_at in entries]).tobytes()
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "wb") as f:
+
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack(SNAPSHOT_HEADER, len(entries), len(mints), len(symbols)))
+            f.write(mints)
+            f.write(symbols)
+            f.write(expiries)
+            f.flush()
+            os.fsync(f.fileno())
+        #
+
+        os.replace(tmp_path, self.path)
+
+        return (len(entries))
+    #
+
+    def save(self) -> int:
+
+        return (self.write_snapshot(self._entries))
+    #
+
+    async def save_async(self) -> int:
+
+        """Copy the entries on the loop (a dict copy, no per-entry work), then build the columns and write them from a worker thread."""
+
+        return (await asyncio.to_thread(self.write_snapshot, self._entries.copy()))
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
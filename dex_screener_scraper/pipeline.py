@@ -0,0 +1,277 @@
+import asyncio
+import time
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.logger import get_logger
+
+logger = get_logger(name="MintPipeline")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MintPipeline
+#
+class MintPipeline:
+
+    """
+    Staged lookup pipeline of a Screener: dedupe → bounded queue → worker pool → batched sink.
+
+    `submit` drops mints that are already processed, queued, in flight or waiting for a retry, and
+    blocks while the lookup queue is full, which pushes back on the frame reader. The `queued` set
+    can be shared by the pipelines of several feeds, so a mint queued by one is not queued again.
+    A fixed pool of workers drains the queue in multi-address batches. Every resolved batch is
+    handed to the sink, which persists new tokens as soon as `sink_batch` of them are pending or
+    `sink_interval` passed since the last flush. Retries are fed back in as soon as they are due.
+    """
+
+    def __init__(self, screener, workers:int=4, queue_size:int=1000, batch_size:int=30, sink_batch:int=50, sink_interval:float=1.0, queued:set=None) -> None:
+
+        self.screener      = screener
+        self.workers_count = workers
+        self.batch_size    = batch_size
+        self.sink_batch    = sink_batch
+        self.sink_interval = sink_interval
+        self.queue_size    = queue_size
+
+        self.lookup_queue  = None
+        self.sink_queue    = None
+        self.tasks         = []
+        self.queued        = queued if (queued is not None) else set()
+        self.closing       = False
+
+        self.busy_workers  = 0
+        self.resolved      = 0
+        self.failed        = 0
+        self.flushes       = 0
+    #
+
+    @property
+    def started(self) -> bool:
+
+        return (bool(self.tasks))
+    #
+
+    def start(self) -> None:
+
+        if (self.started):
+
+            return
+        #
+
+        self.closing      = False
+        self.lookup_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.sink_queue   = asyncio.Queue()
+        self.tasks        = [asyncio.create_task(self.worker(i)) for i in range(self.workers_count)]
+        self.tasks       += [asyncio.create_task(self.sink()), asyncio.create_task(self.retry_feeder())]
+
+        logger.debug(f"Mint pipeline started with {self.workers_count} workers")
+    #
+
+    def gauges(self) -> dict:
+
+        return ({
+            "lookup_queue" : self.lookup_queue.qsize() if self.lookup_queue else 0,
+            "sink_queue"   : self.sink_queue.qsize()   if self.sink_queue   else 0,
+            "busy_workers" : self.busy_workers,
+            "retry_queue"  : len(self.screener.retry_queue),
+            "unsaved"      : len(self.screener.unsaved_mints),
+            "resolved"     : self.resolved,
+            "failed"       : self.failed,
+            "flushes"      : self.flushes,
+        })
+    #
+    ##############################################################
+    #
+    async def submit(self, mints, retry:bool=False) -> int:
+
+        """Queue the mints that still need a lookup. Return how many were queued."""
+
+        if (self.closing):
+
+            return (0)
+        #
+
+        self.start()
+
+        screener = self.screener
+        queued   = 0
+
+        for mint in dict.fromkeys(mints):
+
+            if (mint in self.queued) or (mint in screener.processed_mints) or (mint in screener.inflight_mints):
+
+                if (retry):
+
+                    screener.retry_queue.finish(mint)
+                #
+                continue
+            #
+            elif (not retry) and (mint in screener.retry_queue):
+
+                continue
+            #
+
+            self.queued.add(mint)
+            await self.lookup_queue.put(mint)
+            queued += 1
+        #
+
+        return (queued)
+    #
+
+    async def worker(self, index:int) -> None:
+
+        while (True):
+
+            batch = [await self.lookup_queue.get()]
+
+            while (len(batch) < self.batch_size) and (not self.lookup_queue.empty()):
+
+                batch.append(self.lookup_queue.get_nowait())
+            #
+
+            self.queued.difference_update(batch)
+            self.busy_workers += 1
+
+            try:
+
+                chains = {}
+                for mint in batch:
+
+                    chains.setdefault(self.screener.mint_chain(mint), []).append(mint)
+                #
+
+                for chain, mints in chains.items():
+
+                    results        = await self.screener.complete_mints_info(mints, chain=chain)
+                    self.resolved += sum(1 for ok in results.values() if ok)
+                    self.failed   += sum(1 for ok in results.values() if not ok)
+
+                    self.sink_queue.put_nowait(results)
+                #
+            #
+            except Exception as e:
+
+                logger.error(f"[{index}] Mint pipeline worker failed a batch • {e}")
+            #
+            finally:
+
+                self.busy_workers -= 1
+
+                for _ in batch:
+
+                    self.lookup_queue.task_done()
+                #
+            #
+        #
+    #
+
+    async def sink(self) -> None:
+
+        pending      = 0
+        latest_flush = time.monotonic()
+
+        while (True):
+
+            # Results coming in steadily must not hold the flush back: wait only until the next one is due.
+            try:
+
+                results  = await asyncio.wait_for(self.sink_queue.get(), timeout=max(0.0, latest_flush + self.sink_interval - time.monotonic()))
+                pending += sum(1 for ok in results.values() if ok)
+
+                self.sink_queue.task_done()
+            #
+            except asyncio.TimeoutError:
+
+                pass
+            #
+
+            if (pending >= self.sink_batch) or (time.monotonic() - latest_flush >= self.sink_interval):
+
+                pending      = 0
+                latest_flush = time.monotonic()
+                self.flush()
+            #
+        #
+    #
+
+    def flush(self) -> None:
+
+        if (self.screener.unsaved_mints):
+
+            self.flushes += 1
+            self.screener.persist()
+        #
+    #
+
+    async def retry_feeder(self) -> None:
+
+        while (True):
+
+            due_in = self.screener.retry_queue.next_due()
+
+            await asyncio.sleep(min(1.0, due_in) if (due_in is not None) else 1.0)
+
+            due = self.screener.retry_queue.pop_due()
+
+            if (due):
+
+                await self.submit(due, retry=True)
+            #
+        #
+    #
+    ##############################################################
+    #
+    async def join(self) -> None:
+
+        """Wait until every queued mint is resolved, then persist the results."""
+
+        if (not self.started):
+
+            return
+        #
+
+        await self.lookup_queue.join()
+        await self.sink_queue.join()
+        self.flush()
+    #
+
+    async def drain(self, timeout:float=None) -> None:
+
+        """Stop accepting mints, finish the queued ones (for up to `timeout` seconds), persist them and stop the stages."""
+
+        if (not self.started):
+
+            return
+        #
+
+        self.closing = True
+
+        logger.debug(f"Draining mint pipeline • {self.gauges()}")
+
+        try:
+
+            await asyncio.wait_for(self.join(), timeout=timeout)
+        #
+        except asyncio.TimeoutError:
+
+            # The unresolved mints are not marked processed, so the next run looks them up again.
+            logger.warning(f"Mint pipeline not drained after {timeout}s • {self.gauges()}")
+            self.flush()
+        #
+
+        for task in self.tasks:
+
+            task.cancel()
+        #
+
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
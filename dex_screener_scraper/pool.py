@@ -0,0 +1,166 @@
+import asyncio
+from urllib.parse import urlsplit, parse_qsl
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.logger      import get_logger
+from utils.seen_index  import SeenIndex
+from utils.http_client import close_watchlist_async_clients
+from utils.metrics     import metrics
+from utils.offload     import offloader, loop_monitor
+
+from dex_screener_scraper.screener import Screener, DS_DEFAULT_CHAIN, SCREENER_DIR, SCREENER_HISTORY_ENABLED
+from dex_screener_scraper.screener import PROCESSED_MINTS_MAX_SIZE, PROCESSED_MINTS_TTL_SEC, PROCESSED_MINTS_BLOOM, MARKET_SNAPSHOTS_ENABLED
+from dex_screener_scraper.screener import RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY_SEC, RETRY_MAX_DELAY_SEC, RETRY_MAX_IN_FLIGHT
+from dex_screener_scraper.store    import MintStore
+from dex_screener_scraper.history  import TokenHistory
+from dex_screener_scraper.events   import EventBus
+from dex_screener_scraper.market   import MarketSnapshots
+from dex_screener_scraper.retry    import RetryQueue
+from dex_screener_scraper.tracker  import MintTracker, TRACKER_ENABLED
+
+logger = get_logger(name="ScreenerPool")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### ScreenerPool
+#
+def feed_chain(websocket_url:str, default:str=DS_DEFAULT_CHAIN) -> str:
+
+    """Return the chain a feed is filtered on, from its `filters[chainIds][0]` query parameter."""
+
+    for key, value in parse_qsl(urlsplit(websocket_url).query):
+
+        if (key.startswith("filters[chainIds]")):
+
+            return (value)
+        #
+    #
+
+    return (default)
+#
+
+class ScreenerPool:
+
+    """
+    Several screener feeds watched concurrently on one event loop.
+
+    All feeds share one seen-mint index, one queued set, one in-flight set, one retry queue, one
+    `final_mints` dict, one event bus and one market snapshots writer, so a mint listed by several
+    feeds is looked up and announced once.
+    Info lookups, and the polls of the optional `MintTracker`, go through `Screener.ds_rate_limiter`,
+    which is class-level and therefore one global rate budget for the whole pool.
+    """
+
+    def __init__(self, feeds:list, store_dir:str=SCREENER_DIR, history:bool=SCREENER_HISTORY_ENABLED, market:bool=MARKET_SNAPSHOTS_ENABLED, tracker:bool=TRACKER_ENABLED) -> None:
+
+        logger.info(f"Initializing screener pool with {len(feeds)} feeds")
+
+        self.processed_mints = SeenIndex(max_size=PROCESSED_MINTS_MAX_SIZE, ttl=PROCESSED_MINTS_TTL_SEC, bloom=PROCESSED_MINTS_BLOOM)
+        self.inflight_mints  = set()
+        self.queued_mints    = set()
+        self.retry_queue     = RetryQueue(max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY_SEC, max_delay=RETRY_MAX_DELAY_SEC, max_in_flight=RETRY_MAX_IN_FLIGHT)
+        self.store           = MintStore(store_dir)
+        self.history         = TokenHistory() if history else None
+        self.events          = EventBus()
+        self.market          = MarketSnapshots() if market else None
+        self.screeners       = []
+
+        for feed in feeds:
+
+            websocket_url, chain = (feed, feed_chain(feed)) if isinstance(feed, str) else feed
+
+            self.screeners.append(Screener(websocket_url,
+                                           chain           = chain,
+                                           processed_mints = self.processed_mints,
+                                           inflight_mints  = self.inflight_mints,
+                                           queued_mints    = self.queued_mints,
+                                           retry_queue     = self.retry_queue,
+                                           store           = self.store,
+                                           history         = self.history if (self.history is not None) else False,
+                                           events          = self.events,
+                                           market          = self.market  if (self.market  is not None) else False,
+                                           final_mints     = self.screeners[0].final_mints    if self.screeners else None,
+                                           metadata_cache  = self.screeners[0].metadata_cache if self.screeners else None))
+        #
+
+        # The feeds split the one rate budget: each cadence only counts on its part of it.
+        for screener in self.screeners:
+
+            screener.cadence.feeds = len(self.screeners)
+        #
+
+        self.tracker         = None
+
+        if (tracker) and (self.screeners):
+
+            self.tracker = MintTracker(self.screeners[0])
+            self.tracker.load()
+        #
+    #
+
+    @property
+    def final_mints(self) -> dict:
+
+        return (self.screeners[0].final_mints if self.screeners else {})
+    #
+
+    async def refresh(self) -> bool:
+
+        if (self.tracker is not None):
+
+            self.tracker.start()
+        #
+
+        results = await asyncio.gather(*[screener.refresh() for screener in self.screeners])
+
+        return (all(results))
+    #
+
+    async def stream(self) -> None:
+
+        if (self.tracker is not None):
+
+            self.tracker.start()
+        #
+
+        await asyncio.gather(*[screener.stream() for screener in self.screeners])
+    #
+
+    async def aclose(self, drain_timeout:float=None) -> None:
+
+        """Drain the lookups of every feed (for up to `drain_timeout` seconds each), save the results and close the clients."""
+
+        if (self.tracker is not None):
+
+            await self.tracker.aclose()
+        #
+
+        for screener in self.screeners:
+
+            await screener.aclose(close_clients=False, drain_timeout=drain_timeout)
+        #
+
+        await self.events.aclose()
+        await close_watchlist_async_clients()
+        await loop_monitor.aclose()
+        await metrics.aclose()
+        offloader.shutdown()
+    #
+
+    async def __aenter__(self):
+
+        return (self)
+    #
+
+    async def __aexit__(self, *exc_info) -> None:
+
+        await self.aclose()
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,440 @@
+import re
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from dex_screener_scraper.decoder import decode_pairs_frame
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Protocol
+#
+# Pairs frames (protocol 1.3.0) are Avro-style records: strings are a zigzag varint length followed
+# by UTF-8 bytes, and every pair record starts with its chain id string. A chain id can also be the
+# name or symbol of a token ("base", "sui", "ton"): a pair only starts where the chain id is followed
+# by a dex id, the pair address and the base token address.
+PROTOCOL_HEADER = b'\x00\n1.3.0\n'
+PAIRS_MARKER    = b'pairs'
+
+CHAIN_IDS = ("solana", "ethereum", "bsc", "base", "arbitrum", "polygon", "avalanche", "optimism",
+             "sui", "ton", "tron", "pulsechain", "blast", "linea", "sonic", "abstract", "hyperliquid")
+
+PAIR_START_PATTERN = re.compile(b'|'.join(re.escape(bytes([2 * len(chain)]) + chain.encode()) for chain in CHAIN_IDS))
+ADDRESS_PATTERN    = re.compile(r'(?:0x[0-9a-fA-F]{40,64}|[1-9A-HJ-NP-Za-km-z]{32,44})')
+NUMBER_PATTERN     = re.compile(r'-?\d+(?:\.\d+)?(?:[eE]-?\d+)?')
+DEX_ID_PATTERN     = re.compile(r'[a-z0-9][a-z0-9_.\-]{1,31}')
+
+MAX_STRING_LENGTH  = 256
+PAIR_START_WINDOW  = 512        # bytes in which the chain id, dex id, pair and base addresses of a pair start must fit
+READ_PAIRS_SHARE   = 0.5        # past this share of the listed mints, `read_pairs` parses the whole frame
+
+# The strings of a pair record, in order. Only a record with exactly these (see `PairRecord.validated`)
+# is trusted for its symbol: anything else may have a spurious string shifting the fields.
+PAIR_STRING_FIELDS = ("chain", "dex", "pair_address", "base_mint", "base_name", "base_symbol",
+                      "quote_mint", "quote_name", "quote_symbol", "price_native", "price_usd")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### PairRecord
+#
+class PairRecord:
+
+    """
+    One pair of a pairs frame. Fields that are not present in the frame are None.
+
+    `validated` is True when the record had exactly the PAIR_STRING_FIELDS, each of the expected
+    kind; otherwise its fields are a best guess. Liquidity and creation time are not strings, so
+    they are not read from frames: the market snapshots take them from the API.
+    """
+
+    __slots__ = ("chain", "dex", "pair_address", "base_mint", "base_name", "base_symbol",
+                 "quote_mint", "quote_symbol", "price_native", "price_usd", "validated")
+
+    def __init__(self, chain:str, dex:str=None, pair_address:str=None,
+                 base_mint:str=None, base_name:str=None, base_symbol:str=None,
+                 quote_mint:str=None, quote_symbol:str=None,
+                 price_native:float=None, price_usd:float=None, validated:bool=False) -> None:
+
+        self.chain         = chain
+        self.dex           = dex
+        self.pair_address  = pair_address
+        self.base_mint     = base_mint
+        self.base_name     = base_name
+        self.base_symbol   = base_symbol
+        self.quote_mint    = quote_mint
+        self.quote_symbol  = quote_symbol
+        self.price_native  = price_native
+        self.price_usd     = price_usd
+        self.validated     = validated
+    #
+
+    def __repr__(self) -> str:
+
+        return (f"PairRecord(chain={self.chain!r}, pair={self.pair_address!r}, base={self.base_mint!r}, symbol={self.base_symbol!r}, price_usd={self.price_usd!r}, validated={self.validated!r})")
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Parser
+#
+def read_string(buffer:bytes, offset:int) -> tuple:
+
+    """Read an Avro string at `offset`. Return (text, next_offset), or (None, offset) when there is none."""
+
+    value = 0
+    shift = 0
+    index = offset
+
+    while (index < len(buffer)) and (shift <= 14):
+
+        byte   = buffer[index]
+        value |= (byte & 0x7F) << shift
+        index += 1
+
+        if (not byte & 0x80):
+
+            break
+        #
+
+        shift += 7
+    #
+    else:
+
+        return (None, offset)
+    #
+
+    length = (value >> 1) ^ -(value & 1)
+    end    = index + length
+
+    if (length <= 0) or (length > MAX_STRING_LENGTH) or (end > len(buffer)):
+
+        return (None, offset)
+    #
+
+    try:
+
+        text = bytes(buffer[index:end]).decode("utf-8")
+    #
+    except UnicodeDecodeError:
+
+        return (None, offset)
+    #
+
+    if (not text.isprintable()):
+
+        return (None, offset)
+    #
+
+    return (text, end)
+#
+
+def read_strings(segment:bytes, offset:int=0, limit:int=None, end:int=None) -> list:
+
+    """Return the Avro strings of a pair segment, skipping the non-string fields in between: the first `limit` ones before `end`."""
+
+    strings = []
+    end     = len(segment) if (end is None) else min(end, len(segment))
+
+    while (offset < end) and (len(strings) != limit):
+
+        text, next_offset = read_string(segment, offset)
+
+        if (text is None):
+
+            offset += 1
+            continue
+        #
+
+        strings.append(text)
+        offset = next_offset
+    #
+
+    return (strings)
+#
+
+def pair_start(buffer:bytes, offset:int, final:bool=True):
+
+    """Whether the chain id at `offset` starts a pair. None when the buffer is too short to tell yet and `final` is False."""
+
+    if (not final) and (len(buffer) - offset < PAIR_START_WINDOW):
+
+        return (None)
+    #
+
+    strings = read_strings(buffer, offset, limit=4, end=offset + PAIR_START_WINDOW)
+
+    return ((len(strings) == 4) and
+            (DEX_ID_PATTERN.fullmatch(strings[1]) is not None) and
+            (ADDRESS_PATTERN.fullmatch(strings[2]) is not None) and
+            (ADDRESS_PATTERN.fullmatch(strings[3]) is not None))
+#
+
+def pair_starts(buffer:bytes, begin:int=0, final:bool=True) -> list:
+
+    """Offsets of the pairs starting in `buffer` from `begin`. Unless `final`, stops before the first one it can not tell yet."""
+
+    starts = []
+
+    for match in PAIR_START_PATTERN.finditer(buffer, begin):
+
+        is_start = pair_start(buffer, match.start(), final)
+
+        if (is_start is None):
+
+            break
+        #
+        elif (is_start):
+
+            starts.append(match.start())
+        #
+    #
+
+    return (starts)
+#
+
+def next_pair_start(buffer:bytes, begin:int=0) -> int:
+
+    """Offset of the first pair starting in `buffer` from `begin`, or the end of the buffer."""
+
+    for match in PAIR_START_PATTERN.finditer(buffer, begin):
+
+        if (pair_start(buffer, match.start())):
+
+            return (match.start())
+        #
+    #
+
+    return (len(buffer))
+#
+
+def has_pair_layout(strings:list) -> bool:
+
+    """Whether the strings of a pair are exactly the PAIR_STRING_FIELDS, each of the expected kind."""
+
+    if (len(strings) != len(PAIR_STRING_FIELDS)):
+
+        return (False)
+    #
+
+    chain, dex, pair_address, base_mint, base_name, base_symbol, quote_mint, quote_name, quote_symbol, price_native, price_usd = strings
+
+    return ((chain in CHAIN_IDS) and
+            (DEX_ID_PATTERN.fullmatch(dex) is not None) and
+            all(ADDRESS_PATTERN.fullmatch(text) for text in (pair_address, base_mint, quote_mint)) and
+            not any(ADDRESS_PATTERN.fullmatch(text) or NUMBER_PATTERN.fullmatch(text) for text in (base_name, base_symbol, quote_name, quote_symbol)) and
+            all(NUMBER_PATTERN.fullmatch(text) for text in (price_native, price_usd)))
+#
+
+def parse_pair_segment(segment:bytes) -> PairRecord:
+
+    """Build a PairRecord from the bytes of a single pair, starting at its chain id."""
+
+    strings = read_strings(segment)
+
+    if (not strings) or (strings[0] not in CHAIN_IDS):
+
+        return (None)
+    #
+
+    record    = PairRecord(chain=strings[0], dex=strings[1] if len(strings) > 1 else None, validated=has_pair_layout(strings))
+    addresses = [i for i, text in enumerate(strings) if ADDRESS_PATTERN.fullmatch(text)]
+
+    if (len(addresses) < 2):
+
+        return (None)
+    #
+
+    record.pair_address = strings[addresses[0]]
+    base                = addresses[1]
+    record.base_mint    = strings[base]
+    record.base_name    = strings[base+1] if base+1 < len(strings) else None
+    record.base_symbol  = strings[base+2] if base+2 < len(strings) else None
+
+    if (len(addresses) > 2):
+
+        quote               = addresses[2]
+        record.quote_mint   = strings[quote]
+        record.quote_symbol = strings[quote+2] if quote+2 < len(strings) else None
+        prices              = [float(text) for text in strings[quote+3:] if NUMBER_PATTERN.fullmatch(text)]
+
+        if (len(prices) > 0):
+
+            record.price_native = prices[0]
+        #
+        if (len(prices) > 1):
+
+            record.price_usd = prices[1]
+        #
+    #
+
+    return (record)
+#
+
+class PairsFrameParser:
+
+    """
+    Incremental parser of pairs frames.
+
+    Feed the frame in chunks of any size; each pair record is returned as soon as the start of the
+    next one has arrived and could be told from a token named like a chain (up to PAIR_START_WINDOW
+    bytes later), and `close` returns the rest.
+    """
+
+    def __init__(self) -> None:
+
+        self._buffer      = bytearray()
+        self._header_seen = False
+    #
+
+    def feed(self, chunk:bytes) -> list:
+
+        """Append a chunk of the frame. Return the pair records completed by it."""
+
+        self._buffer += chunk
+
+        if (not self._header_seen):
+
+            if (len(self._buffer) < len(PROTOCOL_HEADER)):
+
+                return ([])
+            #
+            if (not self._buffer.startswith(PROTOCOL_HEADER)):
+
+                raise ValueError("Not a 1.3.0 pairs frame")
+            #
+
+            pairs_start = self._buffer.find(PAIRS_MARKER)
+
+            if (pairs_start == -1):
+
+                return ([])
+            #
+
+            del self._buffer[:pairs_start + len(PAIRS_MARKER)]
+            self._header_seen = True
+        #
+
+        starts  = pair_starts(self._buffer, final=False)
+        records = [parse_pair_segment(self._buffer[start:end]) for start, end in zip(starts, starts[1:])]
+
+        if (len(starts) > 1):
+
+            del self._buffer[:starts[-1]]
+        #
+
+        return ([record for record in records if record is not None])
+    #
+
+    def close(self) -> list:
+
+        """Return the pair records left at the end of the frame and reset the parser."""
+
+        records = []
+
+        if (self._header_seen):
+
+            # The end of the frame settles the starts `feed` could not tell yet.
+            starts  = pair_starts(self._buffer)
+            records = [parse_pair_segment(self._buffer[start:end]) for start, end in zip(starts, starts[1:] + [len(self._buffer)])]
+        #
+
+        self._buffer.clear()
+        self._header_seen = False
+
+        return ([record for record in records if record is not None])
+    #
+#
+
+def parse_pairs_frame(message:bytes) -> list:
+
+    """Return the pair records of a complete pairs frame."""
+
+    parser = PairsFrameParser()
+
+    return (parser.feed(message) + parser.close())
+#
+
+def read_pair(message:bytes, mint:str) -> PairRecord:
+
+    """
+    Return the first pair record of a complete frame whose base token is `mint`, or None. Only that
+    record is parsed: the address is searched for, and the record cut at the same pair starts as
+    PairsFrameParser.
+    """
+
+    address = mint.encode()
+    offset  = message.find(address)
+
+    while (offset != -1):
+
+        for match in reversed(list(PAIR_START_PATTERN.finditer(message, max(0, offset - PAIR_START_WINDOW), offset))):
+
+            if (pair_start(message, match.start())):
+
+                record = parse_pair_segment(message[match.start():next_pair_start(message, offset)])
+
+                if (record is not None) and (record.base_mint == mint):
+
+                    return (record)
+                #
+
+                break
+            #
+        #
+
+        offset = message.find(address, offset + len(address))
+    #
+
+    return (None)
+#
+
+def read_pairs(message:bytes, mints:list, listed:int=None) -> dict:
+
+    """
+    Return {mint: PairRecord} for the `mints` of a complete frame that have a pair in it. Each record
+    is parsed on its own, unless the mints are most of the `listed` ones: then parsing the whole
+    frame is cheaper.
+    """
+
+    if (listed) and (len(mints) > READ_PAIRS_SHARE * listed):
+
+        wanted = set(mints)
+        pairs  = {}
+
+        for pair in parse_pairs_frame(message):
+
+            if (pair.base_mint in wanted):
+
+                pairs.setdefault(pair.base_mint, pair)
+            #
+        #
+
+        return (pairs)
+    #
+
+    pairs = {}
+
+    for mint in mints:
+
+        pair = read_pair(message, mint)
+
+        if (pair is not None):
+
+            pairs[mint] = pair
+        #
+    #
+
+    return (pairs)
+#
+
+def read_pairs_frame(message:bytes) -> tuple:
+
+    """Return (pair records, mints) of a pairs frame. Module-level, so a process pool can run it."""
+
+    return (parse_pairs_frame(message), decode_pairs_frame(message))
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,114 @@
+import heapq
+import random
+import time
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### RetryQueue
+#
+class RetryQueue:
+
+    """
+    Delayed re-queue of mints whose lookup failed transiently.
+
+    Every failure pushes the mint back with an exponential, fully jittered delay, until it has failed
+    `max_attempts` times. At most `max_in_flight` retries are handed out at once, so retries can not
+    crowd fresh mints out of the rate budget; a retry stays in flight until it is rescheduled or
+    `finish`ed.
+    """
+
+    def __init__(self, max_attempts:int=5, base_delay:float=1.0, max_delay:float=60.0, max_in_flight:int=30) -> None:
+
+        self.max_attempts  = max_attempts
+        self.base_delay    = base_delay
+        self.max_delay     = max_delay
+        self.max_in_flight = max_in_flight
+
+        self._heap         = []
+        self._attempts     = {}
+        self._in_flight    = set()
+
+        self.scheduled     = 0
+        self.exhausted     = 0
+    #
+
+    def delay(self, attempt:int) -> float:
+
+        return (random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))))
+    #
+
+    def attempts(self, mint:str) -> int:
+
+        return (self._attempts.get(mint, 0))
+    #
+
+    def schedule(self, mint:str, delay:float=None) -> bool:
+
+        """Count a failed attempt and re-queue the mint. Return False, and forget the mint, once its attempts are exhausted."""
+
+        self._in_flight.discard(mint)
+
+        attempt = self._attempts.get(mint, 0) + 1
+
+        if (attempt >= self.max_attempts):
+
+            self._attempts.pop(mint, None)
+            self.exhausted += 1
+            return (False)
+        #
+
+        self._attempts[mint] = attempt
+        self.scheduled      += 1
+        heapq.heappush(self._heap, (time.monotonic() + (self.delay(attempt) if delay is None else delay), mint))
+
+        return (True)
+    #
+
+    def pop_due(self, limit:int=None) -> list:
+
+        """Return the mints whose delay is over, within the in-flight cap, and mark them in flight."""
+
+        room  = self.max_in_flight - len(self._in_flight)
+        limit = room if (limit is None) else min(limit, room)
+        now   = time.monotonic()
+        due   = []
+
+        while (self._heap) and (len(due) < limit) and (self._heap[0][0] <= now):
+
+            _, mint = heapq.heappop(self._heap)
+            due.append(mint)
+            self._in_flight.add(mint)
+        #
+
+        return (due)
+    #
+
+    def finish(self, mint:str) -> None:
+
+        """Forget a mint whose lookup reached a final outcome."""
+
+        self._in_flight.discard(mint)
+        self._attempts.pop(mint, None)
+    #
+
+    def next_due(self) -> float:
+
+        """Seconds until the next retry is due, or None when nothing is queued."""
+
+        return (max(0.0, self._heap[0][0] - time.monotonic()) if self._heap else None)
+    #
+
+    def __contains__(self, mint:str) -> bool:
+
+        return (mint in self._attempts)
+    #
+
+    def __len__(self) -> int:
+
+        return (len(self._heap))
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -1,24 +1,66 @@
 import os
 import asyncio
 
-import json
-
-from curl_cffi import AsyncSession
 import re
 #
 ###################################################################################################
 ###################################################################################################
 ###################################################################################################
 #
-from utils.datetimer   import timestamp, now_yyyy_mm_dd, monotonic
-from utils.logger      import get_logger
-from utils.http_client import get_async_client_ds_screener_infoer
+from utils.datetimer    import timestamp
+from utils.logger       import get_logger
+from utils.http_client  import get_async_client_ds_screener, get_async_client_ds_screener_infoer, close_watchlist_async_clients
+from utils.seen_index   import SeenIndex
+from utils.rate_limiter import TokenBucketLimiter, FileTokenBucketLimiter
+from utils.metrics      import metrics, SIZE_BUCKETS
+from utils.offload      import offloader, loop_monitor
+import utils.jsonlib as jsonlib
+
+from dex_screener_scraper.decoder        import decode_pairs_frame
+from dex_screener_scraper.protocol       import read_pairs, ADDRESS_PATTERN
+from dex_screener_scraper.stream         import ScreenerStream, DS_WEBSOCKET_HEADERS, is_pairs_frame
+from dex_screener_scraper.store          import MintStore
+from dex_screener_scraper.history        import TokenHistory
+from dex_screener_scraper.metadata_cache import MetadataCache, MISSING
+from dex_screener_scraper.retry          import RetryQueue
+from dex_screener_scraper.pipeline       import MintPipeline
+from dex_screener_scraper.events         import EventBus, NewToken
+from dex_screener_scraper.market         import MarketSnapshots
+from dex_screener_scraper.cadence        import AdaptiveCadence
+from dex_screener_scraper.fingerprint    import FrameFingerprint, read_segments
 
 SCREENER_DIR  = os.path.join(os.path.dirname(__file__), '..', 'files', 'screener')
 os.makedirs(SCREENER_DIR , exist_ok=True)
 
-SCREENER_REFRESH_RATE_SEC = 60
-DS_TOKEN_INFO_ENDPOINT    = "https://api.dexscreener.com/tokens/v1/solana/"
+SCREENER_REFRESH_RATE_SEC = 60           # the first interval; later ones adapt to the new-mint yield
+SCREENER_REFRESH_MIN_SEC  = 10
+SCREENER_REFRESH_MAX_SEC  = 120
+DS_TOKEN_INFO_ENDPOINT    = "https://api.dexscreener.com/tokens/v1/{chain}/"
+DS_DEFAULT_CHAIN          = "solana"
+DS_TOKEN_INFO_BATCH_SIZE  = 30
+
+PROCESSED_MINTS_MAX_SIZE  = 200_000
+PROCESSED_MINTS_TTL_SEC   = 24 * 60 * 60
+PROCESSED_MINTS_BLOOM     = False
+
+RETRY_MAX_ATTEMPTS        = 5
+RETRY_BASE_DELAY_SEC      = 2
+RETRY_MAX_DELAY_SEC       = 120
+RETRY_MAX_IN_FLIGHT       = DS_TOKEN_INFO_BATCH_SIZE
+
+PIPELINE_WORKERS          = 4
+PIPELINE_QUEUE_SIZE       = 1000
+PIPELINE_SINK_BATCH       = 50
+PIPELINE_SINK_EVERY_SEC   = 1.0
+
+SCREENER_HISTORY_ENABLED  = True
+
+METADATA_CACHE_WARM_START   = True
+METADATA_CACHE_SNAPSHOT_SEC = 5 * 60
+
+MARKET_SNAPSHOTS_ENABLED    = False
+
+FRAME_FINGERPRINT_ENABLED   = True
 logger = get_logger(name="Screener")
 #
 ###################################################################################################
@@ -28,42 +70,77 @@ logger = get_logger(name="Screener")
 class Screener:
 
     DS_RATE_LIMIT_PER_SECOND = 4
-    DS_TOKEN_INTERVAL        = 1.0 / DS_RATE_LIMIT_PER_SECOND
-    ds_last_call_time        = 0.0
-    ds_rate_limit_lock       = asyncio.Lock()
+    DS_RATE_LIMIT_BURST      = 4
+    ds_limiter               = TokenBucketLimiter(rate=DS_RATE_LIMIT_PER_SECOND, burst=DS_RATE_LIMIT_BURST)
     async def ds_rate_limiter() -> None:
 
-        async with Screener.ds_rate_limit_lock:
+        wait_time = await Screener.ds_limiter.acquire()
 
-            now = monotonic()
+        metrics.observe("ds_rate_limiter_wait_seconds", wait_time)
 
-            wait_time = max(0, Screener.ds_last_call_time + Screener.DS_TOKEN_INTERVAL - now)
+        if (wait_time > 0):
 
-            if (wait_time > 0):
+            logger.debug(f"DExScreener rate limiter waited {wait_time:.3f}s")
+        #
+    #
 
-                logger.debug(f"DExScreener rate limiter sleeping for {wait_time:.3f}s")
-                await asyncio.sleep(wait_time)
-            #
+    def share_ds_rate_limiter(path, rate=DS_RATE_LIMIT_PER_SECOND, burst=DS_RATE_LIMIT_BURST) -> None:
 
-            Screener.ds_last_call_time = monotonic()
-        #
+        Screener.ds_limiter = FileTokenBucketLimiter(path, rate=rate, burst=burst)
     #
 
-    def __init__(self, websocket_url) -> None:
+    def __init__(self, websocket_url, chain=DS_DEFAULT_CHAIN, processed_mints=None, inflight_mints=None, queued_mints=None, final_mints=None, store=None, history=None, metadata_cache=None, retry_queue=None, events=None, market=None) -> None:
 
         logger.info(f"Initializing screener")
 
         try:
 
             self.websocket_url   = websocket_url
+            self.chain           = chain
             self.infoer_client   = get_async_client_ds_screener_infoer()
 
             self.screener_mints  = []
-            self.processed_mints = []
-
-            self.final_mints     = self.load_final_mints()
+            self.frame_pairs     = {}
+            self.fingerprint     = FrameFingerprint() if (FRAME_FINGERPRINT_ENABLED) else None
+            self.processed_mints = processed_mints if (processed_mints is not None) else SeenIndex(max_size=PROCESSED_MINTS_MAX_SIZE, ttl=PROCESSED_MINTS_TTL_SEC, bloom=PROCESSED_MINTS_BLOOM)
+            self.inflight_mints  = inflight_mints  if (inflight_mints  is not None) else set()
+            self.retry_queue     = retry_queue     if (retry_queue     is not None) else RetryQueue(max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY_SEC, max_delay=RETRY_MAX_DELAY_SEC, max_in_flight=RETRY_MAX_IN_FLIGHT)
+
+            self.store           = store           if (store           is not None) else MintStore(SCREENER_DIR)
+            self.unsaved_mints   = {}
+            # For history and market, None means the default and False means none.
+            self.history         = history         if (history         not in (None, False)) else (TokenHistory() if (history is None) and (SCREENER_HISTORY_ENABLED) else None)
+            self.final_mints     = final_mints     if (final_mints     is not None) else self.load_final_mints()
+            self.compaction_task = None
+
+            self.metadata_cache  = metadata_cache  if (metadata_cache  is not None) else self.load_metadata_cache()
+            self.snapshot_task   = None
+            self.latest_snapshot = timestamp()
+
+            self.events          = events          if (events          is not None) else EventBus()
+            self.publish_cached  = False
+            self.market          = market          if (market          not in (None, False)) else (MarketSnapshots() if (market is None) and (MARKET_SNAPSHOTS_ENABLED) else None)
+            self.market_task     = None
+
+            self.pipeline        = MintPipeline(self, workers=PIPELINE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE, batch_size=DS_TOKEN_INFO_BATCH_SIZE, sink_batch=PIPELINE_SINK_BATCH, sink_interval=PIPELINE_SINK_EVERY_SEC, queued=queued_mints)
             
             self.latest_refresh  = 0
+            self.latest_queued   = 0
+            self.cadence         = AdaptiveCadence(SCREENER_REFRESH_RATE_SEC, SCREENER_REFRESH_MIN_SEC, SCREENER_REFRESH_MAX_SEC, batch_size=DS_TOKEN_INFO_BATCH_SIZE)
+            self.screener_stream = None
+
+            metrics.register_gauges("pipeline",       self.pipeline.gauges,       labels={"feed": self.websocket_url})
+            metrics.register_gauges("metadata_cache", self.metadata_cache.stats,  labels={"feed": self.websocket_url})
+            metrics.register_gauges("cadence",        self.cadence.stats,         labels={"feed": self.websocket_url})
+
+            if (self.market is not None):
+
+                metrics.register_gauges("market_snapshots", self.market.stats, labels={"feed": self.websocket_url})
+            #
+            if (self.fingerprint is not None):
+
+                metrics.register_gauges("fingerprint", self.fingerprint.stats, labels={"feed": self.websocket_url})
+            #
 
             logger.info(f"Screener handler initialized")
         #
@@ -79,196 +156,490 @@ class Screener:
 
         try:
 
-            filename = f"introduced_tokens_{now_yyyy_mm_dd()}.json"
-            path     = os.path.join(SCREENER_DIR, filename)
+            result = self.store.load()
 
-            if (not os.path.exists(path)):
+            for mint in result:
 
-                return {}
+                self.processed_mints.add(mint)
             #
 
-            with open(path, "r", encoding="utf-8") as f:
+            logger.info(f"Loaded {len(result)} tokens")
+            return (result)
+        #
+        except Exception as e:
+
+            logger.error(f"Failed loading screener tokens • {e}")
+            return {}
+        #
+    #
+
+    def load_metadata_cache(self) -> MetadataCache:
 
-                result = json.load(f)
+        metadata_cache = MetadataCache()
 
-                logger.info(f"Loaded {len(result)} tokens")
-                return {}
-                return result
+        if (METADATA_CACHE_WARM_START):
+
+            try:
+
+                metadata_cache.load()
             #
+            except Exception as e:
+
+                logger.error(f"Failed loading token metadata cache • {e}")
+            #
+        #
+
+        return (metadata_cache)
+    #
+
+    async def snapshot_metadata_cache(self) -> None:
+
+        try:
+
+            saved = await self.metadata_cache.save_async()
+
+            logger.debug(f"Token metadata cache snapshotted • {saved} entries | {self.metadata_cache.stats()}")
         #
         except Exception as e:
 
-            logger.error(f"Failed loading screener tokens • {e}")
-            return {}
+            logger.error(f"Failed snapshotting token metadata cache • {e}")
         #
     #
 
     def save_final_mints(self) -> bool:
-            
+
         logger.debug(f"Saving the screener tokens")
 
+        unsaved            = self.unsaved_mints
+        self.unsaved_mints = {}
 
         try:
 
-            filename = f"introduced_tokens_{now_yyyy_mm_dd()}.json"
-            path     = os.path.join(SCREENER_DIR, filename)
+            with metrics.span("save_final_mints_seconds"):
 
-            os.makedirs(os.path.dirname(path), exist_ok=True)
+                written = self.store.append(unsaved)
 
-            with open(path, "w", encoding="utf-8") as f:
+                if (self.history is not None) and (unsaved):
 
-                json.dump(self.final_mints, f, indent=2, ensure_ascii=False)
+                    now = timestamp()
+                    self.history.record_many([(mint, now, symbol, self.mint_chain(mint), self.websocket_url) for mint, symbol in unsaved.items()])
+                #
             #
 
-
-            logger.info(f"Saved {len(self.final_mints)} tokens")
+            logger.info(f"Saved {written} new tokens ({len(self.final_mints)} in total)")
             return True
         #
         except Exception as e:
 
+            self.unsaved_mints = {**unsaved, **self.unsaved_mints}
+
             logger.error(f"Failed saving screener tokens • {e}")
             return False
         #
     #
+
+    async def compact_final_mints(self) -> None:
+
+        try:
+
+            kept             = await asyncio.to_thread(self.store.compact)
+            self.store.stale = 0
+
+            logger.debug(f"Screener tokens compacted to {kept} tokens")
+        #
+        except Exception as e:
+
+            logger.error(f"Failed compacting screener tokens • {e}")
+        #
+    #
+
+    def record_mint(self, mint, symbol, source="api") -> None:
+
+        symbol                   = re.sub(r'[<>:"/\\|?*]', '_', symbol)
+        is_new                   = (mint not in self.final_mints)
+        self.final_mints[mint]   = symbol
+        self.unsaved_mints[mint] = symbol
+
+        # A cached mint was published when it was first looked up, possibly on an earlier day. A shard
+        # worker still publishes it, as its only way to hand the token to the supervisor.
+        if (is_new) and ((source != "cache") or (self.publish_cached)):
+
+            self.events.publish(NewToken(mint, symbol, timestamp(), source, self.mint_chain(mint)))
+        #
+    #
     ##############################################################
     #
     def decode(self, message)                -> list:
 
-        decoded_text   = ''.join(chr(b) if 32 <= b <= 126 else ' ' for b in message)
-        words          = [word for word in decoded_text.split() if len(word) >= 55]
-        filtered_words = [re.sub(r'["*<$@(),.].*', '', word) for word in words]
-        extracted_data = []
-        for token in filtered_words:
+        with metrics.span("decode_seconds"):
+
+            return (decode_pairs_frame(message))
+        #
+    #
+
+    def read_frame_pairs(self, message, mints) -> dict:
+
+        """Parse the pair records of the listed mints that are not processed yet: the others are never looked up."""
+
+        unseen = [mint for mint in dict.fromkeys(mints) if (mint not in self.processed_mints)]
+
+        with metrics.span("parse_frame_seconds"):
+
+            self.frame_pairs = read_pairs(bytes(message), unseen, listed=len(mints))
+        #
+
+        return (self.frame_pairs)
+    #
+
+    def ingest_frame(self, message)          -> list:
 
-            # Check if token contains an ETH address
-            if ("0x" in token):
+        metrics.observe("frame_bytes", len(message), buckets=SIZE_BUCKETS)
 
-                token = re.findall(r'(0x[0-9a-fA-F]+)', token)[-1]
-                # print("ETH: ",token)
+        if (self.fingerprint is not None):
+
+            plan = self.fingerprint.prepare(message)
+
+            if (plan is None):
+
+                return (self.fingerprint.mints)
             #
-            elif ("pump" in token): # Check if token contains 'pump' keyword
 
-                token = re.findall(r".{0,40}pump", token)[0]
-                # print("pump: ",token)
+            with metrics.span("decode_seconds"):
 
-                if (token.startswith("V")):
+                decoded = read_segments(plan.missing)
+            #
 
-                    token = token[1:]
-                #
+            return (self.commit_frame(message, plan, decoded))
+        #
+
+        mints = self.decode(message)
+        self.read_frame_pairs(message, mints)
+
+        return (mints)
+    #
+
+    async def ingest_frame_async(self, message) -> list:
+
+        """`ingest_frame`, in the offload executor when the frame (or its changed part) is large enough."""
+
+        if (offloader.kind is None) or (len(message) < offloader.min_bytes):
+
+            return (self.ingest_frame(message))
+        #
+
+        metrics.observe("frame_bytes", len(message), buckets=SIZE_BUCKETS)
+
+        if (self.fingerprint is not None):
+
+            plan = self.fingerprint.prepare(message)
+
+            if (plan is None):
+
+                return (self.fingerprint.mints)
             #
-            else: # Otherwise extract the last 44 characters
 
-                token = token[-44:]
-                if (token.startswith("V")):
+            with metrics.span("offload_frame_seconds"):
 
-                    token = token[1:]
-                #
+                decoded = await offloader.run(read_segments, plan.missing, size=plan.missing_bytes)
             #
 
-            extracted_data.append(token)
+            return (self.commit_frame(message, plan, decoded))
         #
 
-        return (extracted_data)
+        with metrics.span("offload_frame_seconds"):
+
+            mints = await offloader.run(decode_pairs_frame, bytes(message))
+        #
+
+        self.read_frame_pairs(message, mints)
+
+        return (mints)
+    #
+
+    def commit_frame(self, message, plan, decoded) -> list:
+
+        mints = self.fingerprint.commit(plan, decoded)
+        self.read_frame_pairs(message, mints)
+
+        return (mints)
     #
 
     async def connect_ds(self)               -> list:
 
         logger.debug(f"Connecting websocket")
 
-        url     = self.websocket_url
-        headers = {
-            'User-Agent'               : 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:140.0) Gecko/20100101 Firefox/140.0',
-            'Accept'                   : '*/*',
-            'Accept-Language'          : 'en-US,en;q=0.5',
-            'Accept-Encoding'          : 'gzip, deflate, br, zstd',
-            'Sec-WebSocket-Version'    : '13',
-            'Origin'                   : 'https://dexscreener.com',
-            'Connection'               : 'keep-alive, Upgrade',
-            'Pragma'                   : 'no-cache',
-            'Cache-Control'            : 'no-cache',
-            'Upgrade'                  : 'websocket',
-        }
-
-        websocket = await AsyncSession().ws_connect(url=url, headers=headers, timeout=10)
+        with metrics.span("connect_ds_seconds"):
 
-        for attempt in range(1, 3+1):
+            websocket = await get_async_client_ds_screener().ws_connect(url=self.websocket_url, headers=DS_WEBSOCKET_HEADERS, timeout=10)
+        #
 
-            res         = await websocket.recv()
-            message     = res[0]
-            pairs_start = message.find(b'pairs')
-            
+        try:
 
-            if (not message.startswith(b'\x00\n1.3.0\n')):
+            for attempt in range(1, 3+1):
 
-                continue
+                res     = await websocket.recv()
+                message = res[0]
+
+                if (not is_pairs_frame(message)):
+
+                    continue
+                #
+                else:
+
+                    logger.debug(f"Websocket Complete")
+                    return (await self.ingest_frame_async(message))
+                #
             #
-            elif (pairs_start == -1):
+        #
+        finally:
+
+            await websocket.close()
+        #
+    #
+
+    def mint_chain(self, mint)               -> str:
+
+        pair = self.frame_pairs.get(mint)
+
+        return (pair.chain if (pair is not None) else self.chain)
+    #
+
+    def token_info_url(self, chain, mints)   -> str:
+
+        return (DS_TOKEN_INFO_ENDPOINT.format(chain=chain) + ",".join(mints))
+    #
+
+    async def complete_mint_info(self, mint) -> bool:
+
+        logger.debug(f"Completing info for mint {mint}")
+
+        results = await self.complete_mints_info([mint], chain=self.mint_chain(mint))
+
+        return (results.get(mint, False))
+    #
+
+    async def complete_mints_info(self, mints, chain=None) -> dict:
+
+        logger.debug(f"Completing info for {len(mints)} mints")
+
+        results = {}
+        pending = []
+
+        for mint in mints:
+
+            # Anything else the decoder returned would break the URL, and the lookup, of the whole batch.
+            if (ADDRESS_PATTERN.fullmatch(mint) is None):
+
+                self.processed_mints.add(mint)
+                results[mint] = False
+
+                logger.debug(f"Mint {mint!r} is not an address, skipped")
+            #
+            elif (mint in self.processed_mints):
+
+                logger.debug(f"Mint {mint} already infoed")
+                results[mint] = True
+            #
+            elif (mint in pending):
 
                 continue
             #
+            elif ((cached := self.metadata_cache.get(mint)) is not MISSING):
+
+                results[mint] = (cached is not None)
+
+                # A negative entry is not processed: once it expires, the mint is looked up again.
+                if (cached is not None):
+
+                    self.processed_mints.add(mint)
+                    self.record_mint(mint, cached, source="cache")
+                #
+
+                logger.debug(f"Mint {mint} infoed from the metadata cache")
+            #
+            # Only a record with the expected fields is trusted; any other frame symbol is confirmed by the API.
+            elif ((pair := self.frame_pairs.get(mint)) is not None) and (pair.validated) and (pair.base_symbol):
+
+                self.processed_mints.add(mint)
+                self.metadata_cache.put(mint, pair.base_symbol)
+                self.record_mint(mint, pair.base_symbol, source="frame")
+                results[mint] = True
+
+                logger.debug(f"Mint {mint} infoed from the pairs frame")
+            #
             else:
 
-                logger.debug(f"Websocket Complete")
-                return (self.decode(message))
+                pending.append(mint)
             #
         #
+
+        for mint in results:
+
+            self.retry_queue.finish(mint)
+        #
+
+        if (not pending):
+
+            return (results)
+        #
+
+        self.inflight_mints.update(pending)
+        try:
+
+            with metrics.span("complete_mints_info_seconds"):
+
+                return (await self.lookup_mints_info(pending, chain or self.chain, results))
+            #
+        #
+        finally:
+
+            self.inflight_mints.difference_update(pending)
+        #
     #
 
-    async def complete_mint_info(self, mint) -> dict:
+    async def lookup_mints_info(self, pending, chain, results) -> dict:
 
-        logger.debug(f"Completing info for mint {mint}")
+        try:
 
-        if (mint in self.processed_mints):
+            await Screener.ds_rate_limiter()
 
-            logger.debug(f"Mint already infoed")
-            return (True)
+            url        = self.token_info_url(chain, pending)
+
+            with metrics.span("token_info_request_seconds"):
+
+                response = await self.infoer_client.get(url)
+            #
+
+            code       = response.status_code
+            metrics.inc(f"token_info_responses_{code // 100}xx")
         #
+        except Exception as e:
 
+            metrics.inc("token_info_errors")
+            logger.debug(f"complete_mints_info() Exception during • {e} | {type(e).__name__} | {repr(e)}")
+            return (self.retry_mints(pending, results))
+        #
 
-        for attemp in range(1, 4):
+        if (code==200):
 
             try:
 
-                await Screener.ds_rate_limiter()
-
-                url        = DS_TOKEN_INFO_ENDPOINT + mint
-                response   = await self.infoer_client.get(url)
-                code       = response.status_code
-                json_data  = response.json()[0]
+                body    = response.content
+                symbols = {}
+                pairs   = await offloader.run(jsonlib.loads, body, size=len(body))
+                for pair in pairs:
 
-                if (code==200):
+                    base    = pair.get("baseToken", {})
+                    address = base.get("address")
 
-                    symbol = json_data.get("baseToken", {}).get("symbol", "BAD_SYMBOL")
-                    symbol = re.sub(r'[<>:"/\\|?*]', '_', symbol)
-                    self.processed_mints.append(mint)
-                    self.final_mints[mint] = symbol
+                    if (address and address not in symbols):
 
-                    logger.debug(f"Mint info data fetched completely")
-                    return (True)
+                        symbols[address]         = base.get("symbol", "BAD_SYMBOL")
+                        symbols[address.lower()] = symbols[address]
+                    #
                 #
-                else:
+            #
+            except Exception as e:
+
+                logger.debug(f"complete_mints_info() Malformed response • {e} | {response.text[:120]}")
+                return (self.retry_mints(pending, results))
+            #
 
-                    self.processed_mints.append(mint)
+            if (self.market is not None):
 
-                    logger.debug(f"[{attemp}] complete_mint_info() Unexpected response • code {code} | {response.text[:120]}")
-                    return (False)
+                self.market.add(pairs)
+            #
+
+            missing = []
+            for mint in pending:
+
+                symbol = symbols.get(mint, symbols.get(mint.lower()))
+
+                if (symbol is None):
+
+                    missing.append(mint)
+                    continue
                 #
+
+                self.processed_mints.add(mint)
+                self.retry_queue.finish(mint)
+                self.metadata_cache.put(mint, symbol)
+                self.record_mint(mint, symbol, source="api")
+                results[mint] = True
             #
-            except Exception as e:
 
-                logger.debug(f"[{attemp}] complete_mint_info() Exception during • {e} | {type(e).__name__} | {repr(e)}")
+            if (missing):
+
+                logger.debug(f"complete_mints_info() No pair returned yet for {len(missing)} mints")
+                self.retry_mints(missing, results, negative=True)
             #
 
-            await asyncio.sleep(1)
+            logger.debug(f"Mint info data fetched completely for {sum(results[mint] for mint in pending)}/{len(pending)} mints")
+            return (results)
+        #
+        elif (code==429):
+
+            retry_after = response.headers.get("Retry-After")
+            delay       = float(retry_after) if (retry_after and retry_after.isdigit()) else None
+            Screener.ds_limiter.throttle(delay)
+
+            logger.debug(f"complete_mints_info() Throttled • Retry-After {retry_after}")
+            return (self.retry_mints(pending, results, delay=delay))
+        #
+        elif (code>=500):
+
+            logger.debug(f"complete_mints_info() Server error • code {code} | {response.text[:120]}")
+            return (self.retry_mints(pending, results))
+        #
+        elif (len(pending) > 1):
+
+            # One bad address fails the whole batch: split it until the bad ones are on their own.
+            metrics.inc("token_info_batch_splits")
+            logger.debug(f"complete_mints_info() Unexpected response for {len(pending)} mints, splitting the batch • code {code} | {response.text[:120]}")
+
+            half = len(pending) // 2
+
+            await self.lookup_mints_info(pending[:half], chain, results)
+            return (await self.lookup_mints_info(pending[half:], chain, results))
         #
         else:
 
-            logger.error(f"Failed to fetch mint info data after all attempts")
-            
-            self.processed_mints.append(mint)
-            return (False)
+            for mint in pending:
+
+                self.retry_queue.finish(mint)
+                self.metadata_cache.put_negative(mint)
+                results[mint] = False
+            #
+
+            logger.debug(f"complete_mints_info() Unexpected response • code {code} | {response.text[:120]}")
+            return (results)
         #
     #
+
+    def retry_mints(self, mints, results, delay=None, negative=False) -> dict:
+
+        for mint in mints:
+
+            results[mint] = False
+
+            if (self.retry_queue.schedule(mint, delay=delay)):
+
+                logger.debug(f"Mint {mint} re-queued for attempt {self.retry_queue.attempts(mint)+1}")
+                continue
+            #
+
+            logger.error(f"Failed to fetch mint info data for {mint} after all attempts")
+
+            # The mint is not marked processed, so an outage longer than the retries does not lose it:
+            # the next frame listing it starts over. A negative entry holds it back until it expires.
+            if (negative):
+
+                self.metadata_cache.put_negative(mint)
+            #
+        #
+
+        return (results)
+    #
     ##############################################################
     #
     async def refresh_screener(self)      -> bool:
@@ -298,15 +669,47 @@ class Screener:
         #
     #
 
+    def persist(self) -> bool:
+
+        saved = self.save_final_mints()
+
+        if (self.store.needs_compaction()) and (self.compaction_task is None or self.compaction_task.done()):
+
+            self.compaction_task = asyncio.create_task(self.compact_final_mints())
+        #
+
+        if (METADATA_CACHE_WARM_START) and (timestamp() - self.latest_snapshot >= METADATA_CACHE_SNAPSHOT_SEC) and (self.snapshot_task is None or self.snapshot_task.done()):
+
+            self.latest_snapshot = timestamp()
+            self.snapshot_task   = asyncio.create_task(self.snapshot_metadata_cache())
+        #
+
+        self.flush_market()
+
+        return (saved)
+    #
+
+    def flush_market(self) -> None:
+
+        """Write the buffered market snapshots from a background task, when due (by rows or age) and none is running. `aclose` writes the rest."""
+
+        if (self.market is not None) and (self.market.due()) and (self.market_task is None or self.market_task.done()):
+
+            self.market_task = asyncio.create_task(self.market.flush_async())
+        #
+    #
+
     async def refresh_final_results(self) -> bool:
 
         logger.debug(f"Refreshing final results")
 
         try:
 
-            await asyncio.gather(*[self.complete_mint_info(mint) for mint in self.screener_mints])
+            queued             = await self.pipeline.submit(self.screener_mints)
+            self.latest_queued = queued
 
-            self.save_final_mints()
+            logger.debug(f"Queued {queued} unseen mints • {self.pipeline.gauges()}")
+            await self.pipeline.join()
 
             logger.debug(f"Final results refreshed")
         #
@@ -319,7 +722,7 @@ class Screener:
     #
     async def refresh(self) -> bool:
 
-        if (timestamp()-self.latest_refresh < SCREENER_REFRESH_RATE_SEC):
+        if (timestamp()-self.latest_refresh < self.cadence.interval):
 
             logger.debug(f"Too early refresh. skipping")
             return (True)
@@ -329,12 +732,29 @@ class Screener:
 
         try:
 
+            await metrics.start_exporters()
+            loop_monitor.start()
+            loop_monitor.cycle()
+
             count = len(self.final_mints)
-            await self.refresh_screener()
-            await self.refresh_final_results()
+
+            with metrics.span("refresh_seconds"):
+
+                await self.refresh_screener()
+                await self.refresh_final_results()
+            #
+
             self.latest_refresh = timestamp()
+            lag                 = loop_monitor.cycle()
+
+            self.flush_market()
 
-            logger.info(f"Screener refreshed. {len(self.final_mints)-count} new tokens arrived")
+            new_mints = len(self.final_mints) - count
+            interval  = self.cadence.update(new_mints, len(self.screener_mints), self.latest_queued, Screener.ds_limiter.rate)
+
+            logger.info(f"Screener refreshed. {new_mints} new tokens arrived")
+            logger.info(f"Next refresh in {interval:.1f}s • {new_mints}/{len(self.screener_mints)} listed mints were new")
+            logger.info(f"Event loop blocked up to {lag['max']*1000:.1f}ms ({lag['blocked']*1000:.0f}ms in total) this cycle")
             logger.info("── Screener.refresh() complete ─────────────────────────────────────────────")
             return (True)
         #
@@ -344,7 +764,124 @@ class Screener:
             return (False)
         #
     #
+
+    def next_refresh_in(self) -> float:
+
+        """Seconds until `refresh` stops skipping."""
+
+        return (max(0.0, self.latest_refresh + self.cadence.interval - timestamp()))
+    #
+
+    async def stream(self) -> None:
+
+        logger.info(f"Streaming screener")
+
+        await metrics.start_exporters()
+        loop_monitor.start()
+
+        self.screener_stream = ScreenerStream(self.websocket_url)
+
+        try:
+
+            async for message in self.screener_stream:
+
+                try:
+
+                    self.screener_mints = await self.ingest_frame_async(message)
+                    queued              = await self.pipeline.submit(self.screener_mints)
+                    self.latest_refresh = timestamp()
+
+                    if (queued):
+
+                        logger.debug(f"Queued {queued} streamed mints • {self.pipeline.gauges()} | loop blocked up to {loop_monitor.cycle()['max']*1000:.1f}ms")
+                    #
+                #
+                except Exception as e:
+
+                    logger.error(f"Failed handling streamed frame • {e}")
+                #
+            #
+        #
+        finally:
+
+            await self.screener_stream.aclose()
+            self.screener_stream = None
+        #
+    #
+    ##############################################################
+    #
+    async def aclose(self, close_clients=True, drain_timeout=None) -> None:
+
+        logger.debug(f"Closing screener")
+
+        if (self.screener_stream is not None):
+
+            await self.screener_stream.aclose()
+        #
+
+        await self.pipeline.drain(timeout=drain_timeout)
+
+        if (self.compaction_task is not None):
+
+            await self.compaction_task
+        #
+        if (self.snapshot_task is not None):
+
+            await self.snapshot_task
+        #
+        if (self.market_task is not None):
+
+            await self.market_task
+        #
+
+        self.save_final_mints()
+
+        if (self.market is not None):
+
+            await self.market.flush_async()
+        #
+
+        if (METADATA_CACHE_WARM_START):
+
+            await self.snapshot_metadata_cache()
+        #
+
+        metrics.unregister_gauges(self.pipeline.gauges)
+        metrics.unregister_gauges(self.metadata_cache.stats)
+        metrics.unregister_gauges(self.cadence.stats)
+
+        if (self.fingerprint is not None):
+
+            metrics.unregister_gauges(self.fingerprint.stats)
+        #
+        if (self.market is not None):
+
+            metrics.unregister_gauges(self.market.stats)
+        #
+
+        if (close_clients):
+
+            await self.events.aclose()
+            await close_watchlist_async_clients()
+            await loop_monitor.aclose()
+            await metrics.aclose()
+            offloader.shutdown()
+        #
+    #
+
+    async def __aenter__(self):
+
+        return (self)
+    #
+
+    async def __aexit__(self, *exc_info) -> None:
+
+        await self.aclose()
+    #
 #
+
+metrics.register_gauges("ds_rate_limiter", lambda: Screener.ds_limiter.stats())
+metrics.register_gauges("offload",         offloader.stats)
 ###################################################################################################
 ###################################################################################################
 ###################################################################################################
@@ -0,0 +1,270 @@
+import io
+import os
+import json
+import threading
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.datetimer import now_yyyy_mm_dd
+from utils.logger    import get_logger
+
+logger = get_logger(name="MintStore")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MintStore
+#
+class MintStore:
+
+    """
+    Append-only daily log of introduced tokens.
+
+    Every day has one `introduced_tokens_YYYY_MM_DD.jsonl` file holding one `{"mint", "symbol"}` line
+    per token. Saving appends only the tokens that are not written yet, or whose symbol changed
+    (the last line of a mint wins), so its cost follows the number of new tokens, and a crash can
+    at most leave a torn last line, which loading skips. What was written is only remembered for
+    the current day. The JSON files of older versions are still read, and `compact` folds them
+    into the log; appends go on while it rewrites the log.
+    """
+
+    def __init__(self, directory:str, fsync:bool=True) -> None:
+
+        self.directory = directory
+        self.fsync     = fsync
+        self.written   = {}
+        self.day       = None
+        self.stale     = 0
+        self._lock     = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+    #
+
+    def path(self, day:str=None, legacy:bool=False) -> str:
+
+        extension = "json" if legacy else "jsonl"
+
+        return (os.path.join(self.directory, f"introduced_tokens_{day or now_yyyy_mm_dd()}.{extension}"))
+    #
+
+    def load(self, day:str=None) -> dict:
+
+        """Rebuild the {mint: symbol} dict of a day (default: today) from its files."""
+
+        day         = day or now_yyyy_mm_dd()
+        result      = {}
+        lines       = 0
+        legacy_path = self.path(day, legacy=True)
+        log_path    = self.path(day)
+
+        if (os.path.exists(legacy_path)):
+
+            with open(legacy_path, "r", encoding="utf-8") as f:
+
+                result.update(json.load(f))
+            #
+        #
+
+        if (os.path.exists(log_path)):
+
+            with open(log_path, "rb") as f:
+
+                lines = self.read_lines(f, result, log_path)
+            #
+        #
+
+        with self._lock:
+
+            if (day == now_yyyy_mm_dd()):
+
+                self.day     = day
+                self.written = dict(result)
+            #
+
+            self.stale = lines - len(result)
+        #
+
+        return (result)
+    #
+
+    def read_lines(self, f, result:dict, path:str, end:int=None) -> int:
+
+        """Fold the lines of a binary log file into `result`, up to the `end` offset. Return how many lines were read."""
+
+        lines    = 0
+        position = f.tell()
+
+        for line in f:
+
+            position += len(line)
+
+            if (end is not None) and (position > end):
+
+                break
+            #
+
+            lines += 1
+            try:
+
+                item = json.loads(line)
+                result[item["mint"]] = item["symbol"]
+            #
+            except (ValueError, KeyError):
+
+                logger.warning(f"Skipping a malformed line of {path}")
+            #
+        #
+
+        return (lines)
+    #
+
+    def append(self, items:dict) -> int:
+
+        """Append the given {mint: symbol} items that are not written today, or with another symbol. Return how many were written."""
+
+        with self._lock:
+
+            day = now_yyyy_mm_dd()
+
+            if (day != self.day):
+
+                # A new day starts a new file: nothing is written in it yet.
+                self.day     = day
+                self.written = {}
+            #
+
+            written = self.written
+            changed = {mint: symbol for mint, symbol in items.items() if (mint not in written) or (written[mint] != symbol)}
+
+            if (not changed):
+
+                return (0)
+            #
+
+            data = "".join(json.dumps({"mint": mint, "symbol": symbol}, ensure_ascii=False) + "\n" for mint, symbol in changed.items()).encode("utf-8")
+
+            with open(self.path(day), "a+b") as f:
+
+                if (f.seek(0, os.SEEK_END) > 0):
+
+                    f.seek(-1, os.SEEK_END)
+
+                    if (f.read(1) != b"\n"):
+
+                        data = b"\n" + data
+                    #
+                #
+
+                f.write(data)
+                f.flush()
+
+                if (self.fsync):
+
+                    os.fsync(f.fileno())
+                #
+            #
+
+            # A symbol update leaves the previous line of its mint for `compact` to drop.
+            self.stale += sum(mint in written for mint in changed)
+            written.update(changed)
+        #
+
+        return (len(changed))
+    #
+
+    def compact(self, day:str=None) -> int:
+
+        """Rewrite a day's log without duplicate or malformed lines, folding in its legacy JSON file. Return the number of tokens kept."""
+
+        day         = day or now_yyyy_mm_dd()
+        result      = {}
+        legacy_path = self.path(day, legacy=True)
+        log_path    = self.path(day)
+        tmp_path    = log_path + ".tmp"
+
+        # The log is read and rewritten up to where it ended at the start, without the lock, so appends
+        # go on meanwhile. Only copying the lines they added over, and the swap, hold the lock.
+        with self._lock:
+
+            end = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        #
+
+        if (os.path.exists(legacy_path)):
+
+            with open(legacy_path, "r", encoding="utf-8") as f:
+
+                result.update(json.load(f))
+            #
+        #
+
+        if (end > 0):
+
+            with open(log_path, "rb") as f:
+
+                self.read_lines(f, result, log_path, end=end)
+            #
+        #
+
+        with open(tmp_path, "wb") as f:
+
+            f.write("".join(json.dumps({"mint": mint, "symbol": symbol}, ensure_ascii=False) + "\n" for mint, symbol in result.items()).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        #
+
+        with self._lock:
+
+            tail = b""
+
+            if (os.path.exists(log_path)):
+
+                with open(log_path, "rb") as f:
+
+                    f.seek(end)
+                    tail = f.read().lstrip(b"\n")
+                #
+            #
+
+            with open(tmp_path, "ab") as f:
+
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            #
+
+            os.replace(tmp_path, log_path)
+
+            if (os.path.exists(legacy_path)):
+
+                os.remove(legacy_path)
+            #
+
+            # The lines appended meanwhile are already in `written`: rebuild it from the new log, so it
+            # also holds the tokens of the legacy file.
+            written = dict(result)
+            lines   = len(result) + self.read_lines(io.BytesIO(tail), written, log_path)
+
+            if (day == now_yyyy_mm_dd()):
+
+                self.day     = day
+                self.written = written
+            #
+
+            self.stale = lines - len(written)
+        #
+
+        logger.debug(f"Compacted {log_path} to {len(written)} tokens")
+
+        return (len(written))
+    #
+
+    def needs_compaction(self, day:str=None) -> bool:
+
+        return ((self.stale > 0) or os.path.exists(self.path(day, legacy=True)))
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
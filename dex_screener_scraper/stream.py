@@ -0,0 +1,146 @@
+import asyncio
+import random
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.logger      import get_logger
+from utils.http_client import get_async_client_ds_screener
+
+from dex_screener_scraper.protocol import PROTOCOL_HEADER, PAIRS_MARKER
+
+DS_WEBSOCKET_HEADERS = {
+    'User-Agent'               : 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:140.0) Gecko/20100101 Firefox/140.0',
+    'Accept'                   : '*/*',
+    'Accept-Language'          : 'en-US,en;q=0.5',
+    'Accept-Encoding'          : 'gzip, deflate, br, zstd',
+    'Sec-WebSocket-Version'    : '13',
+    'Origin'                   : 'https://dexscreener.com',
+    'Connection'               : 'keep-alive, Upgrade',
+    'Pragma'                   : 'no-cache',
+    'Cache-Control'            : 'no-cache',
+    'Upgrade'                  : 'websocket',
+}
+
+STREAM_CONNECT_TIMEOUT_SEC = 10
+STREAM_BACKOFF_BASE_SEC    = 0.5
+STREAM_BACKOFF_MAX_SEC     = 30
+logger = get_logger(name="ScreenerStream")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### ScreenerStream
+#
+def is_pairs_frame(message:bytes) -> bool:
+
+    return (message.startswith(PROTOCOL_HEADER) and (message.find(PAIRS_MARKER) != -1))
+#
+
+class ScreenerStream:
+
+    """
+    One long-lived websocket subscription to a screener feed.
+
+    Iterating the stream yields every pairs frame pushed by the feed. Dropped connections are
+    re-established with exponential backoff and jitter, for as long as the stream is not closed.
+    """
+
+    def __init__(self, websocket_url:str, headers:dict=None) -> None:
+
+        self.websocket_url = websocket_url
+        self.headers       = headers or DS_WEBSOCKET_HEADERS
+
+        self.websocket     = None
+        self.closed        = False
+
+        self.connects      = 0
+        self.frames        = 0
+    #
+
+    async def connect(self) -> None:
+
+        logger.debug(f"Connecting websocket {self.websocket_url}")
+
+        await self.disconnect()
+
+        self.websocket = await get_async_client_ds_screener().ws_connect(url=self.websocket_url, headers=self.headers, timeout=STREAM_CONNECT_TIMEOUT_SEC)
+        self.connects += 1
+
+        logger.info(f"Websocket connected")
+    #
+
+    async def disconnect(self) -> None:
+
+        websocket      = self.websocket
+        self.websocket = None
+
+        if (websocket is not None):
+
+            try:
+
+                await websocket.close()
+            #
+            except Exception as e:
+
+                logger.debug(f"Failed closing websocket • {e}")
+            #
+        #
+    #
+
+    async def aclose(self) -> None:
+
+        self.closed = True
+        await self.disconnect()
+    #
+
+    async def __aiter__(self):
+
+        failures = 0
+
+        while (not self.closed):
+
+            try:
+
+                if (self.websocket is None):
+
+                    await self.connect()
+                #
+
+                res      = await self.websocket.recv()
+                message  = res[0]
+                failures = 0
+
+                if (is_pairs_frame(message)):
+
+                    self.frames += 1
+                    yield (message)
+                #
+            #
+            except asyncio.CancelledError:
+
+                raise
+            #
+            except Exception as e:
+
+                if (self.closed):
+
+                    break
+                #
+
+                failures += 1
+                delay     = min(STREAM_BACKOFF_MAX_SEC, STREAM_BACKOFF_BASE_SEC * 2 ** (failures - 1))
+                delay     = delay * random.uniform(0.5, 1.0)
+
+                logger.warning(f"[{failures}] Websocket stream dropped • {e} | reconnecting in {delay:.2f}s")
+
+                await self.disconnect()
+                await asyncio.sleep(delay)
+            #
+        #
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
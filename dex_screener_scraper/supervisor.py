@@ -0,0 +1,579 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+import zlib
+from collections import OrderedDict
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.logger     import get_logger
+from utils.seen_index import SeenIndex, SharedSeenIndex
+from utils.metrics    import metrics
+
+from dex_screener_scraper.screener       import Screener, SCREENER_DIR, SCREENER_HISTORY_ENABLED, PROCESSED_MINTS_MAX_SIZE
+from dex_screener_scraper.screener       import PIPELINE_SINK_BATCH, PIPELINE_SINK_EVERY_SEC, METADATA_CACHE_WARM_START, FRAME_FINGERPRINT_ENABLED
+from dex_screener_scraper.decoder        import decode_pairs_frame
+from dex_screener_scraper.protocol       import read_pairs, PairRecord
+from dex_screener_scraper.fingerprint    import FrameFingerprint, read_segments
+from dex_screener_scraper.stream         import ScreenerStream
+from dex_screener_scraper.store          import MintStore
+from dex_screener_scraper.history        import TokenHistory
+from dex_screener_scraper.metadata_cache import MetadataCache, METADATA_CACHE_PATH
+from dex_screener_scraper.events         import EventBus, NewToken
+from dex_screener_scraper.pool           import feed_chain
+import dex_screener_scraper.screener as screener_module
+
+SUPERVISOR_WORKERS         = os.cpu_count() or 1
+SUPERVISOR_LIMITER_PATH    = os.path.join(os.path.dirname(__file__), '..', 'files', 'supervisor', 'ds_rate_limiter.bin')
+SUPERVISOR_SEEN_SIZE       = PROCESSED_MINTS_MAX_SIZE    # per Bloom generation: the latest 200k to 400k mints are remembered
+SUPERVISOR_HINTS_SIZE      = 10_000
+SUPERVISOR_FORWARD_TTL_SEC = 5 * 60
+SUPERVISOR_JOIN_TIMEOUT    = 30
+logger = get_logger(name="Supervisor")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Worker
+#
+def shard_of(mint:str, shards:int) -> int:
+
+    """The worker that owns the lookups of `mint`."""
+
+    return (zlib.crc32(mint.encode()) % shards)
+#
+
+class NullSink:
+
+    """Store and history of a shard worker's screener. Results go to the supervisor's single writer instead."""
+
+    def append(self, items:dict) -> int:
+
+        return (len(items))
+    #
+
+    def record_many(self, rows:list) -> int:
+
+        return (0)
+    #
+
+    def needs_compaction(self) -> bool:
+
+        return (False)
+    #
+#
+
+class ShardWorker:
+
+    """
+    One worker process of a Supervisor.
+
+    It follows its share of the feeds and decodes their frames. Each unseen mint is routed to the
+    worker that owns it by hash, with the chain and symbol of its pair as a hint. The owner looks
+    it up through its own Screener pipeline, under the shared rate budget, and sends every new
+    token to the supervisor.
+    """
+
+    def __init__(self, index:int, shards:int, feeds:list, inboxes:list, results, seen:SharedSeenIndex, cache_dir:str=None) -> None:
+
+        self.index     = index
+        self.shards    = shards
+        self.feeds     = feeds
+        self.inboxes   = inboxes
+        self.inbox     = inboxes[index]
+        self.results   = results
+        self.seen      = seen
+        self.forwarded = SeenIndex(max_size=SUPERVISOR_SEEN_SIZE, ttl=SUPERVISOR_FORWARD_TTL_SEC)
+        self.hints     = OrderedDict()
+
+        cache_path     = os.path.join(cache_dir or os.path.dirname(METADATA_CACHE_PATH), f"token_metadata.shard{index}of{shards}.bin")
+        cache          = MetadataCache(path=cache_path)
+
+        if (METADATA_CACHE_WARM_START):
+
+            cache.load()
+        #
+
+        self.screener  = Screener(feeds[0][0] if feeds else f"shard-{index}",
+                                  chain          = feeds[0][1] if feeds else screener_module.DS_DEFAULT_CHAIN,
+                                  final_mints    = {},
+                                  store          = NullSink(),
+                                  history        = NullSink(),
+                                  metadata_cache = cache)
+
+        # The screener never ingests frames itself: its frame pairs are the routed hints. Its cache
+        # hits are published too, as the supervisor has not seen them since it started.
+        self.screener.frame_pairs    = self.hints
+        self.screener.publish_cached = True
+        self.screener.events.subscribe(self.on_new_token)
+
+        self.frames    = 0
+        self.routed    = 0
+        self.received  = 0
+    #
+
+    def on_new_token(self, token:NewToken) -> None:
+
+        self.seen.add(token.mint)
+        self.results.put(tuple(token))
+    #
+
+    async def accept(self, hints:list) -> None:
+
+        for mint, chain, symbol in hints:
+
+            # Only the symbols of validated frame records are routed.
+            self.hints[mint] = PairRecord(chain, base_mint=mint, base_symbol=symbol, validated=(symbol is not None))
+            self.hints.move_to_end(mint)
+        #
+
+        while (len(self.hints) > SUPERVISOR_HINTS_SIZE):
+
+            self.hints.popitem(last=False)
+        #
+
+        await self.screener.pipeline.submit([mint for mint, _, _ in hints])
+    #
+
+    async def route(self, message:bytes, chain:str, fingerprint:FrameFingerprint=None) -> None:
+
+        if (fingerprint is None):
+
+            mints = decode_pairs_frame(message)
+        #
+        else:
+
+            plan = fingerprint.prepare(message)
+
+            if (plan is None):
+
+                # The same frame as before: its mints are all routed already.
+                return
+            #
+
+            mints = fingerprint.commit(plan, read_segments(plan.missing))
+        #
+
+        unseen   = [mint for mint in dict.fromkeys(mints) if (mint not in self.seen) and (mint not in self.forwarded)]
+        pairs    = read_pairs(message, unseen, listed=len(mints))
+        outboxes = {}
+
+        for mint in unseen:
+
+            self.forwarded.add(mint)
+            pair = pairs.get(mint)
+            outboxes.setdefault(shard_of(mint, self.shards), []).append((mint, pair.chain if pair else chain, pair.base_symbol if (pair and pair.validated) else None))
+        #
+
+        for owner, hints in outboxes.items():
+
+            self.routed += len(hints)
+
+            if (owner == self.index):
+
+                await self.accept(hints)
+            #
+            else:
+
+                self.inboxes[owner].put(hints)
+            #
+        #
+    #
+
+    async def follow(self, websocket_url:str, chain:str) -> None:
+
+        stream      = ScreenerStream(websocket_url)
+        fingerprint = FrameFingerprint() if (FRAME_FINGERPRINT_ENABLED) else None
+
+        try:
+
+            async for message in stream:
+
+                self.frames += 1
+
+                try:
+
+                    await self.route(message, chain, fingerprint)
+                #
+                except Exception as e:
+
+                    logger.error(f"[{self.index}] Failed routing a frame • {e}")
+                #
+
+                # Buffered frames never suspend the loop; let the lookups and the inbox run between them.
+                await asyncio.sleep(0)
+            #
+        #
+        finally:
+
+            await stream.aclose()
+        #
+    #
+
+    async def receive(self) -> None:
+
+        """Accept the mints routed here by other workers, until the supervisor sends None."""
+
+        while (True):
+
+            hints = await asyncio.to_thread(self.inbox.get)
+
+            if (hints is None):
+
+                return
+            #
+
+            self.received += len(hints)
+            await self.accept(hints)
+        #
+    #
+
+    async def run(self) -> None:
+
+        logger.info(f"[{self.index}] Shard worker started with {len(self.feeds)} feeds")
+
+        followers = [asyncio.create_task(self.follow(url, chain)) for url, chain in self.feeds]
+
+        try:
+
+            await self.receive()
+        #
+        finally:
+
+            for follower in followers:
+
+                follower.cancel()
+            #
+            await asyncio.gather(*followers, return_exceptions=True)
+
+            # Peers may have stopped reading: do not hold the exit on the hints still buffered for them.
+            for inbox in self.inboxes:
+
+                inbox.cancel_join_thread()
+            #
+
+            await self.screener.aclose()
+
+            logger.info(f"[{self.index}] Shard worker stopped • {self.frames} frames | {self.routed} routed | {self.received} received | {self.screener.pipeline.gauges()}")
+
+            self.results.put(None)
+        #
+    #
+#
+
+def worker_main(index:int, shards:int, feeds:list, inboxes:list, results, seen_spec:dict, limiter_path:str, rate:float, burst:int, endpoint:str=None, cache_dir:str=None, log_level:int=None) -> None:
+
+    """Entry point of a worker process."""
+
+    # The supervisor coordinates shutdown; a Ctrl-C reaches the whole process group.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if (log_level is not None):
+
+        for name in list(logging.root.manager.loggerDict):
+
+            logging.getLogger(name).setLevel(log_level)
+        #
+    #
+
+    Screener.share_ds_rate_limiter(limiter_path, rate=rate, burst=burst)
+
+    if (endpoint is not None):
+
+        screener_module.DS_TOKEN_INFO_ENDPOINT = endpoint
+    #
+
+    seen = SharedSeenIndex(**seen_spec)
+
+    try:
+
+        asyncio.run(ShardWorker(index, shards, feeds, inboxes, results, seen, cache_dir=cache_dir).run())
+    #
+    finally:
+
+        seen.close()
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Supervisor
+#
+class Supervisor:
+
+    """
+    Feeds and mint lookups sharded over worker processes, with one writer.
+
+    Feeds are dealt round-robin to the workers, and every mint is looked up by the worker
+    `shard_of(mint)` names, so decoding and JSON parsing spread over the cores. The workers share
+    one rate budget (a `FileTokenBucketLimiter`) and one shared-memory seen index. Results come back
+    over a queue to this process, which alone writes the store and the history and publishes the
+    `NewToken` events.
+    """
+
+    def __init__(self, feeds:list, workers:int=SUPERVISOR_WORKERS,
+                 rate:float=Screener.DS_RATE_LIMIT_PER_SECOND, burst:int=Screener.DS_RATE_LIMIT_BURST,
+                 limiter_path:str=SUPERVISOR_LIMITER_PATH, store=None, history=None, events=None,
+                 endpoint:str=None, cache_dir:str=None, log_level:int=None) -> None:
+
+        self.feeds         = [(feed, feed_chain(feed)) if isinstance(feed, str) else tuple(feed) for feed in feeds]
+        self.workers       = max(1, workers)
+        self.rate          = rate
+        self.burst         = burst
+        self.limiter_path  = limiter_path
+        self.endpoint      = endpoint
+        self.cache_dir     = cache_dir
+        self.log_level     = log_level
+
+        self.store         = store   if (store   is not None) else MintStore(SCREENER_DIR)
+        self.history       = history if (history is not None) else (TokenHistory() if SCREENER_HISTORY_ENABLED else None)
+        self.events        = events  if (events  is not None) else EventBus()
+        self.final_mints   = self.store.load()
+        self.unsaved_mints = {}
+        self.unsaved_rows  = []
+
+        self.seen          = SharedSeenIndex(max_size=SUPERVISOR_SEEN_SIZE)
+        for mint in self.final_mints:
+
+            self.seen.add(mint)
+        #
+
+        context            = multiprocessing.get_context("spawn")
+        self.context       = context
+        self.inboxes       = [context.Queue() for _ in range(self.workers)]
+        self.results       = context.Queue()
+        self.processes     = []
+        self.stopping      = False
+
+        self.received      = 0
+        self.flushes       = 0
+
+        metrics.register_gauges("supervisor", self.gauges)
+    #
+
+    def gauges(self) -> dict:
+
+        return ({
+            "workers_alive" : sum(process.is_alive() for process in self.processes),
+            "received"      : self.received,
+            "final_mints"   : len(self.final_mints),
+            "unsaved"       : len(self.unsaved_mints),
+            "flushes"       : self.flushes,
+        })
+    #
+
+    def start(self) -> None:
+
+        if (os.path.exists(self.limiter_path)):
+
+            os.unlink(self.limiter_path)
+        #
+
+        for index in range(self.workers):
+
+            process = self.context.Process(target = worker_main,
+                                           name   = f"ds-shard-{index}",
+                                           args   = (index, self.workers, self.feeds[index::self.workers], self.inboxes, self.results, self.seen.spec(),
+                                                     self.limiter_path, self.rate, self.burst, self.endpoint, self.cache_dir, self.log_level),
+                                           daemon = True)
+            process.start()
+            self.processes.append(process)
+        #
+
+        logger.info(f"Supervisor started {self.workers} workers for {len(self.feeds)} feeds")
+    #
+
+    def record(self, item:tuple) -> None:
+
+        token = NewToken(*item)
+
+        if (token.mint in self.final_mints):
+
+            return
+        #
+
+        self.received                  += 1
+        self.final_mints[token.mint]    = token.symbol
+        self.unsaved_mints[token.mint]  = token.symbol
+        self.unsaved_rows.append((token.mint, token.first_seen, token.symbol, token.chain, token.source))
+
+        # A cache hit was published when it was first looked up.
+        if (token.source != "cache"):
+
+            self.events.publish(token)
+        #
+    #
+
+    def flush(self) -> None:
+
+        if (not self.unsaved_mints):
+
+            return
+        #
+
+        unsaved, rows      = self.unsaved_mints, self.unsaved_rows
+        self.unsaved_mints = {}
+        self.unsaved_rows  = []
+
+        try:
+
+            written = self.store.append(unsaved)
+
+            if (self.history is not None):
+
+                self.history.record_many(rows)
+            #
+
+            self.flushes += 1
+            logger.info(f"Saved {written} new tokens ({len(self.final_mints)} in total)")
+        #
+        except Exception as e:
+
+            self.unsaved_mints = {**unsaved, **self.unsaved_mints}
+            self.unsaved_rows  = rows + self.unsaved_rows
+
+            logger.error(f"Failed saving supervisor tokens • {e}")
+        #
+    #
+
+    async def run(self) -> None:
+
+        """Start the workers and write their results, until every worker has stopped."""
+
+        if (not self.processes):
+
+            self.start()
+        #
+
+        running       = self.workers
+        latest_flush  = time.monotonic()
+
+        while (running):
+
+            try:
+
+                item = await asyncio.to_thread(self.results.get, True, PIPELINE_SINK_EVERY_SEC)
+
+                if (item is None):
+
+                    running -= 1
+                #
+                else:
+
+                    self.record(item)
+                #
+            #
+            except queue.Empty:
+
+                if (not any(process.is_alive() for process in self.processes)):
+
+                    logger.error(f"All shard workers exited without stopping cleanly")
+                    break
+                #
+            #
+
+            if (len(self.unsaved_mints) >= PIPELINE_SINK_BATCH) or (time.monotonic() - latest_flush >= PIPELINE_SINK_EVERY_SEC):
+
+                self.flush()
+                latest_flush = time.monotonic()
+            #
+        #
+
+        self.flush()
+    #
+
+    def stop(self) -> None:
+
+        """Ask every worker to drain its lookups and stop."""
+
+        if (not self.stopping):
+
+            self.stopping = True
+
+            for inbox in self.inboxes:
+
+                inbox.put(None)
+            #
+        #
+    #
+
+    async def aclose(self) -> None:
+
+        self.stop()
+
+        for process in self.processes:
+
+            await asyncio.to_thread(process.join, SUPERVISOR_JOIN_TIMEOUT)
+
+            if (process.is_alive()):
+
+                logger.warning(f"Terminating shard worker {process.name}")
+                process.terminate()
+            #
+        #
+
+        self.flush()
+        metrics.unregister_gauges(self.gauges)
+
+        await self.events.aclose()
+
+        if (self.history is not None):
+
+            self.history.close()
+        #
+
+        self.seen.close()
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### CLI
+#
+async def supervise(feeds:list, workers:int, rate:float, burst:int) -> None:
+
+    supervisor = Supervisor(feeds, workers=workers, rate=rate, burst=burst)
+    loop       = asyncio.get_running_loop()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+
+        loop.add_signal_handler(signum, supervisor.stop)
+    #
+
+    try:
+
+        await metrics.start_exporters()
+        await supervisor.run()
+    #
+    finally:
+
+        await supervisor.aclose()
+        await metrics.aclose()
+    #
+#
+
+def main(argv:list=None) -> None:
+
+    parser = argparse.ArgumentParser(prog="python -m dex_screener_scraper.supervisor", description="Screener feeds sharded over worker processes.")
+    parser.add_argument("feeds",     nargs="+", help="screener websocket URLs")
+    parser.add_argument("--workers", type=int,   default=SUPERVISOR_WORKERS)
+    parser.add_argument("--rate",    type=float, default=Screener.DS_RATE_LIMIT_PER_SECOND, help="token info requests per second, shared by all workers")
+    parser.add_argument("--burst",   type=int,   default=Screener.DS_RATE_LIMIT_BURST)
+
+    args = parser.parse_args(argv)
+
+    asyncio.run(supervise(args.feeds, args.workers, args.rate, args.burst))
+#
+
+if (__name__ == "__main__"):
+
+    main()
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,421 @@
+import heapq
+import random
+import asyncio
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.datetimer import timestamp
+from utils.logger    import get_logger
+from utils.metrics   import metrics
+from utils.offload   import offloader
+import utils.jsonlib as jsonlib
+
+from dex_screener_scraper.screener import Screener, DS_TOKEN_INFO_BATCH_SIZE
+from dex_screener_scraper.events   import NewToken
+
+TRACKER_ENABLED          = False
+TRACKER_WINDOW_SEC       = 6 * 60 * 60
+TRACKER_MAX_TRACKED      = 50_000
+TRACKER_CONCURRENCY      = 4
+
+# Poll interval by token age: (younger than, poll every) seconds. Older tokens use the last interval.
+TRACKER_INTERVALS        = ((10 * 60, 30), (60 * 60, 2 * 60), (3 * 60 * 60, 5 * 60), (TRACKER_WINDOW_SEC, 10 * 60))
+TRACKER_MIN_INTERVAL_SEC = 15
+TRACKER_ACTIVE_TXNS_H1   = 100          # busier tokens are polled twice as often, tokens without trades half as often
+logger = get_logger(name="MintTracker")
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### TrackedMint
+#
+def to_float(value) -> float:
+
+    try:
+
+        return (float(value))
+    #
+    except (TypeError, ValueError):
+
+        return (None)
+    #
+#
+
+class TrackedMint:
+
+    """A tracked token and its latest quote. `due` is the time of its next poll."""
+
+    __slots__ = ("mint", "chain", "first_seen", "due", "activity", "price_usd", "liquidity_usd", "updated_at")
+
+    def __init__(self, mint:str, chain:str, first_seen:float, due:float) -> None:
+
+        self.mint          = mint
+        self.chain         = chain
+        self.first_seen    = first_seen
+        self.due           = due
+        self.activity      = None
+        self.price_usd     = None
+        self.liquidity_usd = None
+        self.updated_at    = None
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MintTracker
+#
+class MintTracker:
+
+    """
+    Re-polls recently introduced tokens for their price and liquidity.
+
+    Every token announced on the screener's event bus (and, on `load`, every token of the history
+    still inside `window`) is tracked until it is `window` seconds old. One heap of (next_due, mint)
+    drives all of them: a single task pops the due mints, packs them by chain into requests of up
+    to 30 addresses under `Screener.ds_rate_limiter`, and pushes each mint back with an interval
+    set by its age and its trades of the last hour. The responses also go to the screener's
+    market snapshots when those are enabled.
+    """
+
+    def __init__(self, screener:Screener, window:float=TRACKER_WINDOW_SEC, max_tracked:int=TRACKER_MAX_TRACKED, concurrency:int=TRACKER_CONCURRENCY, batch_size:int=DS_TOKEN_INFO_BATCH_SIZE) -> None:
+
+        self.screener    = screener
+        self.window      = window
+        self.max_tracked = max_tracked
+        self.concurrency = concurrency
+        self.batch_size  = batch_size
+
+        self.heap        = []
+        self.tracked     = {}
+        self.task        = None
+        self._wakeup     = None
+
+        self.polls       = 0
+        self.updates     = 0
+        self.failures    = 0
+        self.expired     = 0
+        self.rejected    = 0
+
+        screener.events.subscribe(self.on_new_token)
+        metrics.register_gauges("tracker", self.stats)
+    #
+
+    def on_new_token(self, token:NewToken) -> None:
+
+        self.track(token.mint, first_seen=token.first_seen, chain=token.chain)
+    #
+
+    def interval(self, age:float, activity:int=None) -> float:
+
+        """Seconds until the next poll of a token `age` seconds old with `activity` trades in the last hour."""
+
+        every = TRACKER_INTERVALS[-1][1]
+
+        for younger_than, seconds in TRACKER_INTERVALS:
+
+            if (age < younger_than):
+
+                every = seconds
+                break
+            #
+        #
+
+        if (activity is not None) and (activity >= TRACKER_ACTIVE_TXNS_H1):
+
+            every /= 2
+        #
+        elif (activity == 0):
+
+            every *= 2
+        #
+
+        return (max(TRACKER_MIN_INTERVAL_SEC, every))
+    #
+
+    def schedule(self, entry:TrackedMint, due:float) -> None:
+
+        entry.due = due
+        heapq.heappush(self.heap, (due, entry.mint))
+
+        if (self._wakeup is not None) and (self.heap[0][1] == entry.mint):
+
+            self._wakeup.set()
+        #
+    #
+
+    def track(self, mint:str, first_seen:float=None, chain:str=None, jitter:bool=False) -> bool:
+
+        """Start tracking `mint`. Return False when it is already tracked, too old, or the tracker is full."""
+
+        now        = timestamp()
+        first_seen = now if (first_seen is None) else first_seen
+
+        if (mint in self.tracked) or (now - first_seen >= self.window):
+
+            return (False)
+        #
+        if (len(self.tracked) >= self.max_tracked):
+
+            self.rejected += 1
+            return (False)
+        #
+
+        entry              = TrackedMint(mint, chain or self.screener.mint_chain(mint), first_seen, now)
+        self.tracked[mint] = entry
+        interval           = self.interval(now - first_seen)
+
+        # Spread bulk loads over one interval, so they do not all fall due at once.
+        self.schedule(entry, now + (random.uniform(0, interval) if jitter else interval))
+
+        return (True)
+    #
+
+    def untrack(self, mint:str) -> None:
+
+        # Its heap entries are skipped when they come up.
+        self.tracked.pop(mint, None)
+    #
+
+    def load(self) -> int:
+
+        """Track the tokens of the screener's history that are younger than `window`. Return how many."""
+
+        history = self.screener.history
+
+        if (history is None) or (not hasattr(history, "between")):
+
+            return (0)
+        #
+
+        now    = timestamp()
+        loaded = 0
+
+        for row in history.between(now - self.window, now + 1):
+
+            if (row["mint"] in self.screener.final_mints):
+
+                loaded += self.track(row["mint"], first_seen=row["first_seen"], chain=row["chain"], jitter=True)
+            #
+        #
+
+        logger.info(f"Tracking {loaded} tokens of the last {self.window / 3600:.1f}h")
+
+        return (loaded)
+    #
+
+    def pop_due(self, now:float, limit:int) -> dict:
+
+        """Pop up to `limit` due mints, grouped by chain. Expired tokens are dropped on the way."""
+
+        due    = {}
+        popped = 0
+
+        while (self.heap) and (self.heap[0][0] <= now) and (popped < limit):
+
+            at, mint = heapq.heappop(self.heap)
+            entry    = self.tracked.get(mint)
+
+            if (entry is None) or (entry.due != at):
+
+                continue
+            #
+            if (now - entry.first_seen >= self.window):
+
+                del self.tracked[mint]
+                self.expired += 1
+                continue
+            #
+
+            due.setdefault(entry.chain, []).append(entry)
+            popped += 1
+        #
+
+        return (due)
+    #
+
+    async def poll(self, chain:str, entries:list) -> None:
+
+        screener = self.screener
+        now      = timestamp()
+
+        try:
+
+            await Screener.ds_rate_limiter()
+
+            with metrics.span("tracker_poll_seconds"):
+
+                response = await screener.infoer_client.get(screener.token_info_url(chain, [entry.mint for entry in entries]))
+            #
+
+            self.polls += 1
+
+            if (response.status_code == 429):
+
+                retry_after = response.headers.get("Retry-After")
+                Screener.ds_limiter.throttle(float(retry_after) if (retry_after and retry_after.isdigit()) else None)
+            #
+            if (response.status_code != 200):
+
+                raise RuntimeError(f"status {response.status_code}")
+            #
+
+            body  = response.content
+            pairs = await offloader.run(jsonlib.loads, body, size=len(body))
+        #
+        except Exception as e:
+
+            self.failures += 1
+            logger.debug(f"Tracker poll of {len(entries)} {chain} tokens failed • {e}")
+
+            for entry in entries:
+
+                if (entry.mint in self.tracked):
+
+                    self.schedule(entry, now + self.interval(now - entry.first_seen, entry.activity))
+                #
+            #
+            return
+        #
+
+        if (screener.market is not None):
+
+            screener.market.add(pairs, observed_at=now)
+        #
+
+        # A token can trade in several pairs: keep its most liquid one and the sum of their trades.
+        quotes = {}
+
+        for pair in pairs:
+
+            address = (pair.get("baseToken") or {}).get("address")
+
+            if (not address):
+
+                continue
+            #
+
+            txns      = ((pair.get("txns") or {}).get("h1") or {})
+            liquidity = (pair.get("liquidity") or {}).get("usd") or 0.0
+            activity  = (txns.get("buys") or 0) + (txns.get("sells") or 0)
+            best      = quotes.get(address)
+
+            if (best is None) or (liquidity > best[1]):
+
+                quotes[address] = (to_float(pair.get("priceUsd")), liquidity, activity + (best[2] if best else 0))
+            #
+            else:
+
+                quotes[address] = (best[0], best[1], best[2] + activity)
+            #
+        #
+
+        for entry in entries:
+
+            if (entry.mint not in self.tracked):
+
+                continue
+            #
+
+            quote = quotes.get(entry.mint) or quotes.get(entry.mint.lower())
+
+            if (quote is not None):
+
+                entry.price_usd, entry.liquidity_usd, entry.activity = quote
+                entry.updated_at                                     = now
+                self.updates                                        += 1
+            #
+
+            self.schedule(entry, now + self.interval(now - entry.first_seen, entry.activity))
+        #
+    #
+
+    async def poll_due(self) -> int:
+
+        """Poll the due mints, at most `concurrency` requests at once. Return how many were polled."""
+
+        due = self.pop_due(timestamp(), self.concurrency * self.batch_size)
+
+        await asyncio.gather(*[self.poll(chain, entries[i:i+self.batch_size]) for chain, entries in due.items() for i in range(0, len(entries), self.batch_size)])
+
+        return (sum(len(entries) for entries in due.values()))
+    #
+
+    async def run(self) -> None:
+
+        self._wakeup = asyncio.Event()
+
+        while (True):
+
+            if (await self.poll_due()):
+
+                continue
+            #
+
+            self._wakeup.clear()
+            wait = (self.heap[0][0] - timestamp()) if (self.heap) else self.window
+
+            try:
+
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, min(wait, 60.0)))
+            #
+            except asyncio.TimeoutError:
+
+                pass
+            #
+        #
+    #
+
+    def start(self) -> None:
+
+        """Start polling in the background, once."""
+
+        if (self.task is None) or (self.task.done()):
+
+            self.task = asyncio.create_task(self.run())
+        #
+    #
+
+    def quote(self, mint:str) -> dict:
+
+        """The latest price and liquidity of a tracked token, or None."""
+
+        entry = self.tracked.get(mint)
+
+        if (entry is None):
+
+            return (None)
+        #
+
+        return ({"mint": mint, "chain": entry.chain, "price_usd": entry.price_usd, "liquidity_usd": entry.liquidity_usd, "activity_h1": entry.activity, "updated_at": entry.updated_at, "next_poll": entry.due})
+    #
+
+    def stats(self) -> dict:
+
+        return ({
+            "tracked"  : len(self.tracked),
+            "heap"     : len(self.heap),
+            "polls"    : self.polls,
+            "updates"  : self.updates,
+            "failures" : self.failures,
+            "expired"  : self.expired,
+            "rejected" : self.rejected,
+        })
+    #
+
+    async def aclose(self) -> None:
+
+        self.screener.events.unsubscribe(self.on_new_token)
+        metrics.unregister_gauges(self.stats)
+
+        if (self.task is not None):
+
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        #
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
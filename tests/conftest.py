@@ -0,0 +1,14 @@
+import os
+import sys
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+# The package is not installed: import it from the repository root, whichever directory pytest runs from.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,32 @@
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from dex_screener_scraper.cadence import AdaptiveCadence
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### AdaptiveCadence
+#
+def test_new_mints_speed_up_and_empty_cycles_slow_down():
+
+    cadence = AdaptiveCadence(40, 10, 120)
+
+    assert (cadence.update(5, 100, 0, rate=4) == 20)
+    assert (cadence.update(0, 100, 0, rate=4) == 30)
+#
+
+def test_feeds_split_the_budget():
+
+    alone  = AdaptiveCadence(10, 1, 120, budget_share=0.5, batch_size=30)
+    shared = AdaptiveCadence(10, 1, 120, budget_share=0.5, batch_size=30, feeds=4)
+
+    # 300 lookups are 10 requests: 5s at half of 4 requests per second, 20s at an eighth of it.
+    assert (alone.update(10, 300, 300, rate=4)  == 5)
+    assert (shared.update(10, 300, 300, rate=4) == 20)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,62 @@
+import glob
+import logging
+import os
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+import utils.logger as logger_module
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Async logging
+#
+def test_async_records_are_formatted_by_the_writer(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(logger_module, "LOG_DIR", str(tmp_path))
+
+    logger = logger_module.get_logger(name="TestAsync", console_log=False, file_log=True, async_log=True)
+    logger.info("queued • %s", "payload")
+
+    try:
+
+        raise ValueError("boom")
+    #
+    except ValueError:
+
+        logger.exception("failed")
+    #
+
+    logger_module.stop_async_logging()
+
+    with open(*glob.glob(os.path.join(str(tmp_path), "*.log")), encoding="utf-8") as f:
+
+        text = f.read()
+    #
+
+    assert ("[queued • payload]" in text)
+    assert ("ValueError: boom" in text)
+#
+
+def test_async_records_of_child_loggers_reach_the_parent_handlers(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(logger_module, "LOG_DIR", str(tmp_path))
+
+    logger_module.get_logger(name="TestAsyncParent", console_log=False, file_log=True, async_log=True)
+    logging.getLogger("TestAsyncParent.child").warning("from the child")
+
+    logger_module.stop_async_logging()
+
+    with open(*glob.glob(os.path.join(str(tmp_path), "*.log")), encoding="utf-8") as f:
+
+        text = f.read()
+    #
+
+    assert ("TestAsyncParent.child" in text)
+    assert ("[from the child]" in text)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,52 @@
+import asyncio
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from dex_screener_scraper.metadata_cache import MetadataCache, MISSING
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MetadataCache
+#
+def test_least_recently_used_entries_are_evicted(tmp_path):
+
+    cache = MetadataCache(max_size=2, path=str(tmp_path / "cache.bin"))
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+
+    assert (cache.get("b") is MISSING)
+    assert (cache.get("a") == "A") and (cache.get("c") == "C")
+#
+
+def test_snapshot_round_trip(tmp_path):
+
+    path  = str(tmp_path / "cache.bin")
+    cache = MetadataCache(path=path)
+    cache.put("a", "A")
+    cache.put_negative("b")
+    cache.put("expired", "X", ttl=-1)
+    cache.put("c", "C")
+    cache.get("a")
+
+    assert (asyncio.run(cache.save_async()) == 3)
+
+    loaded = MetadataCache(max_size=2, path=path)
+
+    # The two most recently used entries are kept, negative ones stay negative.
+    assert (loaded.load() == 2)
+    assert (loaded.get("b") is MISSING)
+    assert (loaded.get("c") == "C") and (loaded.get("a") == "A")
+
+    loaded = MetadataCache(path=path)
+    loaded.load()
+
+    assert (loaded.get("b") is None)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import threading
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.metrics import MetricsRegistry
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Prometheus
+#
+def test_counters_end_in_total():
+
+    registry = MetricsRegistry(prefix="ds")
+    registry.inc("frames")
+    registry.inc("bytes_total", 5)
+
+    text = registry.render_prometheus()
+
+    assert ("# TYPE ds_frames_total counter\nds_frames_total 1\n" in text)
+    assert ("ds_bytes_total 5\n" in text)
+    assert ("ds_bytes_total_total" not in text)
+#
+
+def test_label_values_are_escaped():
+
+    registry = MetricsRegistry(prefix="ds")
+    registry.register_gauges("feed", lambda: {"frames": 3}, labels={"url": 'wss://x/"a"\\b\nc'})
+
+    assert ('ds_feed_frames{url="wss://x/\\"a\\"\\\\b\\nc"} 3' in registry.render_prometheus())
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### JSON dump
+#
+def test_gauges_are_sampled_on_the_loop(tmp_path):
+
+    registry = MetricsRegistry(prefix="ds")
+    threads  = []
+    path     = str(tmp_path / "metrics.json")
+
+    def sample() -> dict:
+
+        threads.append(threading.current_thread())
+        return ({"queued": 1})
+    #
+
+    registry.register_gauges("pipeline", sample)
+
+    async def dump_once():
+
+        task = asyncio.create_task(registry.dump_periodically(path, interval=0.01))
+
+        while (not tmp_path.joinpath("metrics.json").exists()):
+
+            await asyncio.sleep(0.01)
+        #
+
+        task.cancel()
+    #
+
+    asyncio.run(dump_once())
+
+    with open(path) as f:
+
+        assert (json.load(f)["gauges"] == [{"name": "pipeline_queued", "labels": {}, "value": 1}])
+    #
+    assert (threads) and (all(thread is threading.main_thread() for thread in threads))
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,167 @@
+import asyncio
+import time
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from dex_screener_scraper.pipeline import MintPipeline
+from dex_screener_scraper.retry    import RetryQueue
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Helpers
+#
+class FakeScreener:
+
+    """The parts of a Screener a pipeline uses. Lookups wait for `gate`, then resolve every mint."""
+
+    def __init__(self) -> None:
+
+        self.processed_mints = set()
+        self.inflight_mints  = set()
+        self.retry_queue     = RetryQueue()
+        self.unsaved_mints   = {}
+        self.gate            = asyncio.Event()
+        self.looked_up       = []
+        self.persists        = []
+    #
+
+    def mint_chain(self, mint:str) -> str:
+
+        return ("solana")
+    #
+
+    async def complete_mints_info(self, mints:list, chain:str=None) -> dict:
+
+        await self.gate.wait()
+
+        self.looked_up += mints
+        self.processed_mints.update(mints)
+        self.unsaved_mints.update(dict.fromkeys(mints, "SYM"))
+
+        return (dict.fromkeys(mints, True))
+    #
+
+    def persist(self) -> bool:
+
+        self.persists.append(time.monotonic())
+        self.unsaved_mints = {}
+
+        return (True)
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MintPipeline
+#
+def test_submit_drops_mints_already_known():
+
+    async def run() -> tuple:
+
+        screener = FakeScreener()
+        pipeline = MintPipeline(screener, workers=1)
+
+        screener.processed_mints.add("processed")
+        screener.inflight_mints.add("inflight")
+        screener.retry_queue.schedule("retrying", delay=60)
+
+        queued = [await pipeline.submit(["a", "a", "processed", "inflight", "retrying", "b"]), await pipeline.submit(["a", "b", "c"])]
+
+        screener.gate.set()
+        await pipeline.drain()
+
+        return (queued, screener.looked_up)
+    #
+
+    queued, looked_up = asyncio.run(run())
+
+    assert (queued == [2, 1])
+    assert (looked_up == ["a", "b", "c"])
+#
+
+def test_submit_waits_while_the_lookup_queue_is_full():
+
+    async def run() -> None:
+
+        screener = FakeScreener()
+        pipeline = MintPipeline(screener, workers=1, queue_size=2, batch_size=1)
+
+        # The worker holds one mint, the queue the next two.
+        await pipeline.submit(["a"])
+        await asyncio.sleep(0.01)
+        await pipeline.submit(["b", "c"])
+
+        submit = asyncio.create_task(pipeline.submit(["d"]))
+        await asyncio.sleep(0.05)
+
+        assert (not submit.done())
+
+        screener.gate.set()
+
+        assert (await asyncio.wait_for(submit, timeout=1) == 1)
+
+        await pipeline.drain()
+
+        assert (screener.looked_up == ["a", "b", "c", "d"])
+    #
+
+    asyncio.run(run())
+#
+
+def test_drain_gives_up_after_its_timeout():
+
+    async def run() -> None:
+
+        screener = FakeScreener()
+        pipeline = MintPipeline(screener, workers=1)
+
+        await pipeline.submit(["a", "b"])
+        screener.unsaved_mints["earlier"] = "SYM"
+
+        start = time.monotonic()
+        await pipeline.drain(timeout=0.1)
+
+        assert (time.monotonic() - start < 0.5)
+        assert (not pipeline.started) and (screener.looked_up == [])
+        assert (len(screener.persists) == 1) and (screener.unsaved_mints == {})
+
+        # A drained pipeline accepts nothing more.
+        assert (await pipeline.submit(["c"]) == 0)
+    #
+
+    asyncio.run(run())
+#
+
+def test_a_steady_stream_of_results_is_flushed_every_interval():
+
+    async def run() -> list:
+
+        screener = FakeScreener()
+        pipeline = MintPipeline(screener, workers=1, sink_batch=1000, sink_interval=0.2)
+
+        screener.gate.set()
+        start = time.monotonic()
+
+        for index in range(16):
+
+            await pipeline.submit([f"mint{index}"])
+            await asyncio.sleep(0.05)
+        #
+
+        flushes = [at - start for at in screener.persists]
+
+        await pipeline.drain()
+
+        return (flushes)
+    #
+
+    flushes = asyncio.run(run())
+
+    assert (len(flushes) >= 2)
+    assert (flushes[0] < 0.4)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
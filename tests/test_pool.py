@@ -0,0 +1,112 @@
+import asyncio
+import collections
+import json
+import random
+
+import pytest
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+pytest.importorskip("httpx")
+pytest.importorskip("curl_cffi")
+
+from utils.rate_limiter import TokenBucketLimiter
+
+from dex_screener_scraper.pool     import ScreenerPool
+from dex_screener_scraper.screener import Screener
+from benchmarks.frames             import random_mint
+import dex_screener_scraper.screener as screener_module
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Helpers
+#
+class CountingInfoClient:
+
+    """Answers /tokens/v1 lookups with one pair per mint, after a short delay, and counts the lookups of each mint."""
+
+    def __init__(self) -> None:
+
+        self.lookups = collections.Counter()
+    #
+
+    async def get(self, url:str):
+
+        mints = url.rsplit("/", 1)[-1].split(",")
+        self.lookups.update(mints)
+
+        await asyncio.sleep(0.01)
+
+        response             = type("Response", (), {})()
+        response.status_code = 200
+        response.content     = json.dumps([{"baseToken": {"address": mint, "symbol": mint[:4]}} for mint in mints]).encode()
+        response.headers     = {}
+
+        return (response)
+    #
+#
+
+@pytest.fixture(autouse=True)
+def fast_limiter(monkeypatch):
+
+    monkeypatch.setattr(Screener, "ds_limiter", TokenBucketLimiter(rate=1000, burst=1000))
+    monkeypatch.setattr(screener_module, "METADATA_CACHE_WARM_START", False)
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### ScreenerPool
+#
+def test_feeds_listing_the_same_mints_look_each_up_once(tmp_path):
+
+    rng    = random.Random(0)
+    listed = [random_mint(rng) for _ in range(60)]
+    client = CountingInfoClient()
+
+    async def run() -> ScreenerPool:
+
+        pool = ScreenerPool(["wss://feed.test/a", "wss://feed.test/b"], store_dir=str(tmp_path), history=False, market=False, tracker=False)
+
+        for screener in pool.screeners:
+
+            screener.infoer_client = client
+        #
+
+        try:
+
+            await asyncio.gather(*[screener.pipeline.submit(listed) for screener in pool.screeners])
+            await asyncio.gather(*[screener.pipeline.join() for screener in pool.screeners])
+        #
+        finally:
+
+            await pool.aclose()
+        #
+
+        return (pool)
+    #
+
+    pool = asyncio.run(run())
+
+    assert (set(pool.final_mints) == set(listed))
+    assert (set(client.lookups) == set(listed))
+    assert (max(client.lookups.values()) == 1)
+#
+
+def test_history_and_market_turned_off_stay_off_in_every_feed(tmp_path):
+
+    pool = ScreenerPool(["wss://feed.test/a", "wss://feed.test/b"], store_dir=str(tmp_path), history=False, market=False, tracker=False)
+
+    try:
+
+        assert (all((screener.history is None) and (screener.market is None) for screener in pool.screeners))
+    #
+    finally:
+
+        asyncio.run(pool.aclose())
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,121 @@
+import glob
+import json
+import os
+
+import pytest
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from dex_screener_scraper.protocol    import parse_pairs_frame, read_pairs, PairsFrameParser
+from dex_screener_scraper.decoder     import decode_pairs_frame
+from dex_screener_scraper.fingerprint import split_pairs_frame, read_segments
+from benchmarks.frames                import synthetic_frame
+
+# Golden frames: NAME.bin with NAME.json holding the expected "mints" and "pairs". Captured frames
+# (e.g. saved with benchmarks.frames.record_frames) go here too, with their expectations checked by hand.
+FRAMES_DIR = os.path.join(os.path.dirname(__file__), "frames")
+FRAMES     = sorted(glob.glob(os.path.join(FRAMES_DIR, "*.bin")))
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Helpers
+#
+def load(path:str) -> tuple:
+
+    with open(path, "rb") as f:
+
+        frame = f.read()
+    #
+    with open(path[:-len(".bin")] + ".json") as f:
+
+        expected = json.load(f)
+    #
+
+    return (frame, expected)
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Golden frames
+#
+@pytest.mark.parametrize("path", FRAMES, ids=os.path.basename)
+def test_golden_frame(path):
+
+    frame, expected = load(path)
+    pairs           = parse_pairs_frame(frame)
+
+    assert (decode_pairs_frame(frame) == expected["mints"])
+    assert (len(pairs) == len(expected["pairs"]))
+
+    for pair, fields in zip(pairs, expected["pairs"]):
+
+        # The symbol of a record that is not validated is only a guess: the API gives the real one.
+        assert ({key: getattr(pair, key) for key in fields} == fields)
+    #
+#
+
+@pytest.mark.parametrize("path", FRAMES, ids=os.path.basename)
+def test_chunked_parsing_agrees(path):
+
+    frame, _ = load(path)
+    whole    = [(pair.base_mint, pair.base_symbol, pair.validated) for pair in parse_pairs_frame(frame)]
+    parser   = PairsFrameParser()
+    chunked  = []
+
+    for start in range(0, len(frame), 7):
+
+        chunked += parser.feed(frame[start:start + 7])
+    #
+    chunked += parser.close()
+
+    assert ([(pair.base_mint, pair.base_symbol, pair.validated) for pair in chunked] == whole)
+#
+
+@pytest.mark.parametrize("path", FRAMES, ids=os.path.basename)
+def test_pairs_read_one_by_one_match_the_whole_frame(path):
+
+    frame, _ = load(path)
+    mints    = decode_pairs_frame(frame)
+    whole    = {}
+
+    for pair in parse_pairs_frame(frame):
+
+        whole.setdefault(pair.base_mint, pair)
+    #
+
+    alone = read_pairs(frame, mints)
+
+    assert ({mint: repr(pair) for mint, pair in alone.items()} == {mint: repr(whole[mint]) for mint in mints if mint in whole})
+#
+
+@pytest.mark.parametrize("path", FRAMES, ids=os.path.basename)
+def test_segments_decode_to_the_mints_of_the_frame(path):
+
+    frame, _         = load(path)
+    header, segments = split_pairs_frame(frame)
+
+    assert (decode_pairs_frame(header) + sum(read_segments(segments), []) == decode_pairs_frame(frame))
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Decoder
+#
+def test_mints_starting_with_the_length_byte_of_a_shorter_one():
+
+    # "V" is also the length byte of a 43-char string.
+    mints = ["V" + "a" * 43, "V" + "b" * 42, "V" + "c" * 39 + "pump"]
+
+    assert (decode_pairs_frame(synthetic_frame(mints=mints)) == mints)
+#
+
+def test_decoder_agrees_with_the_parser():
+
+    frame = synthetic_frame(pairs=2000, seed=3)
+
+    assert (decode_pairs_frame(frame) == [pair.base_mint for pair in parse_pairs_frame(frame)])
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
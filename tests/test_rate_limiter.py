@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import pytest
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.rate_limiter import TokenBucketLimiter
+import utils.rate_limiter as rate_limiter
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### TokenBucketLimiter
+#
+class ManualLimiter(TokenBucketLimiter):
+
+    """A limiter on a clock that only moves when the test says so."""
+
+    def __init__(self, rate:float, burst:int) -> None:
+
+        self.now = 0.0
+        super().__init__(rate=rate, burst=burst)
+    #
+
+    def _clock(self) -> float:
+
+        return (self.now)
+    #
+#
+
+def release_times(limiter:ManualLimiter, count:int, at:float) -> list:
+
+    return ([at + limiter._reserve(at) for _ in range(count)])
+#
+
+def test_burst_then_rate():
+
+    limiter  = ManualLimiter(rate=4, burst=4)
+    releases = release_times(limiter, 8, at=0.0)
+
+    assert (releases[:4] == [0.0] * 4)
+    assert (releases[4:] == pytest.approx([0.25, 0.5, 0.75, 1.0]))
+#
+
+def test_waiters_are_spaced_after_a_throttle():
+
+    limiter = ManualLimiter(rate=4, burst=4)
+    limiter.throttle(5)
+
+    releases = release_times(limiter, 20, at=0.1)
+    gaps     = [later - earlier for earlier, later in zip(releases, releases[1:])]
+
+    assert (min(releases) >= 5.0)
+    assert (gaps == pytest.approx([0.25] * 19))
+#
+
+def test_bucket_refills_from_the_end_of_the_block():
+
+    limiter = ManualLimiter(rate=4, burst=4)
+    limiter.throttle(5)
+
+    # One second after the block, four permits have accrued: no more.
+    releases = release_times(limiter, 5, at=6.0)
+
+    assert (releases[:4] == [6.0] * 4)
+    assert (releases[4] == pytest.approx(6.25))
+#
+
+def test_queued_waiters_keep_their_turn_after_a_throttle():
+
+    limiter = ManualLimiter(rate=2, burst=1)
+    first   = release_times(limiter, 3, at=0.0)
+
+    limiter.throttle(2)
+    later   = release_times(limiter, 2, at=0.0)
+
+    assert (first == pytest.approx([0.0, 0.5, 1.0]))
+    assert (later == pytest.approx([3.5, 4.0]))
+#
+
+def test_a_sleeper_waits_out_a_throttle(monkeypatch):
+
+    limiter = ManualLimiter(rate=2, burst=1)
+    sleeps  = []
+
+    async def sleep(delay:float) -> None:
+
+        # A 429 arrives while the first sleeper waits.
+        if (not sleeps):
+
+            limiter.throttle(2)
+        #
+
+        sleeps.append(delay)
+        limiter.now += delay
+    #
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", sleep)
+
+    async def acquire_two() -> float:
+
+        await limiter.acquire()
+        waited = await limiter.acquire()
+
+        return (waited)
+    #
+
+    waited = asyncio.run(acquire_two())
+
+    assert (limiter.now >= 2.0)
+    assert (waited == pytest.approx(limiter.now))
+    assert (len(sleeps) == 2)
+#
+
+def test_concurrent_sleepers_keep_their_place_after_a_throttle():
+
+    async def releases() -> list:
+
+        limiter = TokenBucketLimiter(rate=10, burst=1)
+        started = time.monotonic()
+
+        async def release() -> float:
+
+            await limiter.acquire()
+
+            return (time.monotonic() - started)
+        #
+
+        # One permit right away, nine sleepers due at 0.1 ... 0.9 until a 0.5s block at 0.05.
+        tasks = [asyncio.ensure_future(release()) for _ in range(10)]
+        await asyncio.sleep(0.05)
+        limiter.throttle(0.5)
+
+        return (sorted(await asyncio.gather(*tasks)))
+    #
+
+    times = asyncio.run(releases())
+    gaps  = [later - earlier for earlier, later in zip(times[1:], times[2:])]
+
+    assert (times[1] == pytest.approx(0.6, abs=0.05))
+    assert (times[-1] == pytest.approx(1.4, abs=0.1))
+    assert (gaps == pytest.approx([0.1] * 8, abs=0.05))
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,59 @@
+from dex_screener_scraper.retry import RetryQueue
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### RetryQueue
+#
+def test_attempts_are_counted_until_exhausted():
+
+    retries = RetryQueue(max_attempts=3, base_delay=0)
+
+    assert (retries.schedule("a")) and (retries.attempts("a") == 1)
+    assert (retries.schedule("a")) and (retries.attempts("a") == 2)
+    assert (not retries.schedule("a"))
+
+    # An exhausted mint is forgotten: a later failure starts a new series of attempts.
+    assert ("a" not in retries) and (retries.attempts("a") == 0)
+    assert (retries.scheduled == 2) and (retries.exhausted == 1)
+    assert (retries.schedule("a")) and (retries.attempts("a") == 1)
+#
+
+def test_due_retries_are_handed_out_within_the_in_flight_cap():
+
+    retries = RetryQueue(max_in_flight=2)
+
+    for mint in "abcd":
+
+        retries.schedule(mint, delay=0)
+    #
+    retries.schedule("later", delay=60)
+
+    assert (retries.pop_due() == ["a", "b"])
+    assert (retries.pop_due() == [])
+
+    # Finishing, or rescheduling, a retry in flight frees its place.
+    retries.finish("a")
+    assert (retries.pop_due(limit=5) == ["c"])
+
+    retries.schedule("b", delay=0)
+    assert (retries.pop_due() == ["d"])
+    assert (len(retries) == 2) and (retries.next_due() == 0)
+#
+
+def test_finished_mints_are_forgotten():
+
+    retries = RetryQueue(max_attempts=3)
+    retries.schedule("a", delay=0)
+
+    assert (retries.pop_due() == ["a"])
+    assert ("a" in retries)
+
+    retries.finish("a")
+
+    assert ("a" not in retries) and (retries.attempts("a") == 0)
+    assert (len(retries) == 0) and (retries.next_due() is None)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
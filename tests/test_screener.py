@@ -0,0 +1,263 @@
+import asyncio
+import json
+import os
+import random
+
+import pytest
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+pytest.importorskip("httpx")
+pytest.importorskip("curl_cffi")
+
+from utils.rate_limiter import TokenBucketLimiter
+
+from dex_screener_scraper.screener       import Screener
+from dex_screener_scraper.store          import MintStore
+from dex_screener_scraper.history        import TokenHistory
+from dex_screener_scraper.metadata_cache import MetadataCache
+from dex_screener_scraper.retry          import RetryQueue
+from benchmarks.frames                   import random_mint, synthetic_frame
+import dex_screener_scraper.screener as screener_module
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Helpers
+#
+class FakeResponse:
+
+    def __init__(self, status_code:int, body=None, headers:dict=None) -> None:
+
+        self.status_code = status_code
+        self.content     = json.dumps(body).encode() if (body is not None) else b""
+        self.text        = self.content.decode()
+        self.headers     = headers or {}
+    #
+#
+
+class FakeInfoClient:
+
+    """Answers /tokens/v1 lookups with one pair per mint. `respond(mints)` may return another response instead."""
+
+    def __init__(self, respond=None) -> None:
+
+        self.respond  = respond
+        self.requests = []
+    #
+
+    async def get(self, url:str) -> FakeResponse:
+
+        mints = url.rsplit("/", 1)[-1].split(",")
+        self.requests.append(mints)
+
+        response = self.respond(mints) if (self.respond is not None) else None
+
+        return (response or FakeResponse(200, [{"baseToken": {"address": mint, "symbol": mint[:4]}} for mint in mints]))
+    #
+#
+
+def mints(count:int, seed:int=0) -> list:
+
+    rng = random.Random(seed)
+
+    return ([random_mint(rng) for _ in range(count)])
+#
+
+def make_screener(directory:str, client:FakeInfoClient) -> Screener:
+
+    screener = Screener("wss://feed.test",
+                        store          = MintStore(directory),
+                        history        = TokenHistory(os.path.join(directory, "history.sqlite3")),
+                        metadata_cache = MetadataCache(path=os.path.join(directory, "token_metadata.bin")))
+
+    screener.infoer_client = client
+
+    return (screener)
+#
+
+@pytest.fixture(autouse=True)
+def fast_limiter(monkeypatch):
+
+    monkeypatch.setattr(Screener, "ds_limiter", TokenBucketLimiter(rate=1000, burst=1000))
+    monkeypatch.setattr(screener_module, "METADATA_CACHE_WARM_START", False)
+#
+
+def lookup(tmp_path, client:FakeInfoClient, batch:list) -> tuple:
+
+    async def run() -> tuple:
+
+        screener = make_screener(str(tmp_path), client)
+
+        try:
+
+            return (screener, await screener.complete_mints_info(batch))
+        #
+        finally:
+
+            await screener.aclose()
+            screener.history.close()
+        #
+    #
+
+    return (asyncio.run(run()))
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Frames
+#
+def test_only_the_pairs_of_unseen_mints_are_parsed(tmp_path):
+
+    listed   = mints(10, seed=2)
+    screener = make_screener(str(tmp_path), FakeInfoClient())
+
+    for mint in listed[:8]:
+
+        screener.processed_mints.add(mint)
+    #
+
+    try:
+
+        assert (screener.ingest_frame(synthetic_frame(mints=listed)) == listed)
+        assert (set(screener.frame_pairs) == set(listed[8:]))
+        assert (all(pair.validated for pair in screener.frame_pairs.values()))
+    #
+    finally:
+
+        asyncio.run(screener.aclose())
+        screener.history.close()
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Lookups
+#
+def test_strings_that_are_not_addresses_are_never_requested(tmp_path):
+
+    good           = mints(2)
+    bad            = ["So1ana#frag/ment?x=%2F" + "1" * 22]
+    client         = FakeInfoClient()
+    screener, done = lookup(tmp_path, client, [good[0], bad[0], good[1]])
+
+    assert (client.requests == [good])
+    assert (done == {bad[0]: False, good[0]: True, good[1]: True})
+    assert (set(screener.final_mints) == set(good))
+#
+
+def test_a_rejected_batch_is_split_down_to_the_bad_mints(tmp_path):
+
+    batch  = mints(16, seed=1)
+    bad    = {batch[5], batch[11]}
+    client = FakeInfoClient(lambda requested: FakeResponse(400, {"error": "bad address"}) if bad.intersection(requested) else None)
+
+    screener, done = lookup(tmp_path, client, batch)
+
+    assert (set(screener.final_mints) == set(batch) - bad)
+    assert ({mint for mint, ok in done.items() if not ok} == bad)
+    assert (all(screener.metadata_cache.get(mint) is None for mint in bad))
+    assert (len(client.requests) < len(batch))
+#
+
+def test_a_rejected_mint_is_looked_up_again_once_its_negative_entry_expires(tmp_path):
+
+    mint   = mints(1, seed=3)[0]
+    client = FakeInfoClient(lambda requested: FakeResponse(400, {"error": "bad address"}))
+
+    async def run() -> list:
+
+        screener = make_screener(str(tmp_path), client)
+        screener.metadata_cache.negative_ttl = 0.05
+
+        try:
+
+            done = [await screener.complete_mints_info([mint]) for _ in range(2)]
+
+            assert (mint not in screener.processed_mints)
+            assert (len(client.requests) == 1)
+
+            await asyncio.sleep(0.1)
+            done.append(await screener.complete_mints_info([mint]))
+
+            return (done)
+        #
+        finally:
+
+            await screener.aclose()
+            screener.history.close()
+        #
+    #
+
+    assert (asyncio.run(run()) == [{mint: False}] * 3)
+    assert (len(client.requests) == 2)
+#
+
+def test_a_mint_outliving_its_retries_is_not_lost(tmp_path):
+
+    mint   = mints(1, seed=5)[0]
+    outage = [True]
+    client = FakeInfoClient(lambda requested: FakeResponse(503) if outage[0] else None)
+
+    async def run() -> list:
+
+        screener             = make_screener(str(tmp_path), client)
+        screener.retry_queue = RetryQueue(max_attempts=1)
+
+        try:
+
+            done      = [await screener.complete_mints_info([mint])]
+            outage[0] = False
+
+            assert (mint not in screener.processed_mints) and (mint not in screener.retry_queue)
+
+            done.append(await screener.complete_mints_info([mint]))
+
+            return (done)
+        #
+        finally:
+
+            await screener.aclose()
+            screener.history.close()
+        #
+    #
+
+    assert (asyncio.run(run()) == [{mint: False}, {mint: True}])
+#
+
+def test_cache_hits_are_published_only_when_asked(tmp_path):
+
+    cached = mints(2, seed=4)
+
+    async def run(publish_cached:bool) -> list:
+
+        screener = make_screener(str(tmp_path / str(publish_cached)), FakeInfoClient())
+        events   = []
+
+        screener.publish_cached = publish_cached
+        screener.events.subscribe(events.append)
+
+        for mint in cached:
+
+            screener.metadata_cache.put(mint, "SYM")
+        #
+
+        try:
+
+            await screener.complete_mints_info(cached)
+        #
+        finally:
+
+            await screener.aclose()
+            screener.history.close()
+        #
+
+        return (events)
+    #
+
+    assert (asyncio.run(run(False)) == [])
+    assert ([(event.mint, event.source) for event in asyncio.run(run(True))] == [(mint, "cache") for mint in cached])
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,103 @@
+import time
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+from utils.seen_index import SeenIndex, SharedSeenIndex
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### SeenIndex
+#
+def test_exact_mode_evicts_the_oldest():
+
+    index = SeenIndex(max_size=2)
+
+    for item in ("a", "b", "c"):
+
+        index.add(item)
+    #
+
+    assert ("a" not in index)
+    assert ("b" in index) and ("c" in index)
+    assert (len(index) == 2)
+#
+
+def test_adds_drop_expired_entries(monkeypatch):
+
+    now   = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    index = SeenIndex(max_size=10, ttl=5)
+
+    index.add("old")
+    now[0] = 10.0
+    index.add("new")
+
+    assert (len(index) == 1)
+    assert ("new" in index)
+#
+
+def test_bloom_discard_is_a_no_op():
+
+    index = SeenIndex(max_size=100, bloom=True)
+    index.add("mint")
+    index.discard("mint")
+
+    assert ("mint" in index)
+#
+
+def test_bloom_len_counts_distinct_items():
+
+    index = SeenIndex(max_size=100, bloom=True)
+
+    for item in ("a", "b", "a", "a"):
+
+        index.add(item)
+    #
+
+    assert (len(index) == 2)
+#
+###################################################################################################
+###################################################################################################
+
+def test_bloom_rotates_instead_of_filling_up():
+
+    index = SeenIndex(max_size=1000, bloom=True)
+
+    for number in range(10_000):
+
+        index.add(str(number))
+    #
+
+    false_positives = sum(str(number) in index for number in range(1_000_000, 1_100_000))
+
+    assert (len(index) <= 2000)
+    assert (all(str(number) in index for number in range(9000, 10_000)))
+    assert (false_positives < 2 * 0.001 * 100_000)
+#
+
+def test_shared_index_shares_adds_and_rotations():
+
+    index    = SharedSeenIndex(max_size=1000)
+    attached = SharedSeenIndex(**index.spec())
+
+    try:
+
+        for number in range(2500):
+
+            index.add(str(number))
+        #
+
+        assert (len(attached) == len(index))
+        assert ("2499" in attached)
+        assert (sum(str(number) in attached for number in range(1000)) < 10)
+    #
+    finally:
+
+        attached.close()
+        index.close()
+    #
+#
+###################################################################################################
+#
\ No newline at end of file
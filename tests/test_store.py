@@ -0,0 +1,96 @@
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+import json
+import os
+
+import dex_screener_scraper.store as store_module
+from dex_screener_scraper.store import MintStore
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MintStore
+#
+def test_symbol_updates_are_appended(tmp_path):
+
+    store = MintStore(str(tmp_path), fsync=False)
+
+    assert (store.append({"mint1": "OLD", "mint2": "TWO"}) == 2)
+    assert (store.append({"mint1": "OLD"}) == 0)
+    assert (store.append({"mint1": "NEW"}) == 1)
+    assert (MintStore(str(tmp_path)).load() == {"mint1": "NEW", "mint2": "TWO"})
+    assert (store.needs_compaction())
+#
+
+def test_written_mints_are_forgotten_at_day_rollover(tmp_path, monkeypatch):
+
+    store = MintStore(str(tmp_path), fsync=False)
+
+    monkeypatch.setattr(store_module, "now_yyyy_mm_dd", lambda: "2026_01_01")
+    store.append({"mint1": "ONE"})
+
+    monkeypatch.setattr(store_module, "now_yyyy_mm_dd", lambda: "2026_01_02")
+
+    assert (store.append({"mint1": "ONE"}) == 1)
+    assert (store.written == {"mint1": "ONE"})
+    assert (store.load("2026_01_01") == store.load("2026_01_02") == {"mint1": "ONE"})
+#
+
+def test_appends_go_on_while_compacting(tmp_path):
+
+    store = MintStore(str(tmp_path), fsync=False)
+    store.append({"mint1": "OLD", "mint2": "TWO"})
+    store.append({"mint1": "NEW"})
+
+    read_lines = store.read_lines
+
+    def read_and_append(f, result, path, end=None):
+
+        lines = read_lines(f, result, path, end=end)
+
+        # Reading the log does not hold the lock, or this would deadlock.
+        if (end is not None):
+
+            store.append({"mint3": "THREE", "mint2": "2"})
+        #
+
+        return (lines)
+    #
+
+    store.read_lines = read_and_append
+
+    assert (store.compact() == 3)
+
+    # The lines appended meanwhile are copied as they are, so the symbol update leaves one stale line.
+    with open(store.path(), encoding="utf-8") as f:
+
+        assert (len(f.readlines()) == 4)
+    #
+
+    assert (store.written == MintStore(str(tmp_path)).load() == {"mint1": "NEW", "mint2": "2", "mint3": "THREE"})
+    assert (store.stale == 1)
+    assert (store.append({"mint3": "THREE"}) == 0)
+    assert (store.compact() == 3) and (not store.needs_compaction())
+#
+
+def test_compaction_folds_the_legacy_file_into_what_is_written(tmp_path):
+
+    store = MintStore(str(tmp_path), fsync=False)
+
+    with open(store.path(legacy=True), "w", encoding="utf-8") as f:
+
+        json.dump({"legacy": "OLD"}, f)
+    #
+
+    store.append({"mint1": "ONE"})
+
+    assert (store.compact() == 2)
+    assert (not os.path.exists(store.path(legacy=True)))
+    assert (store.append({"legacy": "OLD", "mint1": "ONE"}) == 0)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
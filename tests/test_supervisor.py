@@ -0,0 +1,116 @@
+import asyncio
+import json
+import queue
+import random
+
+import pytest
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
+pytest.importorskip("httpx")
+pytest.importorskip("curl_cffi")
+
+from utils.rate_limiter import TokenBucketLimiter
+from utils.seen_index   import SharedSeenIndex
+
+from dex_screener_scraper.supervisor import ShardWorker, Supervisor, NullSink
+from dex_screener_scraper.screener   import Screener
+from dex_screener_scraper.store      import MintStore
+from benchmarks.frames               import random_mint
+import dex_screener_scraper.supervisor as supervisor_module
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Helpers
+#
+class FakeInfoClient:
+
+    """Answers /tokens/v1 lookups with one pair per mint."""
+
+    def __init__(self) -> None:
+
+        self.requests = []
+    #
+
+    async def get(self, url:str):
+
+        mints = url.rsplit("/", 1)[-1].split(",")
+        self.requests.append(mints)
+
+        response             = type("Response", (), {})()
+        response.status_code = 200
+        response.content     = json.dumps([{"baseToken": {"address": mint, "symbol": mint[:4]}} for mint in mints]).encode()
+        response.headers     = {}
+
+        return (response)
+    #
+#
+
+@pytest.fixture(autouse=True)
+def fast_limiter(monkeypatch):
+
+    monkeypatch.setattr(Screener, "ds_limiter", TokenBucketLimiter(rate=1000, burst=1000))
+    monkeypatch.setattr(supervisor_module, "METADATA_CACHE_WARM_START", False)
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### ShardWorker
+#
+def test_cache_hits_reach_the_supervisor_once(tmp_path):
+
+    rng     = random.Random(0)
+    cached  = [random_mint(rng) for _ in range(3)]
+    fresh   = [random_mint(rng) for _ in range(2)]
+    results = queue.Queue()
+    seen    = SharedSeenIndex(max_size=1000)
+    client  = FakeInfoClient()
+
+    async def run() -> None:
+
+        worker = ShardWorker(0, 1, [], [queue.Queue()], results, seen, cache_dir=str(tmp_path))
+        worker.screener.infoer_client = client
+
+        for mint in cached:
+
+            worker.screener.metadata_cache.put(mint, "CACHED")
+        #
+
+        try:
+
+            await worker.accept([(mint, "solana", None) for mint in cached + fresh])
+            await worker.screener.pipeline.join()
+        #
+        finally:
+
+            await worker.screener.aclose()
+        #
+    #
+
+    try:
+
+        asyncio.run(run())
+
+        supervisor = Supervisor([], workers=1, store=MintStore(str(tmp_path)), history=NullSink())
+        published  = []
+        supervisor.events.subscribe(published.append)
+
+        while (not results.empty()):
+
+            supervisor.record(results.get())
+        #
+    #
+    finally:
+
+        seen.close()
+    #
+
+    assert (client.requests == [fresh])
+    assert (set(supervisor.final_mints) == set(cached + fresh))
+    assert ({token.mint for token in published} == set(fresh))
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
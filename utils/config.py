@@ -23,6 +23,40 @@ MIN_LOGGING_LEVEL_FILE    = logging.DEBUG
 MUST_LOG_TO_CONSOLE       = True
 MUST_LOG_TO_FILE          = True
 MUST_LOG_TIME_MS          = False
+MUST_LOG_ASYNC            = True
+#
+#####################################################################################################################################################
+#####################################################################################################################################################
+##################################################################################################################################################### HTTP
+#
+HTTP_BACKEND              = "httpx"      # "httpx", "curl_cffi"
+HTTP_HTTP2                = "auto"       # "auto" (when the backend can: curl_cffi, or httpx with the optional h2 package), True, False
+HTTP_MAX_CONNECTIONS      = 20
+HTTP_MAX_KEEPALIVE        = 10
+HTTP_KEEPALIVE_EXPIRY_SEC = 30
+HTTP_TIMEOUT_SEC          = 10
+#
+#####################################################################################################################################################
+#####################################################################################################################################################
+##################################################################################################################################################### Metrics
+#
+METRICS_ENABLED           = True
+METRICS_PREFIX            = "dexscreener"
+METRICS_HTTP_HOST         = "127.0.0.1"
+METRICS_HTTP_PORT         = None         # e.g. 9464 to serve Prometheus text on /metrics
+METRICS_JSON_PATH         = None         # e.g. os.path.join(LOG_DIR, 'metrics.json') for a periodic JSON dump
+METRICS_JSON_EVERY_SEC    = 60
+#
+#####################################################################################################################################################
+#####################################################################################################################################################
+##################################################################################################################################################### Offload
+#
+OFFLOAD_EXECUTOR          = None         # None (parse on the event loop), "thread", "process"
+OFFLOAD_WORKERS           = 2
+OFFLOAD_MIN_BYTES         = 32 * 1024    # smaller frames and response bodies are parsed inline
+JSON_BACKEND              = "auto"       # "auto" (orjson, then msgspec, then json), "orjson", "msgspec", "json"
+LOOP_LAG_ENABLED          = True
+LOOP_LAG_INTERVAL_SEC     = 0.05
 #
 #####################################################################################################################################################
 #####################################################################################################################################################
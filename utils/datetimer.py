@@ -1,8 +1,8 @@
 # WARNING: This module is internal. Better not to import or use directly.
 
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 import time
-import pytz
 import warnings
 #
 ###################################################################################################
@@ -10,14 +10,113 @@ import warnings
 ################################################################################################### Modules
 #
 from utils.config import WORKING_TIMEZONE
+
+DEFAULT_TIMEZONE = 'Asia/Tehran'
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Clock
+#
+class FakeClock:
+
+    """Manually driven clock for tests: `set_clock(FakeClock(ts))`, then `advance(seconds)`."""
+
+    def __init__(self, start:float=0.0) -> None:
+
+        self.now      = float(start)
+        self.mono_now = 0.0
+    #
+
+    def time(self) -> float:
+
+        return (self.now)
+    #
+
+    def monotonic(self) -> float:
+
+        return (self.mono_now)
+    #
+
+    def advance(self, seconds:float) -> None:
+
+        self.now      += seconds
+        self.mono_now += seconds
+    #
+#
+
+_time          = time.time
+_monotonic     = time.monotonic
+_tz            = None
+_day_cache     = (0.0, 0.0, '')     # (local midnight, next local midnight, YYYY_MM_DD)
+_second_cache  = (None, '')         # (whole epoch second, YYYY_MM_DD__HH_MM_SS)
+
+def set_clock(clock:FakeClock=None) -> None:
+
+    """Drive every helper below from `clock` (anything with `time()` and `monotonic()`), or from the system clock when None."""
+
+    global _time, _monotonic
+
+    _time      = clock.time      if clock else time.time
+    _monotonic = clock.monotonic if clock else time.monotonic
+
+    _reset_caches()
+#
+
+def _reset_caches() -> None:
+
+    global _tz, _day_cache, _second_cache
+
+    _tz           = None
+    _day_cache    = (0.0, 0.0, '')
+    _second_cache = (None, '')
+#
+
+def _zone() -> ZoneInfo:
+
+    global _tz
+
+    if (_tz is None):
+
+        _tz = ZoneInfo(WORKING_TIMEZONE)
+    #
+
+    return (_tz)
+#
+
+def _current_day(now:float) -> tuple:
+
+    day_cache = _day_cache
+
+    if (day_cache[0] <= now < day_cache[1]):
+
+        return (day_cache)
+    #
+
+    return (_roll_day(now))
+#
+
+def _roll_day(now:float) -> tuple:
+
+    global _day_cache
+
+    tz        = _zone()
+    dt        = datetime.fromtimestamp(now, tz)
+    start     = datetime(dt.year, dt.month, dt.day, tzinfo=tz)
+    end       = datetime.combine(start.date() + timedelta(days=1), start.time(), tzinfo=tz)
+    day_cache = (start.timestamp(), end.timestamp(), start.strftime('%Y_%m_%d'))
+
+    # Swapped in as one tuple, so the logging thread never reads a half-updated day.
+    _day_cache = day_cache
+
+    return (day_cache)
 #
 ###################################################################################################
 ###################################################################################################
 ################################################################################################### Functions
 #
 def monotonic() -> float:
-    
-    return time.monotonic()
+
+    return (_monotonic())
 #
 
 def timestamp(ms:bool=False) -> float:
@@ -26,11 +125,11 @@ def timestamp(ms:bool=False) -> float:
 
     if (ms):
 
-        return (time.time() * 1000)
+        return (_time() * 1000)
     #
     else:
 
-        return (time.time())
+        return (_time())
     #
 #
 
@@ -38,23 +137,27 @@ def set_timezone(timezone:str=None) -> None:
 
     """set timezone string to config."""
 
+    global WORKING_TIMEZONE
+
     try:
 
         if (timezone is None):
 
-            WORKING_TIMEZONE = 'Asia/Tehran'
+            WORKING_TIMEZONE = DEFAULT_TIMEZONE
         #
         else:
 
-            pytz.timezone(timezone)
+            ZoneInfo(timezone)
             WORKING_TIMEZONE = timezone
         #
     #
     except Exception as e:
 
-        warnings.warn(f"[datetimer] Invalid timezone '{timezone}'. Falling back to Asia/Tehran.")
-        WORKING_TIMEZONE = 'Asia/Tehran'
+        warnings.warn(f"[datetimer] Invalid timezone '{timezone}'. Falling back to {DEFAULT_TIMEZONE}.")
+        WORKING_TIMEZONE = DEFAULT_TIMEZONE
     #
+
+    _reset_caches()
 #
 
 def get_timezone() -> str:
@@ -68,8 +171,7 @@ def now_local() -> datetime:
 
     """Return current local datetime object based on timezone config."""
 
-    tz = pytz.timezone(get_timezone())
-    return (datetime.now(tz))
+    return (datetime.fromtimestamp(_time(), _zone()))
 #
 
 def now_iso() -> str:
@@ -83,26 +185,64 @@ def now_yyyy_mm__dd_hh_mm_ss(ms:bool=False) -> str:
 
     """Return local time as a human-readable string: YYYY_MM_DD_HH_MM_SS"""
 
-    dt = now_local()
+    return (yyyy_mm__dd_hh_mm_ss(_time(), ms))
+#
 
+def yyyy_mm__dd_hh_mm_ss(ts:float, ms:bool=False) -> str:
+
+    """Return a UTC timestamp as local time string: YYYY_MM_DD_HH_MM_SS"""
+
+    second        = int(ts // 1)
+    second_cache  = _second_cache
+
+    if (second_cache[0] == second):
+
+        text = second_cache[1]
+    #
+    else:
+
+        text = _format_second(second)
+    #
 
     if (ms):
 
-        return dt.strftime('%Y_%m_%d__%H_%M_%S') + f"__{dt.microsecond // 1000:03d}"
+        return (text + f"__{int((ts - second) * 1000):03d}")
     #
     else:
 
-        return dt.strftime('%Y_%m_%d__%H_%M_%S')
+        return (text)
     #
 #
 
+def _format_second(second:int) -> str:
+
+    global _second_cache
+
+    text          = datetime.fromtimestamp(second, _zone()).strftime('%Y_%m_%d__%H_%M_%S')
+    _second_cache = (second, text)
+
+    return (text)
+#
+
+def next_day_timestamp() -> float:
+
+    """Return the UTC timestamp of the next local midnight."""
+
+    return (_current_day(_time())[1])
+#
+
+def yyyy_mm_dd_to_timestamp(day:str) -> float:
+
+    """Return the UTC timestamp of the local midnight starting a YYYY_MM_DD day."""
+
+    return (datetime.strptime(day, '%Y_%m_%d').replace(tzinfo=_zone()).timestamp())
+#
+
 def now_yyyy_mm_dd() -> str:
 
     """Return local time as a human-readable string: YYYY_MM_DD"""
 
-    dt = now_local()
-
-    return dt.strftime('%Y_%m_%d')
+    return (_current_day(_time())[2])
 #
 ###################################################################################################
 ###################################################################################################
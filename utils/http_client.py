@@ -1,5 +1,95 @@
-import httpx
-from curl_cffi import AsyncSession
+import contextlib
+import warnings
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Modules
+#
+from utils.config import HTTP_BACKEND, HTTP_HTTP2, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE
+from utils.config import HTTP_KEEPALIVE_EXPIRY_SEC, HTTP_TIMEOUT_SEC
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Factory
+#
+class CurlAsyncClient:
+
+    """curl_cffi `AsyncSession` with the small httpx-style surface (`get`, `aclose`) the package uses."""
+
+    def __init__(self, session:"AsyncSession") -> None:
+
+        self.session = session
+    #
+
+    async def get(self, url:str, **kwargs):
+
+        return (await self.session.get(url, **kwargs))
+    #
+
+    async def ws_connect(self, url:str, **kwargs):
+
+        return (await self.session.ws_connect(url, **kwargs))
+    #
+
+    async def aclose(self) -> None:
+
+        await self.session.close()
+    #
+#
+
+def make_async_client(backend:str           = HTTP_BACKEND,
+                      http2                 = HTTP_HTTP2,
+                      max_connections:int   = HTTP_MAX_CONNECTIONS,
+                      max_keepalive:int     = HTTP_MAX_KEEPALIVE,
+                      keepalive_expiry:float= HTTP_KEEPALIVE_EXPIRY_SEC,
+                      timeout:float         = HTTP_TIMEOUT_SEC):
+
+    """
+    Build a pooled async HTTP client of the given backend ("httpx" or "curl_cffi").
+
+    `http2` is True, False or "auto": HTTP/2 when the backend supports it here, without a warning.
+
+    The backends are imported here rather than at module level: they are the slowest imports of the
+    package, and a process only pays for the ones it actually uses.
+    """
+
+    if (backend == "httpx"):
+
+        import httpx
+
+        if (http2):
+
+            try:
+
+                import h2
+            #
+            except ImportError:
+
+                if (http2 != "auto"):
+
+                    warnings.warn("[http_client] HTTP/2 needs the 'h2' package. Falling back to HTTP/1.1.")
+                #
+
+                http2 = False
+            #
+        #
+
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive, keepalive_expiry=keepalive_expiry)
+
+        return (httpx.AsyncClient(http2=bool(http2), limits=limits, timeout=httpx.Timeout(timeout)))
+    #
+    elif (backend == "curl_cffi"):
+
+        from curl_cffi import AsyncSession, CurlHttpVersion
+
+        http_version = CurlHttpVersion.V2TLS if http2 else CurlHttpVersion.V1_1
+
+        return (CurlAsyncClient(AsyncSession(max_clients=max_connections, timeout=timeout, http_version=http_version)))
+    #
+    else:
+
+        raise ValueError(f"Unknown HTTP backend '{backend}'")
+    #
 #
 ###################################################################################################
 ###################################################################################################
@@ -9,37 +99,46 @@ _client_ds_screener        = None
 _client_ds_screener_infoer = None
 _client_ds_asset_infoer    = None
 
-def get_async_client_ds_screener()        -> AsyncSession:
+def get_async_client_ds_screener()        -> CurlAsyncClient:
+
+    """Websocket client. Websockets are only supported by curl_cffi, whatever the HTTP backend is."""
 
     global _client_ds_screener
 
     if (_client_ds_screener is None):
 
-        _client_ds_screener = AsyncSession()
+        _client_ds_screener = make_async_client(backend="curl_cffi")
     #
 
     return (_client_ds_screener)
 #
 
-def get_async_client_ds_screener_infoer() -> httpx.AsyncClient:
+def get_async_client_ds_screener_infoer() -> "httpx.AsyncClient":
 
     global _client_ds_screener_infoer
 
     if (_client_ds_screener_infoer is None):
 
-        _client_ds_screener_infoer = httpx.AsyncClient()
+        if (HTTP_BACKEND == "curl_cffi"):
+
+            _client_ds_screener_infoer = get_async_client_ds_screener()
+        #
+        else:
+
+            _client_ds_screener_infoer = make_async_client()
+        #
     #
 
     return (_client_ds_screener_infoer)
 #
 
-def get_async_client_ds_asset_infoer()    -> httpx.AsyncClient:
+def get_async_client_ds_asset_infoer()    -> "httpx.AsyncClient":
 
     global _client_ds_asset_infoer
 
     if (_client_ds_asset_infoer is None):
 
-        _client_ds_asset_infoer = httpx.AsyncClient()
+        _client_ds_asset_infoer = make_async_client()
     #
 
     return (_client_ds_asset_infoer)
@@ -49,11 +148,13 @@ async def close_watchlist_async_clients():
 
     global         _client_ds_screener, _client_ds_screener_infoer, _client_ds_asset_infoer
 
+    closed = []
     for client in [_client_ds_screener, _client_ds_screener_infoer, _client_ds_asset_infoer]:
 
-        if client:
+        if (client) and (client not in closed):
 
             await client.aclose()
+            closed.append(client)
         #
     #
 
@@ -61,7 +162,22 @@ async def close_watchlist_async_clients():
     _client_ds_screener_infoer = None
     _client_ds_asset_infoer    = None
 #
+
+@contextlib.asynccontextmanager
+async def watchlist_async_clients():
+
+    """Scope the shared clients: `async with watchlist_async_clients(): ...` closes them all on exit."""
+
+    try:
+
+        yield
+    #
+    finally:
+
+        await close_watchlist_async_clients()
+    #
+#
 ###################################################################################################
 ###################################################################################################
 ###################################################################################################
-#
+#
\ No newline at end of file
@@ -0,0 +1,64 @@
+import json
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Modules
+#
+from utils.config import JSON_BACKEND
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Backends
+#
+def _orjson():
+
+    import orjson
+
+    return (orjson.loads)
+#
+
+def _msgspec():
+
+    import msgspec
+
+    return (msgspec.json.Decoder().decode)
+#
+
+def _json():
+
+    return (json.loads)
+#
+
+BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "json": _json}
+
+def load_backend(name:str=JSON_BACKEND) -> tuple:
+
+    """Return (name, loads) of the JSON backend. "auto" takes the fastest one installed."""
+
+    for candidate in (("orjson", "msgspec", "json") if (name == "auto") else (name,)):
+
+        try:
+
+            return (candidate, BACKENDS[candidate]())
+        #
+        except ImportError:
+
+            continue
+        #
+    #
+
+    raise ImportError(f"JSON backend '{name}' is not installed")
+#
+
+BACKEND, _loads = load_backend()
+
+def loads(data):
+
+    """Parse a JSON document from bytes or str."""
+
+    return (_loads(data))
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
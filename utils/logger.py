@@ -1,13 +1,16 @@
 import logging
+import logging.handlers
+import atexit
+import queue
 import os
 #
 ###################################################################################################
 ###################################################################################################
 ################################################################################################### Module
 #
-from utils.config    import MUST_LOG_TIME_MS, MUST_LOG_TO_CONSOLE, MUST_LOG_TO_FILE
+from utils.config    import MUST_LOG_TIME_MS, MUST_LOG_TO_CONSOLE, MUST_LOG_TO_FILE, MUST_LOG_ASYNC
 from utils.config    import MIN_LOGGING_LEVEL_CONSOLE, MIN_LOGGING_LEVEL_FILE, LOG_DIR
-from utils.datetimer import now_yyyy_mm__dd_hh_mm_ss, now_local
+from utils.datetimer import yyyy_mm__dd_hh_mm_ss, now_yyyy_mm_dd, next_day_timestamp
 #
 ###################################################################################################
 ###################################################################################################
@@ -27,15 +30,23 @@ class CustomLogFormatter(logging.Formatter):
 
     def formatTime(self, record, datefmt=None):
 
-        return (now_yyyy_mm__dd_hh_mm_ss(ms=MUST_LOG_TIME_MS))
+        return (yyyy_mm__dd_hh_mm_ss(record.created, ms=MUST_LOG_TIME_MS))
     #
 
     def format(self, record):
 
+        levelname        = record.levelname
         record.asctime   = self.formatTime(record)
-        emoji            = self.EMOJI_MAP.get(record.levelname, "")
-        record.levelname = f"{record.levelname}{emoji}"
-        return (super().format(record))
+        record.levelname = f"{levelname}{self.EMOJI_MAP.get(levelname, '')}"
+
+        try:
+
+            return (super().format(record))
+        #
+        finally:
+
+            record.levelname = levelname
+        #
     #
 #
 ###################################################################################################
@@ -47,9 +58,10 @@ class CustomFileHandler(logging.Handler):
     def __init__(self, base_name="qat"):
 
         super().__init__()
-        self.base_name     = base_name
-        self._current_date = None
-        self._file_handler = None
+        self.base_name      = base_name
+        self._current_date  = None
+        self._file_handler  = None
+        self._next_rollover = 0.0
         self._update_handler()
     #
 
@@ -61,8 +73,9 @@ class CustomFileHandler(logging.Handler):
 
     def _update_handler(self):
 
-        today = now_local().strftime("%Y_%m_%d")
-        
+        today               = now_yyyy_mm_dd()
+        self._next_rollover = next_day_timestamp()
+
         if (today != self._current_date):
 
             if (self._file_handler):
@@ -85,24 +98,115 @@ class CustomFileHandler(logging.Handler):
 
     def emit(self, record):
 
-        self._update_handler()
+        if (record.created >= self._next_rollover):
+
+            self._update_handler()
+        #
         self._file_handler.emit(record)
     #
 #
 ###################################################################################################
 ###################################################################################################
+################################################################################################### Async
+#
+_async_queue    = None
+_async_listener = None
+_async_handlers = {}
+
+class DispatchListener(logging.handlers.QueueListener):
+
+    """
+    Background writer that hands every queued record to the handlers of the logger that queued
+    it. That is the logger of the queue handler, not `record.name`: records of child loggers such
+    as "Screener.x" propagate to the queue handler of "Screener".
+    """
+
+    def handle(self, item):
+
+        owner, record = item
+
+        for handler in _async_handlers.get(owner, ()):
+
+            if (record.levelno >= handler.level):
+
+                handler.handle(record)
+            #
+        #
+    #
+#
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+
+    """
+    Queues the record as it is, with the name of the logger that owns this handler. QueueHandler
+    formats the message on the calling thread, which made an async record cost more than a sync
+    one; here the writer thread formats it. The arguments are read then, so do not log objects
+    that are mutated right after.
+    """
+
+    def __init__(self, queue, owner:str):
+
+        super().__init__(queue)
+        self.owner = owner
+    #
+
+    def prepare(self, record):
+
+        return (record)
+    #
+
+    def enqueue(self, record):
+
+        self.queue.put_nowait((self.owner, record))
+    #
+#
+
+def get_async_log_queue() -> queue.SimpleQueue:
+
+    """Return the queue of async loggers, starting its background writer thread on first use."""
+
+    global _async_queue, _async_listener
+
+    if (_async_listener is None):
+
+        _async_queue    = queue.SimpleQueue()
+        _async_listener = DispatchListener(_async_queue)
+        _async_listener.start()
+        atexit.register(stop_async_logging)
+    #
+
+    return (_async_queue)
+#
+
+def stop_async_logging() -> None:
+
+    """Flush the queued records and stop the background writer thread."""
+
+    global _async_listener
+
+    if (_async_listener is not None):
+
+        _async_listener.stop()
+        _async_listener = None
+    #
+#
+###################################################################################################
+###################################################################################################
 ################################################################################################### Logger
 #
 def get_logger(name:str="qat_logger",
                min_level_console = MIN_LOGGING_LEVEL_CONSOLE,
                min_level_file    = MIN_LOGGING_LEVEL_FILE,
                console_log:bool  = MUST_LOG_TO_CONSOLE,
-               file_log:bool     = MUST_LOG_TO_FILE
+               file_log:bool     = MUST_LOG_TO_FILE,
+               async_log:bool    = MUST_LOG_ASYNC
     ) -> logging.Logger:
 
     """
     Return a logger that outputs to console and a regenerates daily log file.
     Regeneration is done at 00:00 based on the user’s configured timezone.
+    With `async_log`, records are only queued on the calling thread; formatting and I/O happen
+    on one background writer thread shared by all loggers.
     """
 
     logger = logging.getLogger(name)
@@ -112,6 +216,7 @@ def get_logger(name:str="qat_logger",
         logger.handlers.clear()
     #
     logger.setLevel(logging.DEBUG)
+    handlers = []
 
 
     if (console_log):
@@ -121,7 +226,7 @@ def get_logger(name:str="qat_logger",
         stream_handler = logging.StreamHandler()
         stream_handler.setFormatter(formatter)
         stream_handler.setLevel(min_level_console)
-        logger.addHandler(stream_handler)
+        handlers.append(stream_handler)
     #
     if (file_log):
 
@@ -130,7 +235,22 @@ def get_logger(name:str="qat_logger",
         file_handler  = CustomFileHandler(base_name=name)
         file_handler.setFormatter(formatter)
         file_handler.setLevel(min_level_file)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    #
+
+    if (async_log) and (handlers):
+
+        _async_handlers[name] = handlers
+        queue_handler         = LazyQueueHandler(get_async_log_queue(), owner=name)
+        queue_handler.setLevel(min(handler.level for handler in handlers))
+        logger.addHandler(queue_handler)
+    #
+    else:
+
+        for handler in handlers:
+
+            logger.addHandler(handler)
+        #
     #
 
     return (logger)
@@ -0,0 +1,452 @@
+import asyncio
+import bisect
+import json
+import os
+import time
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Modules
+#
+from utils.config import METRICS_ENABLED, METRICS_PREFIX, METRICS_HTTP_HOST, METRICS_HTTP_PORT
+from utils.config import METRICS_JSON_PATH, METRICS_JSON_EVERY_SEC
+
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000)
+
+LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})      # label values in the Prometheus text format
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Histogram
+#
+class Histogram:
+
+    """Fixed-bucket histogram. `counts[i]` holds the observations in (buckets[i-1], buckets[i]], the last one everything above."""
+
+    __slots__ = ("name", "help", "buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, name:str, help:str="", buckets:tuple=TIME_BUCKETS) -> None:
+
+        self.name    = name
+        self.help    = help
+        self.buckets = tuple(buckets)
+        self.counts  = [0] * (len(self.buckets) + 1)
+        self.count   = 0
+        self.sum     = 0.0
+        self.max     = 0.0
+    #
+
+    def observe(self, value:float) -> None:
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum   += value
+
+        if (value > self.max):
+
+            self.max = value
+        #
+    #
+
+    def quantile(self, q:float) -> float:
+
+        """Upper bound of the bucket holding the q-quantile (the largest observation for the overflow bucket)."""
+
+        if (not self.count):
+
+            return (0.0)
+        #
+
+        rank       = q * self.count
+        cumulative = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+
+            cumulative += count
+
+            if (cumulative >= rank):
+
+                return (min(bound, self.max))
+            #
+        #
+
+        return (self.max)
+    #
+
+    def to_dict(self) -> dict:
+
+        return ({
+            "count" : self.count,
+            "sum"   : self.sum,
+            "mean"  : self.sum / self.count if self.count else 0.0,
+            "max"   : self.max,
+            "p50"   : self.quantile(0.50),
+            "p90"   : self.quantile(0.90),
+            "p99"   : self.quantile(0.99),
+        })
+    #
+#
+
+class Span:
+
+    """Times a `with` block into a histogram."""
+
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram:Histogram) -> None:
+
+        self.histogram = histogram
+        self.started   = 0.0
+    #
+
+    def __enter__(self):
+
+        self.started = time.perf_counter()
+        return (self)
+    #
+
+    def __exit__(self, *exc_info) -> None:
+
+        self.histogram.observe(time.perf_counter() - self.started)
+    #
+#
+
+class NullSpan:
+
+    """Shared do-nothing span handed out while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+
+        return (self)
+    #
+
+    def __exit__(self, *exc_info) -> None:
+
+        pass
+    #
+#
+
+NULL_SPAN = NullSpan()
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### MetricsRegistry
+#
+class MetricsRegistry:
+
+    """
+    Process-wide histograms, counters and gauges, rendered as Prometheus text or JSON.
+
+    Gauges are sampled at render time from registered callables returning `{name: value}`, so
+    components keep their own counters and pay nothing per event. While disabled, `span` returns the
+    shared `NULL_SPAN` and `observe`/`inc` return right away.
+    """
+
+    def __init__(self, enabled:bool=True, prefix:str="dexscreener") -> None:
+
+        self.enabled     = enabled
+        self.prefix      = prefix
+
+        self.histograms  = {}
+        self.counters    = {}
+        self.gauges      = []
+        self.routes      = {"/metrics": self.metrics_response}
+
+        self._server     = None
+        self._dump_task  = None
+    #
+
+    def histogram(self, name:str, help:str="", buckets:tuple=TIME_BUCKETS) -> Histogram:
+
+        histogram = self.histograms.get(name)
+
+        if (histogram is None):
+
+            histogram = self.histograms[name] = Histogram(name, help, buckets)
+        #
+
+        return (histogram)
+    #
+
+    def span(self, name:str):
+
+        if (not self.enabled):
+
+            return (NULL_SPAN)
+        #
+
+        histogram = self.histograms.get(name)
+
+        return (Span(histogram if (histogram is not None) else self.histogram(name)))
+    #
+
+    def observe(self, name:str, value:float, buckets:tuple=TIME_BUCKETS) -> None:
+
+        if (self.enabled):
+
+            histogram = self.histograms.get(name)
+            (histogram if (histogram is not None) else self.histogram(name, buckets=buckets)).observe(value)
+        #
+    #
+
+    def inc(self, name:str, value:float=1) -> None:
+
+        if (self.enabled):
+
+            self.counters[name] = self.counters.get(name, 0) + value
+        #
+    #
+
+    def register_gauges(self, name:str, sample, labels:dict=None) -> None:
+
+        """Sample `sample()` -> {key: value} at render time, as gauges `<name>_<key>{labels}`."""
+
+        self.gauges.append((name, dict(labels or {}), sample))
+    #
+
+    def unregister_gauges(self, sample) -> None:
+
+        self.gauges = [gauge for gauge in self.gauges if (gauge[2] != sample)]
+    #
+
+    def reset(self) -> None:
+
+        self.histograms = {}
+        self.counters   = {}
+    #
+    ##############################################################
+    #
+    def sample_gauges(self) -> list:
+
+        samples = []
+
+        for name, labels, sample in self.gauges:
+
+            try:
+
+                values = sample()
+            #
+            except Exception:
+
+                continue
+            #
+
+            for key, value in values.items():
+
+                if (isinstance(value, (int, float))):
+
+                    samples.append((f"{name}_{key}", labels, value))
+                #
+            #
+        #
+
+        return (samples)
+    #
+
+    def render_prometheus(self) -> str:
+
+        prefix = self.prefix
+        lines  = []
+
+        for name, histogram in sorted(self.histograms.items()):
+
+            metric     = f"{prefix}_{name}"
+            cumulative = 0
+
+            if (histogram.help):
+
+                lines.append(f"# HELP {metric} {histogram.help}")
+            #
+            lines.append(f"# TYPE {metric} histogram")
+
+            for bound, count in zip(histogram.buckets, histogram.counts):
+
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            #
+
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{metric}_sum {histogram.sum}")
+            lines.append(f"{metric}_count {histogram.count}")
+        #
+
+        for name, value in sorted(self.counters.items()):
+
+            metric = f"{prefix}_{name}" if name.endswith("_total") else f"{prefix}_{name}_total"
+
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        #
+
+        # Samples of one gauge have to be contiguous, whichever component they come from.
+        gauges = {}
+        for name, labels, value in self.sample_gauges():
+
+            gauges.setdefault(name, []).append((labels, value))
+        #
+
+        for name, samples in sorted(gauges.items()):
+
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+
+            for labels, value in samples:
+
+                label_text = ",".join(f'{key}="{str(val).translate(LABEL_ESCAPES)}"' for key, val in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+            #
+        #
+
+        return ("\n".join(lines) + "\n")
+    #
+
+    def to_dict(self) -> dict:
+
+        return ({
+            "timestamp"  : time.time(),
+            "histograms" : {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+            "counters"   : dict(sorted(self.counters.items())),
+            "gauges"     : [{"name": name, "labels": labels, "value": value} for name, labels, value in self.sample_gauges()],
+        })
+    #
+
+    def dump_json(self, path:str, snapshot:dict=None) -> None:
+
+        """Write `snapshot` (by default `to_dict()`) to `path`, atomically."""
+
+        snapshot = snapshot if (snapshot is not None) else self.to_dict()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, "w") as f:
+
+            json.dump(snapshot, f, indent=2)
+        #
+
+        os.replace(tmp_path, path)
+    #
+    ##############################################################
+    #
+    def metrics_response(self) -> tuple:
+
+        return (200, "text/plain; version=0.0.4", self.render_prometheus())
+    #
+
+    def add_route(self, path:str, handler) -> None:
+
+        """Serve `handler()` -> (status, content_type, body) on GET `path`."""
+
+        self.routes[path] = handler
+    #
+
+    async def handle_http(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+
+        try:
+
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+
+            while (await asyncio.wait_for(reader.readline(), timeout=5) not in (b"\r\n", b"\n", b"")):
+
+                pass
+            #
+
+            parts   = request.decode("latin-1").split()
+            path    = parts[1].split("?", 1)[0] if (len(parts) >= 2) else ""
+            handler = self.routes.get(path)
+
+            if (not parts) or (parts[0] != "GET") or (handler is None):
+
+                status, content_type, body = 404, "text/plain", "not found\n"
+            #
+            else:
+
+                status, content_type, body = handler()
+            #
+
+            payload = body.encode("utf-8")
+            reason  = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}.get(status, "OK")
+
+            writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload)
+            await writer.drain()
+        #
+        except Exception:
+
+            pass
+        #
+        finally:
+
+            writer.close()
+        #
+    #
+
+    async def serve(self, host:str="127.0.0.1", port:int=9464) -> asyncio.AbstractServer:
+
+        """Serve the registered routes (`/metrics` by default) over plain HTTP."""
+
+        if (self._server is None):
+
+            self._server = await asyncio.start_server(self.handle_http, host, port)
+        #
+
+        return (self._server)
+    #
+
+    async def dump_periodically(self, path:str, interval:float) -> None:
+
+        while (True):
+
+            await asyncio.sleep(interval)
+
+            # Sample on the loop, which owns the state the gauges read; only the writing goes to a thread.
+            await asyncio.to_thread(self.dump_json, path, self.to_dict())
+        #
+    #
+
+    async def start_exporters(self, host:str=METRICS_HTTP_HOST, port:int=METRICS_HTTP_PORT, path:str=METRICS_JSON_PATH, interval:float=METRICS_JSON_EVERY_SEC) -> None:
+
+        """Start the configured exporters, once: the HTTP endpoint when `port` is set, the JSON dump when `path` is set."""
+
+        if (not self.enabled):
+
+            return
+        #
+
+        if (port is not None) and (self._server is None):
+
+            await self.serve(host, port)
+        #
+
+        if (path is not None) and (self._dump_task is None):
+
+            self._dump_task = asyncio.create_task(self.dump_periodically(path, interval))
+        #
+    #
+
+    async def aclose(self) -> None:
+
+        if (self._dump_task is not None):
+
+            self._dump_task.cancel()
+            await asyncio.gather(self._dump_task, return_exceptions=True)
+            self._dump_task = None
+        #
+
+        if (self._server is not None):
+
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        #
+    #
+#
+
+metrics = MetricsRegistry(enabled=METRICS_ENABLED, prefix=METRICS_PREFIX)
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
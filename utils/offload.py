@@ -0,0 +1,180 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import time
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Modules
+#
+from utils.config  import OFFLOAD_EXECUTOR, OFFLOAD_WORKERS, OFFLOAD_MIN_BYTES
+from utils.config  import LOOP_LAG_ENABLED, LOOP_LAG_INTERVAL_SEC
+from utils.metrics import metrics
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### Offloader
+#
+class Offloader:
+
+    """
+    Runs CPU-bound parsing off the event loop.
+
+    `kind` is None (run inline), "thread" or "process". Threads still share the GIL, but the loop
+    gets it back every switch interval instead of waiting for the whole parse. Processes parse
+    in parallel; their functions and arguments must be picklable, so pass module-level functions
+    and bytes. Inputs smaller than `min_bytes` are always parsed inline, where the hand-off would
+    cost more than it saves.
+    """
+
+    def __init__(self, kind:str=OFFLOAD_EXECUTOR, workers:int=OFFLOAD_WORKERS, min_bytes:int=OFFLOAD_MIN_BYTES) -> None:
+
+        if (kind not in (None, "thread", "process")):
+
+            raise ValueError(f"Unknown offload executor '{kind}'")
+        #
+
+        self.kind      = kind
+        self.workers   = workers
+        self.min_bytes = min_bytes
+        self._executor = None
+
+        self.offloaded = 0
+        self.inline    = 0
+    #
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+
+        if (self._executor is None):
+
+            if (self.kind == "thread"):
+
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="offload")
+            #
+            else:
+
+                # Forking a process with running threads (the log writer, the HTTP pools) is unsafe.
+                self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            #
+        #
+
+        return (self._executor)
+    #
+
+    async def run(self, func, *args, size:int=None):
+
+        """Return func(*args), from the executor when offloading is on and `size` reaches `min_bytes`."""
+
+        if (self.kind is None) or (size is not None and size < self.min_bytes):
+
+            self.inline += 1
+            return (func(*args))
+        #
+
+        self.offloaded += 1
+
+        return (await asyncio.get_running_loop().run_in_executor(self.executor, func, *args))
+    #
+
+    def stats(self) -> dict:
+
+        return ({"offloaded": self.offloaded, "inline": self.inline})
+    #
+
+    def shutdown(self) -> None:
+
+        if (self._executor is not None):
+
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        #
+    #
+#
+
+offloader = Offloader()
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### LoopLagMonitor
+#
+class LoopLagMonitor:
+
+    """
+    Measures how long the event loop is blocked.
+
+    A task sleeps `interval` seconds at a time; whatever it oversleeps is time the loop spent
+    running something else without yielding. Every lag goes to the `event_loop_lag_seconds`
+    histogram, and `cycle()` returns the worst lag and the total blocked time since its last call.
+    """
+
+    def __init__(self, interval:float=LOOP_LAG_INTERVAL_SEC, enabled:bool=LOOP_LAG_ENABLED) -> None:
+
+        self.interval = interval
+        self.enabled  = enabled
+        self._task    = None
+
+        self.max_lag  = 0.0
+        self.blocked  = 0.0
+        self.samples  = 0
+    #
+
+    def start(self) -> None:
+
+        """Start monitoring the running loop, once."""
+
+        if (self.enabled) and (self._task is None or self._task.done()):
+
+            self._task = asyncio.get_running_loop().create_task(self.monitor())
+        #
+    #
+
+    async def monitor(self) -> None:
+
+        while (True):
+
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag     = max(0.0, time.perf_counter() - started - self.interval)
+
+            self.samples += 1
+            self.blocked += lag
+
+            if (lag > self.max_lag):
+
+                self.max_lag = lag
+            #
+
+            metrics.observe("event_loop_lag_seconds", lag)
+        #
+    #
+
+    def cycle(self) -> dict:
+
+        """The lag since the previous call, then start a new cycle."""
+
+        report       = {"max": self.max_lag, "blocked": self.blocked, "samples": self.samples}
+        self.max_lag = 0.0
+        self.blocked = 0.0
+        self.samples = 0
+
+        return (report)
+    #
+
+    async def aclose(self) -> None:
+
+        if (self._task is not None):
+
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        #
+    #
+#
+
+loop_monitor = LoopLagMonitor()
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import struct
+import time
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### TokenBucketLimiter
+#
+class TokenBucketLimiter:
+
+    """
+    Token-bucket rate limiter: `rate` permits per second with bursts of up to `burst` permits.
+
+    Permits are reserved synchronously, so no lock is held while a caller sleeps and the limiter is
+    not bound to any event loop. Concurrent callers queue up by driving the bucket negative.
+    """
+
+    def __init__(self, rate:float, burst:int=1) -> None:
+
+        self.rate           = rate
+        self.burst          = burst
+
+        self._tokens        = float(burst)
+        self._updated       = self._clock()
+        self._blocked_until = 0.0
+        self._pushed        = 0.0
+
+        self.acquired       = 0
+        self.waits          = 0
+        self.wait_time      = 0.0
+        self.throttles      = 0
+    #
+
+    def _clock(self) -> float:
+
+        return (time.monotonic())
+    #
+
+    def _refill(self, now:float) -> None:
+
+        # After a throttle `_updated` lies at the end of the block: nothing accrues before it.
+        if (now > self._updated):
+
+            self._tokens  = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+        #
+    #
+
+    def _reserve(self, now:float) -> float:
+
+        """Take one permit. Return how long the caller has to wait before using it."""
+
+        self._refill(now)
+        self._tokens -= 1
+
+        # The queue behind the bucket starts once the block is over, one permit every 1/rate.
+        start = max(now, self._updated, self._blocked_until)
+
+        return ((start - now) + max(0.0, -self._tokens) / self.rate)
+    #
+
+    def _block(self, now:float, seconds:float) -> None:
+
+        """
+        Hand out no permit before `now + seconds`, and refill the emptied bucket only from then on.
+        The queued permits keep their order and spacing: the queue starts at the end of the block,
+        and `_pushed` grows by how far it moved, which the sleeping callers add to their wait.
+        """
+
+        self._refill(now)
+
+        start               = self._updated
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self._tokens        = min(self._tokens, 0.0)
+        self._updated       = max(self._updated, self._blocked_until)
+        self._pushed       += self._updated - start
+    #
+
+    async def acquire(self) -> float:
+
+        """Wait for a permit. Return the time spent waiting."""
+
+        waited         = 0.0
+        delay          = self._reserve(self._clock())
+        self.acquired += 1
+
+        while (delay > 0):
+
+            pushed  = self._pushed
+            waited += delay
+            await asyncio.sleep(delay)
+
+            # A throttle while this caller slept moved the queue behind the block: its permit too, keeping its place.
+            delay = self._pushed - pushed
+        #
+
+        if (waited > 0):
+
+            self.waits     += 1
+            self.wait_time += waited
+        #
+
+        return (waited)
+    #
+
+    def throttle(self, retry_after:float=None) -> None:
+
+        """Stop handing out permits for `retry_after` seconds (default: one second), e.g. after a 429."""
+
+        self.throttles += 1
+        self._block(self._clock(), 1.0 if (retry_after is None) else retry_after)
+    #
+
+    def stats(self) -> dict:
+
+        return ({
+            "acquired"  : self.acquired,
+            "waits"     : self.waits,
+            "wait_time" : self.wait_time,
+            "throttles" : self.throttles,
+        })
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### FileTokenBucketLimiter
+#
+class FileTokenBucketLimiter(TokenBucketLimiter):
+
+    """
+    Token-bucket limiter whose bucket lives in a file, shared by every process on the host that uses
+    the same `path`. Reservations are serialized with an exclusive `flock` held only while the
+    bucket is updated. Counters are per process.
+    """
+
+    STATE_FORMAT = "<ddd"
+
+    def __init__(self, path:str, rate:float, burst:int=1) -> None:
+
+        super().__init__(rate=rate, burst=burst)
+
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    #
+
+    def _clock(self) -> float:
+
+        return (time.time())
+    #
+
+    def _locked(self, update, *args) -> float:
+
+        import fcntl
+
+        with open(self.path, "a+b") as f:
+
+            fcntl.flock(f, fcntl.LOCK_EX)
+
+            try:
+
+                f.seek(0)
+                state = f.read(struct.calcsize(self.STATE_FORMAT))
+
+                if (len(state) == struct.calcsize(self.STATE_FORMAT)):
+
+                    self._tokens, self._updated, self._blocked_until = struct.unpack(self.STATE_FORMAT, state)
+                #
+                else:
+
+                    self._tokens, self._updated, self._blocked_until = float(self.burst), self._clock(), 0.0
+                #
+
+                result = update(*args)
+
+                f.seek(0)
+                f.truncate()
+                f.write(struct.pack(self.STATE_FORMAT, self._tokens, self._updated, self._blocked_until))
+                f.flush()
+            #
+            finally:
+
+                fcntl.flock(f, fcntl.LOCK_UN)
+            #
+        #
+
+        return (result)
+    #
+
+    def _reserve(self, now:float) -> float:
+
+        return (self._locked(super()._reserve, now))
+    #
+
+    def _block(self, now:float, seconds:float) -> None:
+
+        self._locked(super()._block, now, seconds)
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file
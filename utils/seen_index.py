@@ -0,0 +1,238 @@
+from collections import OrderedDict
+from multiprocessing import shared_memory
+import multiprocessing
+import hashlib
+import struct
+import math
+import time
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### SeenIndex
+#
+BLOOM_HEADER = struct.Struct("<QQQ")    # current generation, items in generation 0, items in generation 1
+
+class SeenIndex:
+
+    """
+    Bounded membership index with O(1) lookups.
+
+    The default mode is an insertion-ordered set that evicts the oldest entries past `max_size`,
+    with optional expiry of entries older than `ttl` seconds. The `bloom` mode trades exactness
+    for a fixed memory footprint: two generations of a Bloom filter, each sized for `max_size`
+    items at `error_rate` false positives. Adds go to the current generation; once it holds
+    `max_size` items the older one is cleared and takes over, so the index remembers the latest
+    `max_size` to `2 * max_size` items and the false positive rate stays under `2 * error_rate`.
+    """
+
+    def __init__(self, max_size:int=100_000, ttl:float=None, bloom:bool=False, error_rate:float=0.001) -> None:
+
+        self.max_size   = max_size
+        self.ttl        = ttl
+        self.bloom      = bloom
+        self.error_rate = error_rate
+
+        if (bloom):
+
+            self._bits_count   = max(8, int(-max_size * math.log(error_rate) / (math.log(2) ** 2)))
+            self._hashes_count = max(1, round(self._bits_count / max_size * math.log(2)))
+            self._generation   = (self._bits_count + 7) // 8
+            self._bits         = bytearray(BLOOM_HEADER.size + 2 * self._generation)
+        #
+        else:
+
+            self._entries = OrderedDict()
+        #
+    #
+
+    def _positions(self, item:str) -> list:
+
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1     = int.from_bytes(digest[:8], "little")
+        h2     = int.from_bytes(digest[8:], "little") | 1
+
+        return ([(h1 + i * h2) % self._bits_count for i in range(self._hashes_count)])
+    #
+
+    def _in_generation(self, generation:int, positions:list) -> bool:
+
+        offset = BLOOM_HEADER.size + generation * self._generation
+        bits   = self._bits
+
+        return (all(bits[offset + (p >> 3)] & (1 << (p & 7)) for p in positions))
+    #
+
+    def __contains__(self, item:str) -> bool:
+
+        if (self.bloom):
+
+            positions = self._positions(item)
+            current   = BLOOM_HEADER.unpack_from(self._bits)[0]
+
+            return (self._in_generation(current, positions) or self._in_generation(1 - current, positions))
+        #
+
+        added = self._entries.get(item)
+
+        if (added is None):
+
+            return (False)
+        #
+        elif (self.ttl is not None) and (time.monotonic() - added > self.ttl):
+
+            del self._entries[item]
+            return (False)
+        #
+
+        return (True)
+    #
+
+    def add(self, item:str) -> None:
+
+        if (self.bloom):
+
+            bits             = self._bits
+            current, *counts = BLOOM_HEADER.unpack_from(bits)
+            offset           = BLOOM_HEADER.size + current * self._generation
+            fresh            = False
+
+            for p in self._positions(item):
+
+                bit   = 1 << (p & 7)
+                fresh = fresh or (not bits[offset + (p >> 3)] & bit)
+                bits[offset + (p >> 3)] |= bit
+            #
+
+            # An item that was already in (or a false positive) sets no new bit: count it once.
+            counts[current] += fresh
+
+            if (counts[current] >= self.max_size):
+
+                # Rotate: the older generation is forgotten and starts over as the current one.
+                current         = 1 - current
+                counts[current] = 0
+                offset          = BLOOM_HEADER.size + current * self._generation
+
+                bits[offset:offset + self._generation] = bytes(self._generation)
+            #
+
+            BLOOM_HEADER.pack_into(bits, 0, current, *counts)
+            return
+        #
+
+        self._entries[item] = time.monotonic()
+        self._entries.move_to_end(item)
+
+        while (len(self._entries) > self.max_size):
+
+            self._entries.popitem(last=False)
+        #
+
+        # The oldest entries are at the front: dropping the expired ones costs O(1) per add.
+        if (self.ttl is not None):
+
+            self.expire()
+        #
+    #
+
+    def discard(self, item:str) -> None:
+
+        """Forget `item`. A no-op in `bloom` mode: its bits may be shared with other items."""
+
+        if (not self.bloom):
+
+            self._entries.pop(item, None)
+        #
+    #
+
+    def expire(self) -> int:
+
+        """Drop entries older than `ttl`. Return the number of dropped entries."""
+
+        if (self.bloom) or (self.ttl is None):
+
+            return (0)
+        #
+
+        cutoff  = time.monotonic() - self.ttl
+        dropped = 0
+
+        while (self._entries):
+
+            item, added = next(iter(self._entries.items()))
+
+            if (added > cutoff):
+
+                break
+            #
+
+            del self._entries[item]
+            dropped += 1
+        #
+
+        return (dropped)
+    #
+
+    def __len__(self) -> int:
+
+        return (sum(BLOOM_HEADER.unpack_from(self._bits)[1:]) if self.bloom else len(self._entries))
+    #
+#
+###################################################################################################
+###################################################################################################
+################################################################################################### SharedSeenIndex
+#
+class SharedSeenIndex(SeenIndex):
+
+    """
+    Bloom-mode SeenIndex whose bits live in shared memory, so several processes see each other's adds.
+
+    The creating process passes no `name`; the others attach with the creator's `name` and `lock`.
+    Adds are serialized by the lock, lookups are lock-free: a lookup racing an add may miss it once,
+    and one racing a rotation may miss the items of the generation being cleared. The generation
+    header is shared too, so `len` counts the adds of every process.
+    """
+
+    def __init__(self, max_size:int=100_000, error_rate:float=0.001, name:str=None, lock=None) -> None:
+
+        super().__init__(max_size=max_size, bloom=True, error_rate=error_rate)
+
+        self._shm   = shared_memory.SharedMemory(name=name, create=(name is None), size=len(self._bits))
+        self._bits  = self._shm.buf
+        self.name   = self._shm.name
+        self.owner  = (name is None)
+        self.lock   = lock if (lock is not None) else multiprocessing.get_context("spawn").Lock()
+    #
+
+    def spec(self) -> dict:
+
+        """Keyword arguments that attach another process to this index."""
+
+        return ({"max_size": self.max_size, "error_rate": self.error_rate, "name": self.name, "lock": self.lock})
+    #
+
+    def add(self, item:str) -> None:
+
+        with self.lock:
+
+            super().add(item)
+        #
+    #
+
+    def close(self) -> None:
+
+        """Detach from the shared bits; the creating process also frees them."""
+
+        self._bits = None
+        self._shm.close()
+
+        if (self.owner):
+
+            self._shm.unlink()
+        #
+    #
+#
+###################################################################################################
+###################################################################################################
+###################################################################################################
+#
\ No newline at end of file